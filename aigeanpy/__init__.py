@@ -1,6 +1,53 @@
-from aigeanpy.net import *
-from aigeanpy.satmap import *
-from aigeanpy.command import *
-from aigeanpy.analysis import *
-from aigeanpy.clustering import *
-from aigeanpy.clustering_numpy import *
+from importlib import import_module
+
+# Modules whose public names are available from the package, in the order
+# they used to be star-imported. They are only imported on first use, so
+# `import aigeanpy` and the console scripts don't pay for matplotlib,
+# skimage, h5py, asdf or requests until they need them.
+_SUBMODULES = ('net', 'fileindex', 'cache', 'resample', 'spatial', 'coords',
+               'readers', 'pyramid', 'satmap', 'expression', 'composite',
+               'temporal', 'change', 'tiled', 'tiles', 'catalog', 'render',
+               'command', 'analysis', 'clustering', 'clustering_numpy')
+
+
+def __getattr__(name):
+    """ Import the submodule, or the public name of a submodule, on first use.
+
+    Parameters
+    ----------
+    name : str
+        The name of the submodule or of the public name.
+
+    Returns
+    -------
+    object
+        The submodule or the object the public name refers to.
+
+    Raises
+    ------
+    AttributeError
+        Module 'aigeanpy' has no attribute
+    """
+    if name in _SUBMODULES:
+        return import_module(f'{__name__}.{name}')
+    # `from aigeanpy import *` imports every public name, as it used to
+    if name == '__all__':
+        return [name for name in __dir__()
+                if not name.startswith('_') and name != 'import_module']
+    if not name.startswith('_'):
+        # later modules used to shadow the names of earlier ones
+        for submodule in reversed(_SUBMODULES):
+            module = import_module(f'{__name__}.{submodule}')
+            if name in vars(module):
+                value = vars(module)[name]
+                globals()[name] = value
+                return value
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+
+def __dir__():
+    names = set(globals()) | set(_SUBMODULES)
+    for submodule in _SUBMODULES:
+        module = import_module(f'{__name__}.{submodule}')
+        names |= {name for name in vars(module) if not name.startswith('_')}
+    return sorted(names)
@@ -0,0 +1,207 @@
+# Disabling too-many-instance-attributes
+# pylint: disable = R0902
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class SatMapCache:
+    """
+    SatMapCache keeps the decoded meta-data and data of recently loaded
+    files, so loading the same file again doesn't decode it again. Entries
+    are keyed by the resolved path, the modification time and the size of
+    the file, so a file changed on disk is decoded again. The least recently
+    used entries are evicted once the cached data exceeds a byte budget.
+
+    Cached data arrays are shared between every SatMap loaded from the same
+    file, so they are made read-only: use SatMap.detach to get data which
+    can be changed in place. For this reason the cache shared by
+    aigeanpy.satmap.get_satmap, satmap_cache, is only used once enabled.
+
+    The entries are guarded by a lock, so the cache can be shared by the
+    threads of aigeanpy.satmap.get_satmaps.
+
+    Attributes
+    ----------
+    max_bytes : int
+        Byte budget of the cached data arrays.
+    enabled : bool
+        Whether the cache is used.
+    hits : int
+        Number of lookups found in the cache.
+    misses : int
+        Number of lookups not found in the cache.
+
+    Methods
+    -------
+    key(file_path)
+        Get the cache key of a file.
+    get(key)
+        Get the meta-data and data stored under a key.
+    put(key, meta, data)
+        Store the meta-data and data of a file under a key.
+    clear()
+        Remove every entry and reset the counters.
+    enable()
+        Start using the cache.
+    disable()
+        Stop using the cache and remove every entry.
+    stats()
+        Get the counters and the size of the cache.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 ** 2, enabled=True):
+        """ Initiate the SatMapCache class.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            Byte budget of the cached data arrays, by default 512 MiB.
+        enabled : bool, optional
+            Whether the cache is used, by default True.
+
+        Raises
+        ------
+        TypeError
+            Max_bytes must be int type
+        ValueError
+            Max_bytes must not be negative
+        """
+        if not isinstance(max_bytes, int):
+            raise TypeError('Max_bytes must be int type')
+        if max_bytes < 0:
+            raise ValueError('Max_bytes must not be negative')
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        # key of the entry of each resolved path
+        self._keys = {}
+        # re-entrant, as put removes entries while holding it
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(file_path):
+        """ Get the cache key of a file.
+
+        Parameters
+        ----------
+        file_path : str or Path
+            The file path of the file holding the data information.
+
+        Returns
+        -------
+        tuple
+            Resolved path, modification time in ns and size of the file.
+        """
+        file_path = Path(file_path).resolve()
+        stat = file_path.stat()
+        return str(file_path), stat.st_mtime_ns, stat.st_size
+
+    def get(self, key):
+        """ Get the meta-data and data stored under a key.
+
+        Parameters
+        ----------
+        key : tuple
+            Cache key, as given by SatMapCache.key.
+
+        Returns
+        -------
+        tuple or None
+            A copy of the meta-data and the read-only data, None if the key
+            isn't cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # mark the entry as the most recently used
+            self._entries.move_to_end(key)
+            meta, data = entry
+            return meta.copy(), data
+
+    def put(self, key, meta, data):
+        """ Store the meta-data and data of a file under a key.
+
+        The data array is made read-only once stored. Data larger than the
+        byte budget is not stored, and left writeable.
+
+        Parameters
+        ----------
+        key : tuple
+            Cache key, as given by SatMapCache.key.
+        meta : dict
+            Meta-data of the file.
+        data : array
+            Data array of the file.
+        """
+        if data.nbytes > self.max_bytes:
+            return
+        data.flags.writeable = False
+        with self._lock:
+            # the same file changed on disk is stored under a new key
+            old_key = self._keys.get(key[0])
+            if old_key is not None:
+                self._remove(old_key)
+            self._entries[key] = (meta.copy(), data)
+            self._keys[key[0]] = key
+            self.nbytes += data.nbytes
+            # evict the least recently used entries
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        """ Remove the entry stored under a key.
+        """
+        with self._lock:
+            data = self._entries.pop(key)[1]
+            del self._keys[key[0]]
+            self.nbytes -= data.nbytes
+
+    def clear(self):
+        """ Remove every entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._keys.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def enable(self):
+        """ Start using the cache.
+        """
+        self.enabled = True
+
+    def disable(self):
+        """ Stop using the cache and remove every entry.
+        """
+        self.enabled = False
+        self.clear()
+
+    def stats(self):
+        """ Get the counters and the size of the cache.
+
+        Returns
+        -------
+        dict
+            Keys including ('hits', 'misses', 'entries', 'nbytes',
+            'max_bytes')
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'nbytes': self.nbytes,
+                    'max_bytes': self.max_bytes}
+
+
+# Cache shared by every SatMap loaded with aigeanpy.satmap.get_satmap, used
+# once enabled with satmap_cache.enable()
+satmap_cache = SatMapCache(enabled=False)
@@ -0,0 +1,316 @@
+import sqlite3
+from pathlib import Path
+from functools import partial
+from aigeanpy.satmap import read_meta, load_many
+
+# Suffixes of the files holding data information
+SUFFIXES = ('.hdf5', '.asdf', '.zip')
+
+# Name of the catalog database, by default saved in the search root
+CATALOG_NAME = 'aigean_catalog.sqlite'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    archive TEXT,
+    instrument TEXT,
+    observatory TEXT,
+    resolution INTEGER,
+    obs_date TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS files_obs_date ON files (obs_date);
+CREATE VIRTUAL TABLE IF NOT EXISTS footprints USING rtree (
+    id, xmin, xmax, ymin, ymax
+);
+"""
+
+
+class Catalog:
+    """
+    Catalog keeps the meta-data of the files under a search root in a
+    SQLite database, with an R*Tree index over their footprints, so the
+    files matching a box, dates, instrument or resolution are found without
+    opening any of them.
+
+    The catalog is updated incrementally: only the files added or changed
+    since the last update, by size or modification time, are read again,
+    and the files removed are dropped. The files which can't be read are
+    remembered too, so they aren't read again until they change.
+
+    Paths are stored relative to the search root, so the results of a query
+    can be given to the loaders with the same root, e.g.
+    ``get_satmaps(catalog.query(...), root=catalog.root)``.
+
+    Attributes
+    ----------
+    root : Path
+        Absolute path of the directory the files are searched in.
+    path : Path
+        Path of the database.
+
+    Methods
+    -------
+    update(workers=1)
+        Bring the catalog in line with the files under the search root.
+    query(xcoords=None, ycoords=None, *, start=None, stop=None,
+          instrument=None, resolution=None)
+        Find the files matching every given condition.
+    get_meta(filename)
+        Get the meta-data of a file stored in the catalog.
+    failed()
+        Get the files which couldn't be read.
+    close()
+        Close the database.
+    """
+
+    def __init__(self, root='.', path=None):
+        """ Initiate the Catalog class, creating the database if needed.
+
+        Parameters
+        ----------
+        root : str or Path, optional
+            The directory to search the files in, by default '.'.
+        path : str or Path, optional
+            The path of the database, by default 'aigean_catalog.sqlite'
+            in the search root.
+        """
+        self.root = Path(root).resolve()
+        self.path = Path(path) if path is not None else self.root/CATALOG_NAME
+        self._connection = sqlite3.connect(self.path)
+        self._connection.executescript(_SCHEMA)
+
+    def __len__(self):
+        return self._connection.execute(
+            'SELECT COUNT(*) FROM files WHERE error IS NULL').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(self, workers=1):
+        """ Bring the catalog in line with the files under the search root.
+
+        Only the meta-data of the new and changed files is read, with
+        aigeanpy.satmap.read_meta.
+
+        Parameters
+        ----------
+        workers : int, optional
+            Number of files read at once, by default 1.
+
+        Returns
+        -------
+        dict
+            Number of files per outcome, keys including ('added', 'updated',
+            'removed', 'unchanged', 'failed'). The files which failed are
+            counted as added or updated too.
+
+        Examples
+        --------
+        >>> from aigeanpy.catalog import Catalog
+        >>> with Catalog('aigeanpy/tests', ':memory:') as catalog:
+        ...     counts = catalog.update()
+        ...     catalog.update()['unchanged'] == counts['added']
+        True
+        """
+        stored = {path: (size, mtime_ns) for path, size, mtime_ns in
+                  self._connection.execute(
+                      'SELECT path, size, mtime_ns FROM files')}
+        counts = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0,
+                  'failed': 0}
+
+        # compare the files on disk with the stored sizes and times
+        changed = {}
+        for file_path in sorted(self.root.rglob('*')):
+            if file_path.suffix not in SUFFIXES or not file_path.is_file():
+                continue
+            filename = file_path.relative_to(self.root).as_posix()
+            stat = file_path.stat()
+            if stored.pop(filename, None) == (stat.st_size, stat.st_mtime_ns):
+                counts['unchanged'] += 1
+            else:
+                changed[filename] = stat
+
+        with self._connection:
+            # files which aren't on disk anymore
+            for filename in stored:
+                self._delete(filename)
+            counts['removed'] = len(stored)
+
+            names = list(changed)
+            metas, errors = load_many(partial(read_meta, root=self.root),
+                                      names, workers)
+            for index, (filename, meta) in enumerate(zip(names, metas)):
+                counts['updated' if self._delete(filename) else 'added'] += 1
+                if index in errors:
+                    counts['failed'] += 1
+                self._insert(filename, changed[filename], meta,
+                             errors.get(index))
+        return counts
+
+    def _insert(self, filename, stat, meta, error=None):
+        """ Add a file to the catalog.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the file from the search root.
+        stat : os.stat_result
+            The status of the file.
+        meta : dict
+            The meta-data of the file, unused when reading it failed.
+        error : Exception, optional
+            The error raised reading the meta-data, by default None.
+        """
+        if error is not None:
+            self._connection.execute(
+                'INSERT INTO files (path, size, mtime_ns, error) '
+                'VALUES (?, ?, ?, ?)',
+                (filename, stat.st_size, stat.st_mtime_ns,
+                 f'{type(error).__name__}: {error}'))
+            return
+        # numpy integers of HDF5 attributes are stored as ints
+        resolution = meta['resolution']
+        if resolution != '':
+            resolution = int(resolution)
+        number = self._connection.execute(
+            'INSERT INTO files (path, size, mtime_ns, archive, '
+            'instrument, observatory, resolution, obs_date) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (filename, stat.st_size, stat.st_mtime_ns, meta['archive'],
+             meta['instrument'], meta['observatory'], resolution,
+             meta['obs_date'])).lastrowid
+        self._connection.execute(
+            'INSERT INTO footprints VALUES (?, ?, ?, ?, ?)',
+            (number, *meta['xcoords'], *meta['ycoords']))
+
+    def _delete(self, filename):
+        """ Remove a file from the catalog.
+
+        Returns
+        -------
+        bool
+            Whether the file was in the catalog.
+        """
+        row = self._connection.execute(
+            'SELECT id FROM files WHERE path = ?', (filename,)).fetchone()
+        if row is None:
+            return False
+        self._connection.execute('DELETE FROM footprints WHERE id = ?', row)
+        self._connection.execute('DELETE FROM files WHERE id = ?', row)
+        return True
+
+    def query(self, xcoords=None, ycoords=None, *, start=None, stop=None,
+              instrument=None, resolution=None):
+        """ Find the files matching every given condition.
+
+        Parameters
+        ----------
+        xcoords : tuple, optional
+            Earth coordinates of a box along x the footprints must overlap,
+            by default any.
+        ycoords : tuple, optional
+            Earth coordinates of a box along y the footprints must overlap,
+            by default any.
+        start : str, optional
+            The first observation date, as 'YYYY-MM-DD' or 'YYYY-MM-DD
+            HH:MM:SS', by default any.
+        stop : str, optional
+            The last observation date, the whole day when only the date is
+            given, by default any.
+        instrument : str, optional
+            The name of the instrument, in any case, by default any.
+        resolution : int, optional
+            The resolution, by default any.
+
+        Returns
+        -------
+        list of strs
+            Paths of the files from the search root, ordered by observation
+            date.
+
+        Examples
+        --------
+        >>> from aigeanpy.catalog import Catalog
+        >>> with Catalog('aigeanpy/tests', ':memory:') as catalog:
+        ...     _ = catalog.update()
+        ...     catalog.query((500, 550), (160, 170), start='2023-01-04',
+        ...                   stop='2023-01-04', instrument='fand')
+        ['aigean_fan_20230104_150010.zip']
+        """
+        # pylint: disable = R0913
+        conditions, parameters = [], []
+        # footprints only touching the box along an edge don't overlap it
+        if xcoords is not None:
+            conditions.append('footprints.xmin < ? AND footprints.xmax > ?')
+            parameters += [xcoords[1], xcoords[0]]
+        if ycoords is not None:
+            conditions.append('footprints.ymin < ? AND footprints.ymax > ?')
+            parameters += [ycoords[1], ycoords[0]]
+        if start is not None:
+            conditions.append('files.obs_date >= ?')
+            parameters.append(start)
+        if stop is not None:
+            conditions.append('substr(files.obs_date, 1, length(?)) <= ?')
+            parameters += [stop, stop]
+        if instrument is not None:
+            conditions.append('files.instrument = ? COLLATE NOCASE')
+            parameters.append(instrument)
+        if resolution is not None:
+            conditions.append('files.resolution = ?')
+            parameters.append(resolution)
+
+        sql = 'SELECT files.path FROM footprints JOIN files USING (id)'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY files.obs_date, files.path'
+        return [path for path, in self._connection.execute(sql, parameters)]
+
+    def get_meta(self, filename):
+        """ Get the meta-data of a file stored in the catalog.
+
+        Parameters
+        ----------
+        filename : str
+            Path of the file from the search root.
+
+        Returns
+        -------
+        dict or None
+            Including info of data. keys including ('archive', 'instrument',
+            'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_date'),
+            None if the file isn't in the catalog or couldn't be read.
+        """
+        row = self._connection.execute(
+            'SELECT archive, instrument, observatory, resolution, xmin, xmax, '
+            'ymin, ymax, obs_date FROM footprints JOIN files USING (id) '
+            'WHERE files.path = ?', (filename,)).fetchone()
+        if row is None:
+            return None
+        return {'archive': row[0], 'instrument': row[1],
+                'observatory': row[2], 'resolution': row[3],
+                'xcoords': (int(row[4]), int(row[5])),
+                'ycoords': (int(row[6]), int(row[7])), 'obs_date': row[8]}
+
+    def failed(self):
+        """ Get the files which couldn't be read.
+
+        Returns
+        -------
+        dict
+            The error of each file, keyed by its path from the search root.
+        """
+        return dict(self._connection.execute(
+            'SELECT path, error FROM files WHERE error IS NOT NULL '
+            'ORDER BY path'))
+
+    def close(self):
+        """ Close the database.
+        """
+        self._connection.close()
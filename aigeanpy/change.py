@@ -0,0 +1,269 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from aigeanpy.satmap import SatMap
+from aigeanpy.coords import _pixel_to_earth_tuple
+from aigeanpy.spatial import overlap
+
+
+def changes(before, after, threshold, min_pixels=1, connectivity=2):
+    """ Find the regions which changed between two SatMaps.
+
+    The SatMaps are differenced as ``after - before``, the pixels changing
+    by more than the threshold are labelled into connected regions, and
+    only a summary of each region is kept.
+
+    Parameters
+    ----------
+    before : SatMap
+        The SatMap observed first.
+    after : SatMap
+        The SatMap observed last, on another day.
+    threshold : float
+        The smallest absolute change of a changed pixel, excluded.
+    min_pixels : int, optional
+        The number of pixels of the smallest region kept, by default 1.
+    connectivity : int, optional
+        1 to only connect the pixels sharing an edge, 2 to connect the
+        diagonal pixels too, by default 2.
+
+    Returns
+    -------
+    list of dicts
+        The regions, keys including ('before', 'after', 'xcoords',
+        'ycoords', 'pixels', 'mean_change', 'max_change'). The coordinates
+        are the earth coordinates of the bounding box of the region, and
+        'max_change' is the change of the largest magnitude.
+
+    Raises
+    ------
+    ValueError
+        2 data must in different days
+    ValueError
+        Two data must overlap
+
+    Examples
+    --------
+    >>> from aigeanpy.satmap import get_satmap
+    >>> from aigeanpy.change import changes
+    >>> lir1 = get_satmap('aigean_lir_20221205_191610.asdf')
+    >>> lir2 = get_satmap('aigean_lir_20230104_145310.asdf')
+    >>> regions = changes(lir1, lir2, threshold=400)
+    >>> [(region['xcoords'], region['ycoords']) for region in regions]
+    [((500, 530), (200, 230)), ((590, 700), (230, 290))]
+    >>> regions[1]['pixels'], round(regions[1]['max_change'])
+    (6, -500)
+    """
+    difference = after - before
+    return _regions(difference.data, difference.meta,
+                    (before.meta['obs_date'], after.meta['obs_date']),
+                    threshold=threshold, min_pixels=min_pixels,
+                    connectivity=connectivity)
+
+
+def detect_changes(satmaps, threshold, *, min_pixels=1, connectivity=2,
+                   workers=1, processes=False):
+    """ Find the regions which changed between consecutive observations.
+
+    The SatMaps are ordered by observation date, and each one is compared
+    with the next one observed on another day whose footprint overlaps it.
+
+    Parameters
+    ----------
+    satmaps : list of SatMaps
+        The SatMaps, of the same resolution.
+    threshold : float
+        The smallest absolute change of a changed pixel, excluded.
+    min_pixels : int, optional
+        The number of pixels of the smallest region kept, by default 1.
+    connectivity : int, optional
+        1 or 2, by default 2. See changes.
+    workers : int, optional
+        Number of pairs compared at once, by default 1.
+    processes : bool, optional
+        Whether to use a process pool instead of a thread pool, by default
+        False.
+
+    Returns
+    -------
+    list of dicts
+        The regions of every pair, in the order of the pairs. See changes.
+
+    Raises
+    ------
+    TypeError
+        Workers must be int type
+    ValueError
+        Workers must larger than 0
+    TypeError
+        Satmap must in SatMap type
+    """
+    # pylint: disable = R0913
+    if not isinstance(workers, int):
+        raise TypeError('Workers must be int type')
+    if workers <= 0:
+        raise ValueError('Workers must larger than 0')
+    for satmap in satmaps:
+        if not isinstance(satmap, SatMap):
+            raise TypeError('Satmap must in SatMap type')
+
+    pairs = _pairs(satmaps)
+    compare = partial(_pair_changes, threshold=threshold,
+                      min_pixels=min_pixels, connectivity=connectivity)
+    if workers == 1:
+        results = list(map(compare, pairs))
+    else:
+        executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with executor(max_workers=workers) as pool:
+            # map keeps the results in the same order as the pairs
+            results = list(pool.map(compare, pairs))
+    return [region for regions in results for region in regions]
+
+
+def stack_changes(stack, threshold, lag=1, min_pixels=1, connectivity=2):
+    """ Find the regions which changed between the time steps of a stack.
+
+    All the time steps are differenced at once with SatMapStack.diff, and
+    the pixels without data in either time step never change.
+
+    Parameters
+    ----------
+    stack : SatMapStack
+        The stack.
+    threshold : float
+        The smallest absolute change of a changed pixel, excluded.
+    lag : int, optional
+        The number of time steps between the data compared, by default 1.
+    min_pixels : int, optional
+        The number of pixels of the smallest region kept, by default 1.
+    connectivity : int, optional
+        1 or 2, by default 2. See changes.
+
+    Returns
+    -------
+    list of dicts
+        The regions of every pair of time steps, in time order. See changes.
+
+    Examples
+    --------
+    >>> from aigeanpy.satmap import get_satmap
+    >>> from aigeanpy.temporal import SatMapStack
+    >>> from aigeanpy.change import stack_changes
+    >>> lir1 = get_satmap('aigean_lir_20221205_191610.asdf')
+    >>> lir2 = get_satmap('aigean_lir_20230104_145310.asdf')
+    >>> stack = SatMapStack([lir1, lir2])
+    >>> [region['pixels'] for region in stack_changes(stack, 400)]
+    [1, 6]
+    """
+    differences = stack.diff(lag).filled(0)
+    regions = []
+    for index, difference in enumerate(differences):
+        regions += _regions(difference, stack.meta,
+                            (stack.obs_dates[index],
+                             stack.obs_dates[index + lag]),
+                            threshold=threshold, min_pixels=min_pixels,
+                            connectivity=connectivity)
+    return regions
+
+
+def _pairs(satmaps):
+    """ Pair each SatMap with the next one observed on another day whose
+    footprint overlaps it.
+
+    Parameters
+    ----------
+    satmaps : list of SatMaps
+        The SatMaps.
+
+    Returns
+    -------
+    list of tuples
+        The pairs, ordered by the observation date of their first SatMap.
+    """
+    satmaps = sorted(satmaps, key=lambda satmap: satmap.meta['obs_date'])
+    pairs = []
+    for index, before in enumerate(satmaps):
+        footprint = (before.meta['xcoords'], before.meta['ycoords'])
+        for after in satmaps[index + 1:]:
+            if after.meta['obs_date'][:10] != before.meta['obs_date'][:10] \
+                    and overlap(footprint, (after.meta['xcoords'],
+                                            after.meta['ycoords'])):
+                pairs.append((before, after))
+                break
+    return pairs
+
+
+def _pair_changes(pair, threshold, min_pixels, connectivity):
+    """ Find the regions which changed between a pair of SatMaps.
+    """
+    return changes(*pair, threshold, min_pixels, connectivity)
+
+
+def _regions(difference, meta, dates, *, threshold, min_pixels,
+             connectivity):
+    """ Label the changed pixels of a difference into regions.
+
+    Parameters
+    ----------
+    difference : array
+        The difference.
+    meta : dict
+        Meta-data of the difference, giving its earth coordinates.
+    dates : tuple
+        Observation dates of the data observed first and last.
+    threshold : float
+        The smallest absolute change of a changed pixel, excluded.
+    min_pixels : int
+        The number of pixels of the smallest region kept.
+    connectivity : int
+        1 or 2.
+
+    Returns
+    -------
+    list of dicts
+        The regions, ordered by the first pixel of each of them.
+    """
+    # pylint: disable = R0913
+    import skimage.measure  # pylint: disable = C0415
+
+    labels = skimage.measure.label(np.abs(difference) > threshold,
+                                   connectivity=connectivity)
+    return [_region(region, difference, meta, dates)
+            for region in skimage.measure.regionprops(labels)
+            if region.area >= min_pixels]
+
+
+def _region(region, difference, meta, dates):
+    """ Summarise a labelled region of a difference.
+
+    Parameters
+    ----------
+    region : RegionProperties
+        The region.
+    difference : array
+        The difference.
+    meta : dict
+        Meta-data of the difference, giving its earth coordinates.
+    dates : tuple
+        Observation dates of the data observed first and last.
+
+    Returns
+    -------
+    dict
+        The region. See changes.
+    """
+    values = difference[region.slice][region.image]
+    # bbox is (min_row, min_col, max_row, max_col)
+    min_row, min_col, max_row, max_col = region.bbox
+    xcoords, ycoords = _pixel_to_earth_tuple(
+        (min_col, max_col), (min_row, max_row), meta['resolution'])
+    offset = (meta['xcoords'][0], meta['ycoords'][0])
+    # the last pixels may stick out of the footprint
+    return {'before': dates[0], 'after': dates[1],
+            'xcoords': (xcoords[0] + offset[0],
+                        min(xcoords[1] + offset[0], meta['xcoords'][1])),
+            'ycoords': (ycoords[0] + offset[1],
+                        min(ycoords[1] + offset[1], meta['ycoords'][1])),
+            'pixels': int(region.area),
+            'mean_change': float(values.mean()),
+            'max_change': float(values[np.abs(values).argmax()])}
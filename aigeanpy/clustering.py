@@ -4,6 +4,7 @@ import argparse
 from math import sqrt
 from random import randrange
 from pathlib import Path
+from aigeanpy.fileindex import find_file
 
 
 class Tool4Kmeans:
@@ -15,7 +16,7 @@ class Tool4Kmeans:
 
     # with safty open
     def file_reading(self, file_path):
-        with open(sorted(Path().rglob(file_path))[0], "r") as file:
+        with open(find_file(file_path), "r") as file:
             lines = file.readlines()
         return lines
 
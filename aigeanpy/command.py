@@ -9,7 +9,9 @@ from pathlib import Path
 from os import getcwd, chdir
 from numpy import argmax, inf
 from aigeanpy.net import query_isa, download_isa
-from aigeanpy.satmap import get_satmap
+from aigeanpy.satmap import get_satmap, get_satmaps, read_meta, load_many, \
+    mosaic_many
+from aigeanpy.catalog import Catalog
 CWD = Path(getcwd())
 
 
@@ -36,27 +38,31 @@ def get_latest_obs(query):
     return latest_obs
 
 
-def output_info(files, get_satmap, DIR):
+def output_info(files, read_meta, DIR, workers=1):
     """ Outputs metadata information from the specified files.
 
     Parameters
     ----------
     files : list of strs
         List of filenames from which to extract metadata.
-    get_satmap : function
-        Function to get aigeanpy.satmap.SatMap objects.
+    read_meta : function
+        Function to get the metadata dict of a file, as
+        aigeanpy.satmap.read_meta.
     DIR : Path
         Path object denoting system directory.
+    workers : int, optional
+        Number of files read at once, by default 1.
     """
 
     failed = ''
     missing = ''
 
-    for file in files:
-        # Try processing the file, if not store the missing/failed file name
-        try:
-            meta = get_satmap(file).meta
-        except:  # noqa
+    # Processing all the files, storing the ones that failed
+    metas, errors = load_many(read_meta, files, workers)
+
+    for index, (file, meta) in enumerate(zip(files, metas)):
+        # If the file failed, store the missing/failed file name
+        if index in errors:
             # Checking whether file exits
             file_path = DIR/file
             if not file_path.is_file():
@@ -105,10 +111,6 @@ def unordered_mosaic(satmaps, resolution=None):
         aigeanpy.satmap.SatMap object with the mosaic.
     """
 
-    processed = []
-    store_err = []
-    mosaic = None
-
     # Choosing the smallest resolution among the satmap list if not specified
     if resolution is None:
         resolution = inf
@@ -116,59 +118,16 @@ def unordered_mosaic(satmaps, resolution=None):
             if satmap.meta['resolution'] < resolution:
                 resolution = int(satmap.meta['resolution'])
 
-    # Getting mosaic from the first two available satmaps
-    for satmap in satmaps:
-        for other_satmap in satmaps:
-            if satmap != other_satmap:
-                try:
-                    mosaic = satmap.mosaic(other_satmap, resolution)
-                    processed += [satmap, other_satmap]
-                    # Breaking the inner for loop
-                    break
-                except Exception as err:
-                    store_err += [f'{type(err).__name__}: {str(err)}']
-        else:
-            # Continuing if inner loop wasn't broken.
-            continue
-        # Inner loop was broken, breaking outer.
-        break
-
-    # Getting mosaic from the rest of satmaps
-    if mosaic:
-        # (n - 2) satmaps to be processed |
-        for n in range(len(satmaps) - 2):  # pylint: disable = W0612
-            for satmap in satmaps:
-                if satmap not in processed:
-                    try:
-                        mosaic = mosaic.mosaic(satmap)
-                        processed += [satmap]
-                        # Breaking the inner for loop
-                        break
-                    except Exception as err:
-                        store_err += [f'{type(err).__name__}: {str(err)}']
-    # Only keeping unique error messages
-    store_err = list(set(store_err))
-
-    # If at least one of the input files fails, show relevant message. Else
-    # return the mosaic.
-    if len(processed) != len(satmaps):
-        # If only error is 'ValueError: Two data must overlap', then print on
-        # screen
-        overlap_err = "ValueError: Two data must overlap"
-        if len(store_err) == 1 and store_err[0] == overlap_err:
-            err_info = overlap_err + '\n'
-        # Else print only non-overlap-related errors
-        else:
-            err_info = ''
-            for err in store_err:
-                # Only keeping non-overlap-related errors
-                err_info += f'{err}\n' if err != overlap_err else ''
+    # Building the mosaic in a single pass. If the footprints or the
+    # resolution don't allow it, show relevant message.
+    try:
+        mosaic = mosaic_many(satmaps, resolution)
+    except Exception as err:
         sys.stderr.write("It was not possible to build a mosaic from the "
                          "specified files and resolution. The exceptions "
-                         f"were:\n{err_info}")
+                         f"were:\n{type(err).__name__}: {str(err)}\n")
         sys.exit(1)
-    else:
-        return mosaic
+    return mosaic
 
 
 def today():
@@ -245,10 +204,12 @@ def metadata():
                             formatter_class=ArgumentDefaultsHelpFormatter)
     parser.add_argument('files', nargs='+', metavar='<filename>',
                         help="Name of the file(s).")
+    parser.add_argument('--workers', '-w', metavar='<workers>', default=1,
+                        type=int, help="Number of files read at once.")
     arguments = parser.parse_args()
-    files = arguments.files
+    files, workers = arguments.files, arguments.workers
 
-    output_info(files, get_satmap, CWD)
+    output_info(files, read_meta, CWD, workers)
 
 
 def mosaic():
@@ -269,15 +230,82 @@ def mosaic():
                         default=None, type=int, help="Resolution of the "
                         "mosaic. If set, make sure it is compatible with "
                         "the given files.")
+    parser.add_argument('--workers', '-w', metavar='<workers>', default=1,
+                        type=int, help="Number of files loaded at once.")
     arguments = parser.parse_args()
-    resolution = arguments.resolution
+    resolution, workers = arguments.resolution, arguments.workers
     files = arguments.file_1 + arguments.files_2
 
-    # Changing to current working directory and getting mosaic
+    # Changing to current working directory and loading all the files. The
+    # data is memory-mapped, so only the mosaic is held in memory
     chdir(CWD)
-    satmaps = list(map(get_satmap, files))
+    satmaps, errors = get_satmaps(files, workers, mmap=True)
+    if errors:
+        err_info = ''
+        for index, err in errors.items():
+            err_info += (f' - {files[index]}: {type(err).__name__}: '
+                         f'{str(err)}\n')
+        sys.stderr.write("These files couldn't be loaded\n"
+                         f"{err_info}")
+        sys.exit(1)
+
+    # Getting mosaic
     mosaic = unordered_mosaic(satmaps, resolution)
 
     # Downloading mosaic as PNG
     filename = mosaic.visualise(save=True)
     sys.stdout.write(f'Name of saved PNG: {filename}')
+
+
+def catalog():
+    ''' Finds the Aigean archive files matching a box, dates or instrument.
+
+    For help in using this command, type in bash:
+        $ aigean_catalog -h
+    '''
+
+    parser = ArgumentParser(description="Finds the files under a directory "
+                            "matching every given condition, using a catalog "
+                            "of their metadata which is updated first.",
+                            formatter_class=ArgumentDefaultsHelpFormatter)
+    parser.add_argument('--root', metavar='<directory>', default='.',
+                        type=str, help="Directory the files are searched in.")
+    parser.add_argument('--database', '-d', metavar='<database>',
+                        default=None, type=str, help="Path of the catalog. "
+                        "By default aigean_catalog.sqlite in the directory.")
+    parser.add_argument('--xcoords', '-x', nargs=2, metavar='<x>',
+                        default=None, type=float, help="Earth coordinates of "
+                        "the box along x.")
+    parser.add_argument('--ycoords', '-y', nargs=2, metavar='<y>',
+                        default=None, type=float, help="Earth coordinates of "
+                        "the box along y.")
+    parser.add_argument('--start', '-s', metavar='<date>', default=None,
+                        type=str, help="First observation date, as "
+                        "YYYY-MM-DD.")
+    parser.add_argument('--stop', '-e', metavar='<date>', default=None,
+                        type=str, help="Last observation date, as "
+                        "YYYY-MM-DD.")
+    parser.add_argument('--instrument', '-i', metavar='<instrument>',
+                        default=None, type=str, help="Name of the instrument.")
+    parser.add_argument('--resolution', '-r', metavar='<resolution>',
+                        default=None, type=int, help="Resolution of the "
+                        "files.")
+    parser.add_argument('--no-update', default=False, action='store_true',
+                        help="Query the catalog without updating it.")
+    parser.add_argument('--workers', '-w', metavar='<workers>', default=1,
+                        type=int, help="Number of files read at once.")
+    arguments = parser.parse_args()
+
+    # The paths are printed from the current working directory, so they can
+    # be given straight to the other commands
+    chdir(CWD)
+    with Catalog(arguments.root, arguments.database) as file_catalog:
+        if not arguments.no_update:
+            file_catalog.update(arguments.workers)
+        paths = file_catalog.query(arguments.xcoords, arguments.ycoords,
+                                   start=arguments.start,
+                                   stop=arguments.stop,
+                                   instrument=arguments.instrument,
+                                   resolution=arguments.resolution)
+    for path in paths:
+        sys.stdout.write(f'{Path(arguments.root)/path}\n')
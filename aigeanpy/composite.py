@@ -0,0 +1,328 @@
+# Disabling too-many-instance-attributes
+# pylint: disable = R0902
+from datetime import datetime
+import numpy as np
+from aigeanpy.satmap import SatMap
+from aigeanpy.coords import _earth_to_pixel_tuple
+
+MODES = ('last', 'mean', 'max', 'latest')
+
+
+class Compositor:
+    """
+    Compositor blends many SatMaps into one canvas allocated once. SatMaps
+    are added one at a time and blended in place, and the composite is
+    finalized in one pass at the end.
+
+    Blending modes:
+
+    - 'last': the data added last wins, as SatMap.__add__ does.
+    - 'mean': the mean of the data covering each pixel.
+    - 'max': the largest data covering each pixel.
+    - 'latest': the data with the most recent obs_date wins, the data added
+      last among equal dates.
+
+    Attributes
+    ----------
+    meta : dict
+        Meta-data of the composite. The archive, instrument and observatory
+        are the ones of the first SatMap added.
+    mode : str
+        The blending mode.
+    canvas : array
+        The blended data.
+    count : array
+        Number of SatMaps covering each pixel.
+
+    Methods
+    -------
+    for_satmaps(satmaps, mode='last', resolution=None)
+        Create a Compositor covering the footprints of SatMaps.
+    add(satmap, method='auto')
+        Blend a SatMap into the canvas.
+    finalize(fill_value=0.)
+        Get the composite.
+    """
+
+    def __init__(self, xcoords, ycoords, resolution, mode='last'):
+        """ Initiate the Compositor class.
+
+        Parameters
+        ----------
+        xcoords : tuple
+            Earth coordinates of the canvas along x.
+        ycoords : tuple
+            Earth coordinates of the canvas along y.
+        resolution : int
+            The resolution of the canvas.
+        mode : str, optional
+            The blending mode, 'last', 'mean', 'max' or 'latest', by default
+            'last'.
+
+        Raises
+        ------
+        ValueError
+            Mode must be one of last, mean, max or latest
+        TypeError
+            Resolution must be int type
+        ValueError
+            Resolution must larger than 0
+        """
+        if mode not in MODES:
+            raise ValueError('Mode must be one of last, mean, max or latest')
+        if not isinstance(resolution, (int, np.integer)):
+            raise TypeError('Resolution must be int type')
+        if resolution <= 0:
+            raise ValueError('Resolution must larger than 0')
+
+        self.mode = mode
+        self.meta = {'archive': '', 'instrument': '', 'observatory': '',
+                     'resolution': int(resolution),
+                     'xcoords': tuple(xcoords), 'ycoords': tuple(ycoords),
+                     'obs_date': ''}
+        data_px, data_py = _earth_to_pixel_tuple(
+            (0, xcoords[1] - xcoords[0]), (0, ycoords[1] - ycoords[0]),
+            resolution)
+        shape = (data_py[1] - data_py[0], data_px[1] - data_px[0])
+        # empty pixels of a max composite are below any data
+        self.canvas = np.full(shape, -np.inf if mode == 'max' else 0.)
+        self.count = np.zeros(shape, dtype=np.int32)
+        # obs_date of the data of each pixel, as a timestamp
+        self._dates = np.full(shape, -np.inf) if mode == 'latest' else None
+        self._latest = None
+        self._type = None
+        self._finalized = False
+
+    @classmethod
+    def for_satmaps(cls, satmaps, mode='last', resolution=None):
+        """ Create a Compositor covering the footprints of SatMaps.
+
+        Only the meta-data is read, the SatMaps are not added.
+
+        Parameters
+        ----------
+        satmaps : list of SatMaps
+            The SatMaps.
+        mode : str, optional
+            The blending mode, by default 'last'.
+        resolution : int, optional
+            The resolution of the canvas, by default the smallest resolution
+            of the SatMaps.
+
+        Returns
+        -------
+        Compositor
+            A new Compositor.
+
+        Raises
+        ------
+        ValueError
+            At least one SatMap is needed
+        """
+        if len(satmaps) == 0:
+            raise ValueError('At least one SatMap is needed')
+        metas = [satmap.meta for satmap in satmaps]
+        if resolution is None:
+            resolution = min(meta['resolution'] for meta in metas)
+        xcoords = (min(meta['xcoords'][0] for meta in metas),
+                   max(meta['xcoords'][1] for meta in metas))
+        ycoords = (min(meta['ycoords'][0] for meta in metas),
+                   max(meta['ycoords'][1] for meta in metas))
+        return cls(xcoords, ycoords, resolution, mode)
+
+    def add(self, satmap, method='auto'):
+        """ Blend a SatMap into the canvas.
+
+        The SatMap is resampled to the resolution of the canvas, and only
+        the part of it on the canvas is blended.
+
+        Parameters
+        ----------
+        satmap : SatMap
+            The SatMap.
+        method : str, optional
+            The resampling method, by default 'auto'. See
+            aigeanpy.resample.resample.
+
+        Raises
+        ------
+        TypeError
+            Satmap must in SatMap type
+        ValueError
+            Compositor is finalized
+        ValueError
+            Obs_date must be an ISO date in latest mode
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.composite import Compositor
+        >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> compositor = Compositor((450, 700), (150, 200), 5, mode='mean')
+        >>> compositor.add(fand)
+        >>> compositor.add(fand)
+        >>> composite = compositor.finalize()
+        >>> (composite.data[:, :45] == fand.data).all()
+        True
+        >>> compositor.count.max(), compositor.count[:, 45:].max()
+        (2, 0)
+        """
+        if not isinstance(satmap, SatMap):
+            raise TypeError('Satmap must in SatMap type')
+        if self._finalized:
+            raise ValueError('Compositor is finalized')
+        timestamp = _timestamp(satmap.meta['obs_date']) \
+            if self.mode == 'latest' else None
+
+        resolution = self.meta['resolution']
+        if satmap.meta['resolution'] == resolution:
+            data = satmap.data
+        else:
+            data = satmap.resampled(resolution, method)
+        if self._type is None:
+            self._type = type(satmap)
+            for key in ('archive', 'instrument', 'observatory', 'obs_date'):
+                self.meta[key] = satmap.meta[key]
+
+        # pixels of the data on the canvas
+        offset = (self.meta['xcoords'][0], self.meta['ycoords'][0])
+        satmap_px, satmap_py = _earth_to_pixel_tuple(
+            (satmap.meta['xcoords'][0] - offset[0],
+             satmap.meta['xcoords'][1] - offset[0]),
+            (satmap.meta['ycoords'][0] - offset[1],
+             satmap.meta['ycoords'][1] - offset[1]), resolution)
+        rows = (max(satmap_py[0], 0), min(satmap_py[1], self.canvas.shape[0]))
+        cols = (max(satmap_px[0], 0), min(satmap_px[1], self.canvas.shape[1]))
+        if rows[0] >= rows[1] or cols[0] >= cols[1]:
+            return
+        data = data[rows[0] - satmap_py[0]:rows[1] - satmap_py[0],
+                    cols[0] - satmap_px[0]:cols[1] - satmap_px[0]]
+        canvas = self.canvas[rows[0]:rows[1], cols[0]:cols[1]]
+
+        # blend the data into the canvas view in place
+        if self.mode == 'last':
+            canvas[...] = data
+        elif self.mode == 'mean':
+            canvas += data
+        elif self.mode == 'max':
+            np.maximum(canvas, data, out=canvas)
+        else:
+            self._blend_latest(data, (rows, cols), satmap.meta['obs_date'],
+                               timestamp)
+        self.count[rows[0]:rows[1], cols[0]:cols[1]] += 1
+
+    def _blend_latest(self, data, window, date, timestamp):
+        """ Blend data into a window of the canvas where it is more recent.
+
+        Parameters
+        ----------
+        data : array
+            The data, of the shape of the window.
+        window : tuple
+            First and last rows, and first and last columns, of the window.
+        date : str
+            The obs_date of the data.
+        timestamp : float
+            The POSIX timestamp of the obs_date.
+        """
+        rows, cols = window
+        canvas = self.canvas[rows[0]:rows[1], cols[0]:cols[1]]
+        dates = self._dates[rows[0]:rows[1], cols[0]:cols[1]]
+        newer = dates <= timestamp
+        canvas[newer] = data[newer]
+        dates[newer] = timestamp
+        if self._latest is None or date > self._latest:
+            self._latest = date
+
+    def finalize(self, fill_value=0.):
+        """ Get the composite.
+
+        The canvas is finalized in place and shared with the SatMap, so no
+        SatMap can be added afterwards.
+
+        Parameters
+        ----------
+        fill_value : float, optional
+            The value of the pixels without data, by default 0.
+
+        Returns
+        -------
+        SatMap
+            A new SatMap of the type of the first SatMap added, holding the
+            composite. The obs_date of a 'latest' composite is the most
+            recent one.
+
+        Raises
+        ------
+        ValueError
+            At least one SatMap is needed
+        """
+        if self._type is None:
+            raise ValueError('At least one SatMap is needed')
+        if not self._finalized:
+            empty = self.count == 0
+            if self.mode == 'mean':
+                np.divide(self.canvas, self.count, out=self.canvas,
+                          where=~empty)
+            self.canvas[empty] = fill_value
+            self._finalized = True
+
+        meta = self.meta.copy()
+        if self.mode == 'latest':
+            meta['obs_date'] = self._latest
+        satmap = self._type(meta, self.canvas)
+        satmap.extra = True
+        return satmap
+
+
+def _timestamp(date):
+    """ Get the POSIX timestamp of an obs_date.
+
+    Raises
+    ------
+    ValueError
+        Obs_date must be an ISO date in latest mode
+    """
+    try:
+        return datetime.fromisoformat(date).timestamp()
+    except (TypeError, ValueError):
+        raise ValueError('Obs_date must be an ISO date in latest mode')
+
+
+def composite(satmaps, mode='last', resolution=None, fill_value=0.):
+    """ Blend SatMaps into one composite covering all of them.
+
+    Parameters
+    ----------
+    satmaps : list of SatMaps
+        The SatMaps, blended in order.
+    mode : str, optional
+        The blending mode, 'last', 'mean', 'max' or 'latest', by default
+        'last'. See Compositor.
+    resolution : int, optional
+        The resolution of the composite, by default the smallest resolution
+        of the SatMaps.
+    fill_value : float, optional
+        The value of the pixels without data, by default 0.
+
+    Returns
+    -------
+    SatMap
+        A new SatMap holding the composite.
+
+    Examples
+    --------
+    >>> from aigeanpy.satmap import get_satmap
+    >>> from aigeanpy.composite import composite
+    >>> fand1 = get_satmap('aigean_fan_20230104_150010.zip')
+    >>> fand2 = get_satmap('aigean_fan_20230112_074702.zip')
+    >>> latest = composite([fand2, fand1], mode='latest')
+    >>> latest.meta['xcoords'], latest.meta['obs_date']
+    ((450, 825), '2023-01-12 07:47:02')
+    >>> (latest.data[:, -45:] == fand2.data).all()
+    True
+    """
+    compositor = Compositor.for_satmaps(satmaps, mode, resolution)
+    for satmap in satmaps:
+        compositor.add(satmap)
+    return compositor.finalize(fill_value)
@@ -0,0 +1,319 @@
+import numpy as np
+
+
+def _earth_to_pixel_tuple(x, y, resolution):
+    """ Change earth coordinate to pixel coordinate.
+
+    Parameters
+    ----------
+    x : tuple
+        Earth coordinate, xcoords.
+    y : tuple
+        Earth coordinate, ycoords.
+    resolution : int
+        Data resolution
+
+    Returns
+    -------
+    tuple
+        Pixel coordinate, xcoords.
+    tuple
+        Pixel coordinate, ycoords. Positive y-values going downwards.
+    """
+    # change earth coords to the pixel coords by
+    # dividing resolution and move the coords to the origin
+    start = earth_to_pixel(x[0], y[0], resolution)
+    stop = earth_to_pixel(x[1], y[1], resolution)
+    pixel_xcoords = [start[0], stop[0]]
+    # Filp the Y-axis to achieve: In the top-left
+    # corner and positive y-values going downwards.
+    pixel_ycoords = [start[1], stop[1]]
+    if (pixel_xcoords[1]-pixel_xcoords[0]) != round((x[1]-x[0])/resolution):
+        if pixel_xcoords[0] == 0:
+            pixel_xcoords[1] = pixel_xcoords[0] + round((x[1]-x[0])/resolution)
+        else:
+            pixel_xcoords[0] = pixel_xcoords[1] - round((x[1]-x[0])/resolution)
+    if (pixel_ycoords[1]-pixel_ycoords[0]) != round((y[1]-y[0])/resolution):
+        if pixel_ycoords[0] == 0:
+            pixel_ycoords[1] = pixel_ycoords[0] + round((y[1]-y[0])/resolution)
+        else:
+            pixel_ycoords[0] = pixel_ycoords[1] - round((y[1]-y[0])/resolution)
+    return tuple(pixel_xcoords), tuple(pixel_ycoords)
+
+
+def earth_to_pixel(x, y, resolution):
+    """ Change earth coordinate to pixel coordinate.
+
+    Arrays of coordinates are changed in one call, rounding halves to even
+    as round does for single coordinates.
+
+    Parameters
+    ----------
+    x : int or array
+        Earth coordinate, xcoords.
+    y : int or array
+        Earth coordinate, ycoords.
+    resolution : int
+        Data resolution.
+
+    Returns
+    -------
+    int or array
+        Pixel coordinate, xcoords.
+    int or array
+        Pixel coordinate, ycoords.
+
+    Examples
+    --------
+    >>> from aigeanpy.coords import earth_to_pixel
+    >>> x = 10
+    >>> y = 20
+    >>> resolution = 5
+    >>> earth_to_pixel(x,y,resolution)
+    (2, 4)
+    >>> earth_to_pixel([10, 12.5, 17.5], [20, 21, 22], resolution)
+    (array([2, 2, 4]), array([4, 4, 4]))
+    """
+    if np.ndim(x) == 0 and np.ndim(y) == 0:
+        return round(x/resolution), round(y/resolution)
+    return (np.rint(np.divide(x, resolution)).astype(np.int64),
+            np.rint(np.divide(y, resolution)).astype(np.int64))
+
+
+def earth_to_pixel_footprints(xcoords, ycoords, resolution):
+    """ Change the earth coordinates of many footprints to pixel coordinates.
+
+    The vectorized _earth_to_pixel_tuple: each footprint keeps its number of
+    pixels as it does, so the results are the same.
+
+    Parameters
+    ----------
+    xcoords : array
+        Earth coordinates of the footprints along x, of shape (n, 2).
+    ycoords : array
+        Earth coordinates of the footprints along y, of shape (n, 2).
+    resolution : int
+        Data resolution.
+
+    Returns
+    -------
+    array
+        Pixel coordinates along x, of shape (n, 2).
+    array
+        Pixel coordinates along y, of shape (n, 2).
+
+    Examples
+    --------
+    >>> from aigeanpy.coords import earth_to_pixel_footprints
+    >>> px, py = earth_to_pixel_footprints([(0, 45), (15, 40)],
+    ...                                    [(0, 20), (5, 25)], 10)
+    >>> px.tolist(), py.tolist()
+    ([[0, 4], [2, 4]], [[0, 2], [0, 2]])
+    """
+    pixel_coords = []
+    for coords in (xcoords, ycoords):
+        coords = np.asarray(coords).reshape(-1, 2)
+        start, stop = earth_to_pixel(coords[:, 0], coords[:, 1], resolution)
+        pixels = np.stack([start, stop], axis=1)
+        # keep the number of pixels of the footprint
+        width = np.rint((coords[:, 1] - coords[:, 0]) / resolution)
+        wrong = pixels[:, 1] - pixels[:, 0] != width
+        from_start = wrong & (pixels[:, 0] == 0)
+        from_stop = wrong & (pixels[:, 0] != 0)
+        pixels[from_start, 1] = pixels[from_start, 0] + width[from_start]
+        pixels[from_stop, 0] = pixels[from_stop, 1] - width[from_stop]
+        pixel_coords.append(pixels)
+    return pixel_coords[0], pixel_coords[1]
+
+
+def _pixel_to_earth_tuple(x, y, resolution):
+    """ Change pixel coordinate to earth coordinate.
+
+    Parameters
+    ----------
+    x : tuple
+        Pixel coordinate, xcoords.
+    y : tuple
+        Pixel coordinate, ycoords.
+    resolution : int
+        Data resolution.
+
+    Returns
+    -------
+    tuple
+        Earth coordinate, xcoords.
+    tuple
+        Earth coordinate, ycoords.
+    """
+    # change earth coords to the pixel coords by dividing resolution and move
+    # the coords to the origin
+    xcoords = (pixel_to_earth(x[0], y[0], resolution)[0],
+               pixel_to_earth(x[1], y[1], resolution)[0])
+    # Filp the Y-axis to achieve: In the top-left corner and positive y-values
+    # going downwards.
+    ycoords = (pixel_to_earth(x[0], y[0], resolution)[1],
+               pixel_to_earth(x[1], y[1], resolution)[1])
+    return xcoords, ycoords
+
+
+def pixel_to_earth(x, y, resolution):
+    """ Change pixel coordinate to earth coordinate.
+
+    Arrays of coordinates, e.g. the (n, 2) pixel coordinates of many
+    footprints, are changed in one call.
+
+    Parameters
+    ----------
+    x : int or array
+        Pixel coordinate, xcoords.
+    y : int or array
+        Pixel coordinate, ycoords.
+    resolution : int
+        Data resolution.
+
+    Returns
+    -------
+    int or array
+        Earth coordinate, xcoords.
+    int or array
+        Earth coordinate, ycoords.
+
+    Examples
+    --------
+    >>> from aigeanpy.coords import pixel_to_earth
+    >>> x = 10
+    >>> y = 20
+    >>> resolution = 5
+    >>> pixel_to_earth(x,y,resolution)
+    (50, 100)
+    >>> pixel_to_earth([10, 11], [20, 21], resolution)
+    (array([50, 55]), array([100, 105]))
+    """
+    if np.ndim(x) == 0 and np.ndim(y) == 0:
+        return x * resolution, y * resolution
+    return np.multiply(x, resolution), np.multiply(y, resolution)
+
+
+def _pixel_window(meta, shape, xcoords=None, ycoords=None):
+    """ Change an earth coordinates window to the pixels of the data.
+
+    Parameters
+    ----------
+    meta : dict
+        Meta-data of the data.
+    shape : tuple
+        Shape of the data.
+    xcoords : tuple, optional
+        Earth coordinates of the window along x, by default the whole data.
+    ycoords : tuple, optional
+        Earth coordinates of the window along y, by default the whole data.
+
+    Returns
+    -------
+    slice
+        Rows of the data in the window.
+    slice
+        Columns of the data in the window.
+    dict
+        Meta-data updated with the earth coordinates of the window pixels.
+
+    Raises
+    ------
+    ValueError
+        Window must overlap the data
+    """
+    if xcoords is None and ycoords is None:
+        return slice(None), slice(None), meta
+    if xcoords is None:
+        xcoords = meta['xcoords']
+    if ycoords is None:
+        ycoords = meta['ycoords']
+
+    # earth coords of the window inside the data
+    data_ex = (max(xcoords[0], meta['xcoords'][0]),
+               min(xcoords[1], meta['xcoords'][1]))
+    data_ey = (max(ycoords[0], meta['ycoords'][0]),
+               min(ycoords[1], meta['ycoords'][1]))
+    if not (data_ex[1] > data_ex[0] and data_ey[1] > data_ey[0]):
+        raise ValueError('Window must overlap the data')
+    # earth distance from data bottom left to the origin(0,0)
+    offset = (meta['xcoords'][0], meta['ycoords'][0])
+    resolution = meta['resolution']
+
+    # change earth coords to pixel coords
+    data_px, data_py = _earth_to_pixel_tuple(
+        (data_ex[0]-offset[0], data_ex[1]-offset[0]),
+        (data_ey[0]-offset[1], data_ey[1]-offset[1]), resolution)
+    # keep at least one pixel, inside the data
+    data_px = _clip_pixels(data_px, shape[1])
+    data_py = _clip_pixels(data_py, shape[0])
+
+    # change the pixel coords back to the earth coords
+    earth_xcoords, earth_ycoords = _pixel_to_earth_tuple(data_px, data_py,
+                                                         resolution)
+    meta = meta.copy()
+    meta['xcoords'] = (int(earth_xcoords[0] + offset[0]),
+                       int(earth_xcoords[1] + offset[0]))
+    meta['ycoords'] = (int(earth_ycoords[0] + offset[1]),
+                       int(earth_ycoords[1] + offset[1]))
+    return slice(*data_py), slice(*data_px), meta
+
+
+def _pixel_windows(meta, shape, xcoords, ycoords):
+    """ Change many earth coordinates windows to the pixels of the data.
+
+    The vectorized _pixel_window: each window is snapped to the same pixels,
+    but the windows off the data are kept, with no pixel.
+
+    Parameters
+    ----------
+    meta : dict
+        Meta-data of the data.
+    shape : tuple
+        Shape of the data.
+    xcoords : array
+        Earth coordinates of the windows along x, of shape (n, 2).
+    ycoords : array
+        Earth coordinates of the windows along y, of shape (n, 2).
+
+    Returns
+    -------
+    array
+        First and last rows of each window, of shape (n, 2).
+    array
+        First and last columns of each window, of shape (n, 2).
+    """
+    # earth coords of the windows inside the data, from its origin
+    inside_x = np.clip(xcoords, *meta['xcoords']) - meta['xcoords'][0]
+    inside_y = np.clip(ycoords, *meta['ycoords']) - meta['ycoords'][0]
+    outside = (inside_x[:, 1] <= inside_x[:, 0]) | \
+        (inside_y[:, 1] <= inside_y[:, 0])
+    cols, rows = earth_to_pixel_footprints(inside_x, inside_y,
+                                           meta['resolution'])
+    for pixels, length in ((rows, shape[0]), (cols, shape[1])):
+        # keep at least one pixel, inside the data, as _clip_pixels
+        pixels[:, 0] = np.clip(pixels[:, 0], 0, length - 1)
+        pixels[:, 1] = np.clip(pixels[:, 1], pixels[:, 0] + 1, length)
+        # windows off the data along either axis hold no pixel
+        pixels[outside] = 0
+    return rows, cols
+
+
+def _clip_pixels(pixel_coords, length):
+    """ Clip pixel coordinates to hold at least one pixel of the data.
+
+    Parameters
+    ----------
+    pixel_coords : tuple
+        Start and stop pixel coordinates.
+    length : int
+        Number of pixels of the data.
+
+    Returns
+    -------
+    tuple
+        Clipped start and stop pixel coordinates.
+    """
+    start = min(max(pixel_coords[0], 0), length - 1)
+    stop = min(max(pixel_coords[1], start + 1), length)
+    return start, stop
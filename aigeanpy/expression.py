@@ -0,0 +1,370 @@
+import numpy as np
+from aigeanpy.satmap import SatMap
+from aigeanpy.coords import _earth_to_pixel_tuple
+
+# How the right hand side of a subtraction writes its values into the
+# output buffer, for each way the subtraction writes them
+_NEGATED = {'assign': 'sub', 'add': 'sub', 'sub': 'add'}
+
+
+class LazySatMap:
+    """
+    LazySatMap defers the arithmetic of SatMaps. Adding and subtracting
+    LazySatMaps only checks the operands and computes the footprint of the
+    result; compute then evaluates the whole expression in one pass into a
+    single output buffer, without the intermediate arrays and SatMaps of
+    the eager operators.
+
+    The results are the same as the eager SatMap operators: added data
+    are written over the data before them where they overlap, and
+    subtracted data only keep the overlap.
+
+    Attributes
+    ----------
+    meta : dict
+        Meta-data of the result, as given by the eager operators.
+    shape : tuple
+        Shape of the result.
+    satmap : SatMap or None
+        The SatMap of a leaf, None for the operators.
+
+    Methods
+    -------
+    compute(out=None, chunk_rows=None)
+        Evaluate the expression into a SatMap.
+    write_window(out, rows, cols, mode)
+        Write the values of a window of the result into a buffer.
+    """
+
+    def __init__(self, satmap):
+        """ Initiate the LazySatMap class with the SatMap of a leaf.
+
+        Parameters
+        ----------
+        satmap : SatMap
+            The SatMap.
+
+        Raises
+        ------
+        TypeError
+            Satmap must in SatMap type
+        """
+        if not isinstance(satmap, SatMap):
+            raise TypeError('Satmap must in SatMap type')
+        self.satmap = satmap
+        self.meta = satmap.meta
+        self.shape = satmap.data.shape
+        # type of the SatMap computed, the one of the leftmost leaf
+        self._type = type(satmap)
+
+    def __add__(self, another_satmap):
+        return LazyAdd(self, _as_lazy(another_satmap))
+
+    def __sub__(self, another_satmap):
+        return LazySub(self, _as_lazy(another_satmap))
+
+    def compute(self, out=None, chunk_rows=None):
+        """ Evaluate the expression into a SatMap.
+
+        Parameters
+        ----------
+        out : array, optional
+            The buffer the data is written into, by default a new array. A
+            np.memmap keeps the result on disk.
+        chunk_rows : int, optional
+            Number of rows evaluated at once, by default all of them, so
+            only the pages of a memory-mapped buffer and operands holding
+            chunk_rows rows are touched at once.
+
+        Returns
+        -------
+        SatMap
+            A new SatMap holding the result.
+
+        Raises
+        ------
+        TypeError
+            Out must in np.ndarray type
+        ValueError
+            Out must have the shape of the result
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> fand1 = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> fand2 = get_satmap('aigean_fan_20230112_074702.zip')
+        >>> lazy = fand1.lazy() - fand2
+        >>> lazy.meta['xcoords'], lazy.shape
+        ((600, 675), (10, 15))
+        >>> (lazy.compute().data == (fand1 - fand2).data).all()
+        True
+        """
+        if out is None:
+            out = np.zeros(self.shape)
+        elif not isinstance(out, np.ndarray):
+            raise TypeError('Out must in np.ndarray type')
+        elif out.shape != self.shape:
+            raise ValueError('Out must have the shape of the result')
+
+        if chunk_rows is None:
+            chunk_rows = max(self.shape[0], 1)
+        # each chunk is written straight into its rows of the buffer
+        for row in range(0, self.shape[0], chunk_rows):
+            rows = (row, min(row + chunk_rows, self.shape[0]))
+            self.write_window(out[rows[0]:rows[1]], rows,
+                              (0, self.shape[1]), 'assign')
+
+        satmap = self._type(self.meta.copy(), out)
+        satmap.extra = self.satmap is None or self.satmap.extra
+        return satmap
+
+    def write_window(self, out, rows, cols, mode):
+        """ Write the values of a window of the result into a buffer.
+
+        Parameters
+        ----------
+        out : array
+            The buffer, of the shape of the window.
+        rows : tuple
+            First and last row of the window.
+        cols : tuple
+            First and last column of the window.
+        mode : str
+            Whether the values are assigned to, added to or subtracted from
+            the buffer.
+        """
+        data = self.satmap.data[rows[0]:rows[1], cols[0]:cols[1]]
+        if mode == 'assign':
+            out[...] = data
+        elif mode == 'add':
+            np.add(out, data, out=out)
+        else:
+            np.subtract(out, data, out=out)
+
+
+class LazyAdd(LazySatMap):
+    """
+    LazyAdd defers the adding of two LazySatMaps, as SatMap.__add__.
+    """
+
+    def __init__(self, left, right):  # pylint: disable = W0231
+        """ Initiate the LazyAdd class, checking the operands.
+
+        Parameters
+        ----------
+        left : LazySatMap
+            The addend.
+        right : LazySatMap
+            The data added, written over the addend where they overlap.
+
+        Raises
+        ------
+        ValueError
+            Different instruments with different resolution cannot be added
+        ValueError
+            2 data must in the same day
+        """
+        if left.meta['resolution'] != right.meta['resolution']:
+            raise ValueError('Different instruments with \
+different resolution cannot be added')
+        if left.meta['obs_date'][:10] != right.meta['obs_date'][:10]:
+            raise ValueError('2 data must in the same day')
+        self.satmap = None
+        self.left = left
+        self.right = right
+        self._type = left._type
+
+        # earth coords of the new object
+        data_ex = (min(left.meta['xcoords'][0], right.meta['xcoords'][0]),
+                   max(left.meta['xcoords'][1], right.meta['xcoords'][1]))
+        data_ey = (min(left.meta['ycoords'][0], right.meta['ycoords'][0]),
+                   max(left.meta['ycoords'][1], right.meta['ycoords'][1]))
+        self.meta = left.meta.copy()
+        self.meta['xcoords'] = data_ex
+        self.meta['ycoords'] = data_ey
+        data_px, data_py = _box(self.meta, self.meta)
+        self.shape = (data_py[1] - data_py[0], data_px[1] - data_px[0])
+        # pixels of each operand in the result
+        self._boxes = [_box(operand.meta, self.meta)
+                       for operand in (left, right)]
+
+    def write_window(self, out, rows, cols, mode):
+        if mode == 'assign':
+            # pixels outside the operands are empty
+            out[...] = 0
+            regions = [[box] for box in self._boxes]
+        else:
+            # the right operand hides the left one where they overlap, so
+            # only the rest of the left one is written
+            regions = [_difference(*self._boxes), [self._boxes[1]]]
+        for operand, (box_px, box_py), boxes in zip(
+                (self.left, self.right), self._boxes, regions):
+            for box in boxes:
+                _write_box(operand, out, rows, cols, mode, box=box,
+                           origin=(box_px[0], box_py[0]))
+
+
+class LazySub(LazySatMap):
+    """
+    LazySub defers the subtracting of two LazySatMaps, as SatMap.__sub__.
+    """
+
+    def __init__(self, left, right):  # pylint: disable = W0231
+        """ Initiate the LazySub class, checking the operands.
+
+        Parameters
+        ----------
+        left : LazySatMap
+            The minuend.
+        right : LazySatMap
+            The subtrahend.
+
+        Raises
+        ------
+        ValueError
+            Different instruments with different resolution cannot be added
+        ValueError
+            2 data must in different days
+        ValueError
+            Two data must overlap
+        """
+        if left.meta['resolution'] != right.meta['resolution']:
+            raise ValueError('Different instruments \
+with different resolution cannot be added')
+        if left.meta['obs_date'][:10] == right.meta['obs_date'][:10]:
+            raise ValueError('2 data must in different days')
+        # earth coords of the new object
+        data_ex = (max(left.meta['xcoords'][0], right.meta['xcoords'][0]),
+                   min(left.meta['xcoords'][1], right.meta['xcoords'][1]))
+        data_ey = (max(left.meta['ycoords'][0], right.meta['ycoords'][0]),
+                   min(left.meta['ycoords'][1], right.meta['ycoords'][1]))
+        if not (data_ex[1] > data_ex[0] and data_ey[1] > data_ey[0]):
+            raise ValueError('Two data must overlap')
+        self.satmap = None
+        self.left = left
+        self.right = right
+        self._type = left._type
+
+        self.meta = left.meta.copy()
+        self.meta['xcoords'] = data_ex
+        self.meta['ycoords'] = data_ey
+        data_px, data_py = _box(self.meta, self.meta)
+        self.shape = (data_py[1] - data_py[0], data_px[1] - data_px[0])
+        # pixel offset of the overlap in each operand
+        self._offsets = []
+        for operand in (left, right):
+            operand_px, operand_py = _box(operand.meta, self.meta)
+            self._offsets.append((max(0, -operand_py[0]),
+                                  max(0, -operand_px[0])))
+
+    def write_window(self, out, rows, cols, mode):
+        for operand, (row, col), operand_mode in zip(
+                (self.left, self.right), self._offsets,
+                (mode, _NEGATED[mode])):
+            operand.write_window(out, (rows[0] + row, rows[1] + row),
+                                 (cols[0] + col, cols[1] + col),
+                                 operand_mode)
+
+
+def _as_lazy(satmap):
+    """ Wrap a SatMap into a LazySatMap, LazySatMaps are kept as they are.
+
+    Raises
+    ------
+    TypeError
+        Another_satmap must in SatMap type
+    """
+    if isinstance(satmap, LazySatMap):
+        return satmap
+    if not isinstance(satmap, SatMap):
+        raise TypeError('Another_satmap must in SatMap type')
+    return LazySatMap(satmap)
+
+
+def _box(meta, meta_result):
+    """ Get the pixels of data in the result, as the eager operators do.
+
+    Parameters
+    ----------
+    meta : dict
+        Meta-data of the data.
+    meta_result : dict
+        Meta-data of the result.
+
+    Returns
+    -------
+    tuple
+        Pixel coordinate, xcoords.
+    tuple
+        Pixel coordinate, ycoords.
+    """
+    # earth distance from the result bottom left to the origin(0,0)
+    offset = (meta_result['xcoords'][0], meta_result['ycoords'][0])
+    return _earth_to_pixel_tuple(
+        (meta['xcoords'][0] - offset[0], meta['xcoords'][1] - offset[0]),
+        (meta['ycoords'][0] - offset[1], meta['ycoords'][1] - offset[1]),
+        meta_result['resolution'])
+
+
+def _difference(box, hidden):
+    """ Split the pixels of a box not in another box into boxes.
+
+    Parameters
+    ----------
+    box : tuple
+        Pixel coordinates (xcoords, ycoords) of the box.
+    hidden : tuple
+        Pixel coordinates (xcoords, ycoords) of the other box.
+
+    Returns
+    -------
+    list of tuples
+        Up to 4 boxes, below, above, left and right of the other box.
+    """
+    (x0, x1), (y0, y1) = box
+    (hx0, hx1), (hy0, hy1) = hidden
+    if hx0 >= x1 or hx1 <= x0 or hy0 >= y1 or hy1 <= y0:
+        return [box]
+    # clip the other box to the box
+    hx0, hx1, hy0, hy1 = max(hx0, x0), min(hx1, x1), max(hy0, y0), \
+        min(hy1, y1)
+    boxes = [((x0, x1), (y0, hy0)), ((x0, x1), (hy1, y1)),
+             ((x0, hx0), (hy0, hy1)), ((hx1, x1), (hy0, hy1))]
+    return [(px, py) for px, py in boxes if px[1] > px[0] and py[1] > py[0]]
+
+
+def _write_box(operand, out, rows, cols, mode, *, box, origin):
+    """ Write an operand over the part of a box inside the window of out.
+
+    Parameters
+    ----------
+    operand : LazySatMap
+        The operand written.
+    out : array
+        The buffer of the window.
+    rows : tuple
+        First and last row of the window in the result.
+    cols : tuple
+        First and last column of the window in the result.
+    mode : str
+        Whether the values are assigned to, added to or subtracted from
+        the buffer.
+    box : tuple
+        Pixel coordinates (xcoords, ycoords) in the result of the part of
+        the operand written.
+    origin : tuple
+        Pixel coordinates (x, y) in the result of the operand first pixel.
+    """
+    # pylint: disable = R0913
+    box_px, box_py = box
+    # part of the box inside the window
+    row_range = (max(rows[0], box_py[0]), min(rows[1], box_py[1]))
+    col_range = (max(cols[0], box_px[0]), min(cols[1], box_px[1]))
+    if row_range[0] >= row_range[1] or col_range[0] >= col_range[1]:
+        return
+    view = out[row_range[0] - rows[0]:row_range[1] - rows[0],
+               col_range[0] - cols[0]:col_range[1] - cols[0]]
+    operand.write_window(view,
+                         (row_range[0] - origin[1], row_range[1] - origin[1]),
+                         (col_range[0] - origin[0], col_range[1] - origin[0]),
+                         mode)
@@ -0,0 +1,364 @@
+import os
+import re
+import json
+import threading
+from pathlib import Path
+
+# Indices already built, keyed by their absolute search root
+_FILE_INDICES = {}
+_FILE_INDICES_LOCK = threading.Lock()
+
+# Instruments, keyed by the code in the archive file names
+INSTRUMENTS = {'fan': 'Fand', 'man': 'Manannan', 'lir': 'Lir', 'ecn': 'Ecne'}
+
+# Archive file names, as aigean_<instrument>_<YYYYMMDD>_<HHMMSS>.<format>
+_ARCHIVE_NAME = re.compile(r'aigean_(fan|man|lir|ecn)_(\d{4})(\d{2})(\d{2})_'
+                           r'(\d{2})(\d{2})(\d{2})\.(zip|hdf5|asdf|csv)')
+
+
+class FileIndex:
+    """
+    FileIndex maps file names to the paths of the matching files under a
+    search root, so a file can be found without walking the directory tree
+    on every call.
+
+    The index can be saved to a JSON file, so other processes, e.g. console
+    scripts run once per file, start from it instead of walking the tree
+    again. A saved index is rebuilt, and saved again, when it finds a path
+    which doesn't exist anymore or misses a file name.
+
+    Building and looking up are guarded by a lock, so an index can be
+    shared by the threads of aigeanpy.satmap.get_satmaps.
+
+    Attributes
+    ----------
+    root : Path
+        Absolute path of the directory the index searches in.
+    path : Path or None
+        Path of the file the index is saved in, None if it isn't saved.
+
+    Methods
+    -------
+    build()
+        Walk the search root once and store every file by its name.
+    invalidate()
+        Drop the stored paths, so the index is rebuilt on next use.
+    find(filename)
+        Find the path of the first file matching the given file name.
+    """
+
+    def __init__(self, root='.', path=None):
+        """ Initiate the FileIndex class.
+
+        Parameters
+        ----------
+        root : str or Path, optional
+            The directory to search in, by default '.'.
+        path : str or Path, optional
+            The JSON file the index is saved in and loaded from, e.g.
+            'aigean_file_index.json' in the search root, by default the
+            index is only kept in memory.
+        """
+        self.root = Path(root).resolve()
+        self.path = Path(path) if path is not None else None
+        self._paths = None
+        # file names missing since the index was last built
+        self._misses = set()
+        # re-entrant, as find builds the index while holding it
+        self._lock = threading.RLock()
+
+    def build(self):
+        """ Walk the search root once and store every file by its name.
+        """
+        with self._lock:
+            paths = {}
+            # sorting the whole walk keeps the per name lists in the same
+            # order as sorted(Path().rglob(filename))
+            for path in sorted(self.root.rglob('*')):
+                if path.is_file():
+                    paths.setdefault(path.name, []).append(path)
+            self._paths = paths
+            self._misses = set()
+            if self.path is not None:
+                files = [path.relative_to(self.root).as_posix()
+                         for name_paths in paths.values()
+                         for path in name_paths]
+                self.path.write_text(json.dumps({'root': str(self.root),
+                                                 'files': sorted(files)}),
+                                     encoding='utf-8')
+
+    def invalidate(self):
+        """ Drop the stored paths, so the index is rebuilt on next use.
+
+        The saved index is removed too.
+        """
+        with self._lock:
+            self._paths = None
+            self._misses = set()
+            if self.path is not None:
+                self.path.unlink(missing_ok=True)
+
+    def _load(self):
+        """ Load the saved index, or build it when there is none.
+        """
+        if self.path is not None and self.path.is_file():
+            saved = json.loads(self.path.read_text(encoding='utf-8'))
+            if saved['root'] == str(self.root):
+                paths = {}
+                for filename in saved['files']:
+                    path = self.root / filename
+                    paths.setdefault(path.name, []).append(path)
+                self._paths = paths
+                return False
+        self.build()
+        return True
+
+    def find(self, filename):
+        """ Find the path of the first file matching the given file name.
+
+        The file name may include parent directories, e.g.
+        'extra_aigean_files/aigean_man_20230104_151010.hdf5'. A file name
+        which is already a valid path from the search root is returned
+        straight away. The index is rebuilt when the stored path does not
+        exist anymore, or the first time a file name cannot be found: the
+        file names still missing after that are remembered, and return None
+        without walking the tree again, until the index is invalidated.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file.
+
+        Returns
+        -------
+        Path or None
+            Path of the first matching file, None if there is no match.
+
+        Examples
+        --------
+        >>> from aigeanpy.fileindex import FileIndex
+        >>> index = FileIndex()
+        >>> index.find('aigean_man_20221205_194510.hdf5').name
+        'aigean_man_20221205_194510.hdf5'
+        >>> index.find('foo.hdf5') is None
+        True
+        """
+        if not filename:
+            return None
+        if filename[0] == '/':
+            filename = filename[1:]
+
+        # exact path fast path, no lookup needed
+        exact_path = self.root / filename
+        if exact_path.is_file():
+            return exact_path
+
+        # file names with glob patterns can't be looked up by name
+        if any(char in filename for char in '*?['):
+            matches = sorted(self.root.rglob(filename))
+            return matches[0] if matches else None
+
+        with self._lock:
+            built = self._load() if self._paths is None else False
+            if filename in self._misses:
+                return None
+            path = self._lookup(filename)
+            # the tree changed since the index was built, refresh it once
+            if (path is None or not path.is_file()) and not built:
+                self.build()
+                path = self._lookup(filename)
+            if path is None:
+                self._misses.add(filename)
+            return path
+
+    def _lookup(self, filename):
+        """ Look up a file name in the stored paths.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file, optionally with parent directories.
+
+        Returns
+        -------
+        Path or None
+            Path of the first matching file, None if there is no match.
+        """
+        parts = Path(filename).parts
+        for path in self._paths.get(parts[-1], []):
+            if path.parts[-len(parts):] == parts:
+                return path
+        return None
+
+
+def get_file_index(root=None, path=None):
+    """ Get the file index of a search root, building it only once.
+
+    Parameters
+    ----------
+    root : str or Path, optional
+        The directory to search in, by default the current working directory.
+    path : str or Path, optional
+        The JSON file the index is saved in and loaded from, by default the
+        index is only kept in memory. See FileIndex.
+
+    Returns
+    -------
+    FileIndex
+        The index of the search root.
+    """
+    root = Path(root if root is not None else '.').resolve()
+    with _FILE_INDICES_LOCK:
+        if root not in _FILE_INDICES:
+            _FILE_INDICES[root] = FileIndex(root, path)
+        elif path is not None:
+            _FILE_INDICES[root].path = Path(path)
+        return _FILE_INDICES[root]
+
+
+def find_file(filename, root=None):
+    """ Find the path of the first file matching the given file name.
+
+    Parameters
+    ----------
+    filename : str
+        The name of the file, optionally with parent directories.
+    root : str or Path, optional
+        The directory to search in, by default the current working directory.
+
+    Returns
+    -------
+    Path or None
+        Path of the first matching file, None if there is no match.
+
+    Examples
+    --------
+    >>> from aigeanpy.fileindex import find_file
+    >>> find_file('aigean_fan_20230112_074702.zip').name
+    'aigean_fan_20230112_074702.zip'
+    """
+    return get_file_index(root).find(filename)
+
+
+def clear_file_index(root=None):
+    """ Invalidate the file index of a search root, or all of them.
+
+    Parameters
+    ----------
+    root : str or Path, optional
+        The directory whose index is invalidated, by default all of them.
+    """
+    if root is None:
+        for index in _FILE_INDICES.values():
+            index.invalidate()
+    else:
+        get_file_index(root).invalidate()
+
+
+def parse_filename(filename):
+    """ Get the meta-data encoded in the name of an archive file.
+
+    The file is never opened, so the coordinates and the resolution, which
+    are only in the file, aren't given.
+
+    Parameters
+    ----------
+    filename : str or Path
+        The name of the file, optionally with parent directories.
+
+    Returns
+    -------
+    dict
+        Keys including ('observatory', 'instrument', 'obs_date', 'format')
+
+    Raises
+    ------
+    ValueError
+        File name must be aigean_<instrument>_<date>_<time>.<format>
+
+    Examples
+    --------
+    >>> from aigeanpy.fileindex import parse_filename
+    >>> parse_filename('extra_aigean_files/aigean_man_20230104_151010.hdf5')
+    {'observatory': 'Aigean', 'instrument': 'Manannan', \
+'obs_date': '2023-01-04 15:10:10', 'format': 'hdf5'}
+    """
+    match = _ARCHIVE_NAME.fullmatch(Path(filename).name)
+    if match is None:
+        raise ValueError('File name must be '
+                         'aigean_<instrument>_<date>_<time>.<format>')
+    code, year, month, day, hour, minute, second, file_format = \
+        match.groups()
+    return {'observatory': 'Aigean', 'instrument': INSTRUMENTS[code],
+            'obs_date': f'{year}-{month}-{day} {hour}:{minute}:{second}',
+            'format': file_format}
+
+
+def scan_files(root=None, instrument=None, start=None, stop=None):
+    """ Find the archive files under a directory from their names only.
+
+    Only the directory entries are listed, no file is opened or even
+    stat'ed, so selecting a time window among many files stays fast. The
+    files are opened later, e.g. with aigeanpy.satmap.get_satmap and the
+    same root, when their coordinates or data are needed.
+
+    Parameters
+    ----------
+    root : str or Path, optional
+        The directory to search in, by default the current working directory.
+    instrument : str, optional
+        The name of the instrument, e.g. 'Fand', 'fand' or 'fan', by default
+        any.
+    start : str, optional
+        The first observation date, as 'YYYY-MM-DD' or 'YYYY-MM-DD
+        HH:MM:SS', by default any.
+    stop : str, optional
+        The last observation date, the whole day when only the date is
+        given, by default any.
+
+    Returns
+    -------
+    list of strs
+        Paths of the files from the search root, ordered by observation
+        date.
+
+    Raises
+    ------
+    ValueError
+        Instrument must be Lir, Manannan, Fand or Ecne
+
+    Examples
+    --------
+    >>> from aigeanpy.fileindex import scan_files
+    >>> scan_files('aigeanpy/tests', 'fand', '2023-01-04', '2023-01-13')
+    ['aigean_fan_20230104_150010.zip', 'aigean_fan_20230112_074702.zip', \
+'extra_aigean_files/aigean_fan_20230113_070916.zip']
+    """
+    if instrument is not None:
+        names = {code: name.lower() for code, name in INSTRUMENTS.items()}
+        instrument = instrument.lower()
+        if instrument not in names.values():
+            instrument = names.get(instrument)
+        if instrument is None:
+            raise ValueError('Instrument must be Lir, Manannan, Fand or Ecne')
+
+    root = Path(root if root is not None else '.')
+    files = []
+    for directory, _, filenames in os.walk(root):
+        parent = Path(directory).relative_to(root)
+        for filename in filenames:
+            try:
+                meta = parse_filename(filename)
+            except ValueError:
+                continue
+            obs_date = meta['obs_date']
+            if instrument is not None and \
+                    meta['instrument'].lower() != instrument:
+                continue
+            if start is not None and obs_date < start:
+                continue
+            # a date alone stops at the end of the day
+            if stop is not None and obs_date[:len(stop)] > stop:
+                continue
+            files.append((obs_date, (parent/filename).as_posix()))
+    return [path for _, path in sorted(files)]
@@ -1,4 +1,3 @@
-import requests
 from pathlib import Path
 import datetime
 
@@ -74,6 +73,8 @@ def query_isa(start_date=Current_time, stop_date=Current_time, instrument=''):
     http = ('http://dokku-app.dokku.arc.ucl.ac.uk/isa-archive/query/'
             '?start_date='+start_date+stop_date+instrument)
 
+    import requests  # pylint: disable = C0415
+
     try:
         response = requests.get(http, timeout=10)  # 10 seconds timeout
         print(response.text)
@@ -110,6 +111,8 @@ def download_isa(filename, save_dir=''):
         raise TypeError('Save_dir must in str type')
     http = ('http://dokku-app.dokku.arc.ucl.ac.uk/isa-archive/download/'
             '?filename='+filename)
+    import requests  # pylint: disable = C0415
+
     try:
         response = requests.get(http, timeout=10)  # 10 seconds timeout
     except:  # noqa
@@ -0,0 +1,121 @@
+import zipfile
+from pathlib import Path
+import numpy as np
+from aigeanpy.coords import _pixel_window
+from aigeanpy.readers import _zip_memmap
+
+
+def pyramid_path(file_path):
+    """ Get the path of the pyramid saved next to a file.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        The file path of the file holding the data information.
+
+    Returns
+    -------
+    Path
+        The path of the pyramid.
+    """
+    file_path = Path(file_path)
+    return file_path.with_name(file_path.name + '.pyramid.npz')
+
+
+def write_pyramid(pyramid, path):
+    """ Save the levels of a pyramid in a file.
+
+    The levels are stored without compression, so each of them can be
+    memory-mapped by read_pyramid_level.
+
+    Parameters
+    ----------
+    pyramid : dict
+        The levels, keyed by their resolution.
+    path : str or Path
+        The path of the saved pyramid.
+
+    Returns
+    -------
+    Path
+        The path of the saved pyramid.
+    """
+    path = Path(path)
+    with open(path, 'wb') as f:
+        np.savez(f, **{f'res_{resolution}': level
+                       for resolution, level in pyramid.items()})
+    return path
+
+
+def pyramid_levels(path):
+    """ Get the resolutions of the levels of a saved pyramid.
+
+    Parameters
+    ----------
+    path : str or Path
+        The path of the saved pyramid.
+
+    Returns
+    -------
+    list of ints
+        The resolutions of the levels.
+    """
+    with zipfile.ZipFile(path, 'r') as f:
+        return sorted(int(name[len('res_'):-len('.npy')])
+                      for name in f.namelist())
+
+
+def read_pyramid_level(path, resolution, meta=None, xcoords=None,
+                       ycoords=None):
+    """ Read a level of a saved pyramid, or only a window of it.
+
+    Parameters
+    ----------
+    path : str or Path
+        The path of the saved pyramid.
+    resolution : int
+        The resolution of the level.
+    meta : dict, optional
+        Meta-data of the source file, needed to read a window.
+    xcoords : tuple, optional
+        Earth coordinates of the window to read along x, by default the whole
+        level.
+    ycoords : tuple, optional
+        Earth coordinates of the window to read along y, by default the whole
+        level.
+
+    Returns
+    -------
+    array or tuple
+        Read-only memory-mapped level. With meta-data, the meta-data of the
+        window is returned first.
+    """
+    with zipfile.ZipFile(path, 'r') as f:
+        info = f.getinfo(f'res_{resolution}.npy')
+    data = _zip_memmap(path, info)
+    if meta is None:
+        return data
+    meta = meta.copy()
+    meta['resolution'] = resolution
+    rows, cols, meta = _pixel_window(meta, data.shape, xcoords, ycoords)
+    return meta, data[rows, cols]
+
+
+def _is_fresh(path, file_path):
+    """ Check whether a derived file exists and is newer than its source.
+
+    Parameters
+    ----------
+    path : str or Path
+        The path of the derived file.
+    file_path : str or Path
+        The path of the source file.
+
+    Returns
+    -------
+    bool
+        Whether the derived file is fresh.
+    """
+    path = Path(path)
+    return path.is_file() and \
+        path.stat().st_mtime_ns >= Path(file_path).stat().st_mtime_ns
@@ -0,0 +1,510 @@
+# Disabling bare-except
+# pylint: disable = W0702
+import os
+import json
+import zipfile
+import struct
+import mmap as mmap_lib
+from io import BytesIO
+from pathlib import Path
+import numpy as np
+from aigeanpy.coords import _pixel_window
+
+
+def get_hdf5(file_path, mmap=False, xcoords=None, ycoords=None):
+    """ Get meta and data from file.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the file holding the data information.
+    mmap : bool, optional
+        Whether to memory-map the data instead of reading it, by default
+        False. Only contiguous, uncompressed datasets can be memory-mapped,
+        others are read.
+    xcoords : tuple, optional
+        Earth coordinates of the window to read along x, by default the whole
+        data.
+    ycoords : tuple, optional
+        Earth coordinates of the window to read along y, by default the whole
+        data.
+
+    Returns
+    -------
+    dict
+        Including info of data. keys including ('archive', 'instrument',
+        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_time')
+    array
+        Data array.
+
+    Examples
+    --------
+    >>> from aigeanpy.readers import get_hdf5
+    >>> filename = 'aigean_man_20221205_194510.hdf5'
+    >>> file_path_abs = sorted(Path().rglob(filename))[0]
+    >>> get_hdf5(file_path_abs)[0]
+    {'archive': '', 'instrument': 'Manannan', \
+'observatory': 'Aigean', 'resolution': 15, \
+'xcoords': (750, 1200), 'ycoords': (250, 400), \
+'obs_date': '2022-12-05 19:45:10'}
+
+    """
+    import h5py  # pylint: disable = C0415
+
+    with h5py.File(file_path, 'r') as f:
+        for key in f.keys():
+            dataset = f[key]['data']
+            meta = _meta_generate(f[key].attrs)
+            data = _hdf5_memmap(file_path, dataset) if mmap else None
+            if data is None:
+                data = dataset
+            # slicing reads straight into a new array, without an extra copy,
+            # and only reads the window from disk
+            rows, cols, meta = _pixel_window(meta, data.shape, xcoords,
+                                             ycoords)
+            data = data[rows, cols]
+    return meta, data
+
+
+def _hdf5_memmap(file_path, dataset):
+    """ Memory-map a HDF5 dataset.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the file holding the dataset.
+    dataset : h5py.Dataset
+        The dataset to memory-map.
+
+    Returns
+    -------
+    memmap or None
+        Read-only memory-mapped data, None if the dataset is chunked,
+        compressed or not allocated.
+    """
+    offset = dataset.id.get_offset()
+    if dataset.chunks is not None or offset is None or \
+            dataset.dtype.hasobject:
+        return None
+    return np.memmap(file_path, dtype=dataset.dtype, mode='r',
+                     offset=offset, shape=dataset.shape)
+
+
+def get_asdf(file_path, mmap=False, xcoords=None, ycoords=None):
+    """ Get meta and data from file.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the file holding the data information.
+    mmap : bool, optional
+        Whether to memory-map the data instead of reading it, by default
+        False. Compressed blocks can't be memory-mapped and are read.
+    xcoords : tuple, optional
+        Earth coordinates of the window to read along x, by default the whole
+        data.
+    ycoords : tuple, optional
+        Earth coordinates of the window to read along y, by default the whole
+        data.
+
+    Returns
+    -------
+    dict
+        Including info of data. keys including ('archive', 'instrument',
+        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_time')
+    array
+        Data array.
+
+    Examples
+    --------
+    >>> from aigeanpy.readers import get_asdf
+    >>> filename = 'aigean_lir_20230104_145310.asdf'
+    >>> file_path_abs = sorted(Path().rglob(filename))[0]
+    >>> get_asdf(file_path_abs)[0]
+    {'archive': 'ISA', 'instrument': 'Lir', \
+'observatory': 'Aigean', 'resolution': 30, \
+'xcoords': (100, 700), 'ycoords': (0, 300), \
+'obs_date': '2023-01-04 14:53:10'}
+    """
+    windowed = xcoords is not None or ycoords is not None
+    # with a window the file is mapped, so only the window is read from disk
+    with _open_asdf(file_path, mmap or windowed) as f:
+        meta = _meta_generate(f)
+        data = np.asarray(f['data'])
+        offset = _file_offset(data)
+        # the memory map of asdf is closed together with the file, so map the
+        # same bytes again independently of it
+        if offset is not None and mmap:
+            data = _remap(file_path, data, offset)
+        rows, cols, meta = _pixel_window(meta, data.shape, xcoords, ycoords)
+        data = data[rows, cols]
+        # or copy the data before the file is closed
+        if offset is not None and not mmap:
+            data = np.array(data)
+    return meta, data
+
+
+def _open_asdf(file_path, mmap):
+    """ Open an ASDF file, with or without memory-mapping its arrays.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the file holding the data information.
+    mmap : bool
+        Whether to memory-map the arrays.
+
+    Returns
+    -------
+    AsdfFile
+        The opened file.
+    """
+    import asdf  # pylint: disable = C0415
+
+    try:
+        return asdf.open(file_path, 'r', memmap=mmap)
+    # asdf versions older than 3.1 name the option copy_arrays
+    except TypeError:
+        return asdf.open(file_path, 'r', copy_arrays=not mmap)
+
+
+def _file_offset(data):
+    """ Find the byte offset in its file of an array viewing a memory map.
+
+    Parameters
+    ----------
+    data : array
+        Data array.
+
+    Returns
+    -------
+    int or None
+        Byte offset of the data in the mapped file, None if the array
+        doesn't view a memory map.
+    """
+    base = data
+    while base is not None:
+        if isinstance(base, np.memmap) and base.offset is not None:
+            return base.offset + data.ctypes.data - base.ctypes.data
+        # asdf views a memory map of the whole file
+        if isinstance(base, mmap_lib.mmap):
+            start = np.frombuffer(base, dtype=np.uint8).ctypes.data
+            return data.ctypes.data - start
+        base = getattr(base, 'base', None)
+    return None
+
+
+def _remap(file_path, data, offset):
+    """ Memory-map again the bytes of a file viewed by an array.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the file holding the data.
+    data : array
+        Array viewing a memory map of the file.
+    offset : int
+        Byte offset of the data in the file.
+
+    Returns
+    -------
+    memmap
+        Read-only memory-mapped data, or a copy of the data if it is not
+        contiguous or the offset does not point at it.
+    """
+    if not (data.flags.c_contiguous or data.flags.f_contiguous):
+        return np.array(data)
+    if offset + data.nbytes > os.path.getsize(file_path):
+        return np.array(data)
+    order = 'C' if data.flags.c_contiguous else 'F'
+    mapped = np.memmap(file_path, dtype=data.dtype, mode='r', offset=offset,
+                       shape=data.shape, order=order)
+    # make sure the same bytes were mapped, comparing elements spread across
+    # the buffer, otherwise keep a copy
+    index = np.linspace(0, data.size - 1, min(data.size, 16)).astype(int)
+    if mapped.ravel(order)[index].tobytes() != \
+            data.ravel(order)[index].tobytes():
+        return np.array(data)
+    return mapped
+
+
+def get_zip(file_path, mmap=False, xcoords=None, ycoords=None):
+    """ Get meta and data from file.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the file holding the data information.
+    mmap : bool, optional
+        Whether to memory-map the data instead of reading it, by default
+        False. Only .npy files stored without compression can be
+        memory-mapped, others are read.
+    xcoords : tuple, optional
+        Earth coordinates of the window to read along x, by default the whole
+        data.
+    ycoords : tuple, optional
+        Earth coordinates of the window to read along y, by default the whole
+        data.
+
+    Returns
+    -------
+    dict
+        including info of data. keys including ('archive', 'instrument',
+        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_time')
+    array
+        Data array.
+
+    Examples
+    --------
+    >>> from aigeanpy.readers import get_zip
+    >>> filename = 'aigean_fan_20230112_074702.zip'
+    >>> file_path_abs = sorted(Path().rglob(filename))[0]
+    >>> get_zip(file_path_abs)[0]
+    {'archive': 'ISA', 'instrument': 'Fand', \
+'observatory': 'Aigean', 'resolution': 5, \
+'xcoords': (600, 825), 'ycoords': (150, 200), \
+'obs_date': '2023-01-12 07:47:02'}
+
+    """
+
+    with zipfile.ZipFile(file_path, 'r') as f:
+        file_json = json.load(BytesIO(f.read(f.namelist()[0])))
+        meta = _meta_generate(file_json)
+        info = f.getinfo(f.namelist()[1])
+        data = _zip_memmap(file_path, info) if mmap else None
+        if data is not None:
+            rows, cols, meta = _pixel_window(meta, data.shape, xcoords,
+                                             ycoords)
+            data = data[rows, cols]
+        else:
+            # decompress straight into the array, without a BytesIO copy
+            with f.open(info) as npy_file:
+                meta, data = _read_npy(npy_file, meta, xcoords, ycoords)
+    return meta, data
+
+
+def _read_npy(npy_file, meta, xcoords=None, ycoords=None):
+    """ Read the data of a .npy file, or only a window of it.
+
+    Parameters
+    ----------
+    npy_file : file
+        Seekable .npy file.
+    meta : dict
+        Meta-data of the data.
+    xcoords : tuple, optional
+        Earth coordinates of the window to read along x, by default the whole
+        data.
+    ycoords : tuple, optional
+        Earth coordinates of the window to read along y, by default the whole
+        data.
+
+    Returns
+    -------
+    dict
+        Meta-data of the window.
+    array
+        Data array of the window.
+    """
+    if xcoords is None and ycoords is None:
+        return meta, np.load(npy_file)
+
+    shape, fortran_order, dtype = _read_npy_header(npy_file)
+    rows, cols, meta = _pixel_window(meta, shape, xcoords, ycoords)
+    if fortran_order or len(shape) != 2 or dtype.hasobject:
+        npy_file.seek(0)
+        return meta, np.load(npy_file)[rows, cols]
+
+    # skip the rows before the window and only read the rows of the window
+    row_bytes = shape[1] * dtype.itemsize
+    n_rows = rows.stop - rows.start
+    npy_file.seek(rows.start * row_bytes, 1)
+    data = np.frombuffer(npy_file.read(n_rows * row_bytes), dtype=dtype)
+    data = data.reshape(n_rows, shape[1])[:, cols].copy()
+    return meta, data
+
+
+def _zip_memmap(file_path, info):
+    """ Memory-map a .npy file stored inside a zip file.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the zip file.
+    info : ZipInfo
+        The zip entry of the .npy file.
+
+    Returns
+    -------
+    memmap or None
+        Read-only memory-mapped data, None if the .npy file is compressed.
+    """
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    with open(file_path, 'rb') as f:
+        # the local file header is 30 bytes long, followed by the file name
+        # and an extra field, whose lengths are stored at its end
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_length, extra_length = struct.unpack('<HH', local_header[26:])
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+        shape, fortran_order, dtype = _read_npy_header(f)
+        offset = f.tell()
+    if dtype.hasobject:
+        return None
+    return np.memmap(file_path, dtype=dtype, mode='r', offset=offset,
+                     shape=shape, order='F' if fortran_order else 'C')
+
+
+def _read_npy_header(f):
+    """ Read the header of a .npy file.
+
+    Parameters
+    ----------
+    f : file
+        File positioned at the start of the .npy file. It is left positioned
+        at the start of the array data.
+
+    Returns
+    -------
+    tuple
+        Shape of the array.
+    bool
+        Whether the array is stored in Fortran order.
+    dtype
+        Data type of the array.
+    """
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(f)
+    return np.lib.format.read_array_header_2_0(f)
+
+
+def get_hdf5_meta(file_path):
+    """ Get meta from file, without reading the data.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the file holding the data information.
+
+    Returns
+    -------
+    dict
+        Including info of data. keys including ('archive', 'instrument',
+        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_time')
+    """
+    import h5py  # pylint: disable = C0415
+
+    with h5py.File(file_path, 'r') as f:
+        for key in f.keys():
+            meta = _meta_generate(f[key].attrs)
+    return meta
+
+
+def get_asdf_meta(file_path):
+    """ Get meta from file, without reading the data.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the file holding the data information.
+
+    Returns
+    -------
+    dict
+        Including info of data. keys including ('archive', 'instrument',
+        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_time')
+    """
+    import asdf  # pylint: disable = C0415
+
+    # with lazy loading the data block is never read from disk
+    with asdf.open(file_path, 'r', lazy_load=True) as f:
+        meta = _meta_generate(f)
+    return meta
+
+
+def get_zip_meta(file_path):
+    """ Get meta from file, without reading the data.
+
+    Parameters
+    ----------
+    file_path : str
+        The file path of the file holding the data information.
+
+    Returns
+    -------
+    dict
+        Including info of data. keys including ('archive', 'instrument',
+        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_time')
+    """
+    with zipfile.ZipFile(file_path, 'r') as f:
+        file_json = json.load(BytesIO(f.read(f.namelist()[0])))
+        meta = _meta_generate(file_json)
+    return meta
+
+
+def _meta_generate(meta_origin):
+    """ Generate meta data.
+
+    Parameters
+    ----------
+    meta_origin : dict
+        A dict with multiple informations.
+
+    Returns
+    -------
+    dict
+        A dict including info of data. keys including ('archive', 'instrument',
+        'observatory','resolution','xcoords','ycoords','obs_time')
+    """
+    meta = {}
+    # meta contain following keys
+    meta_list = ['archive', 'instrument', 'observatory', 'resolution',
+                 'xcoords', 'ycoords']
+    for key in meta_list:
+        # update the information to the meta
+        try:
+            meta.update({key: meta_origin[key]})
+        # update with an empty value if the file do not contain the key
+        except:  # noqa
+            meta.update({key: ''})
+
+    # change coords into tuple, the type of each element is int
+    meta['xcoords'] = tuple(map(int, meta['xcoords']))
+    meta['ycoords'] = tuple(map(int, meta['ycoords']))
+    # combine the date and time
+    date = f"{meta_origin['date']} {meta_origin['time']}"
+    meta.update({'obs_date': date})
+
+    return meta
+
+
+def _file_meta(file_path):
+    """ Read the meta-data of a file found already.
+
+    Only the header of each format is read, the data is never decoded.
+
+    Parameters
+    ----------
+    file_path : str or Path
+        The file path of the file holding the data information.
+
+    Returns
+    -------
+    dict
+        Meta-data of the file.
+
+    Raises
+    ------
+    ValueError
+        File format must be hdf5, asdf or zip
+    """
+    name = Path(file_path).name
+    if 'hdf5' in name:
+        return get_hdf5_meta(file_path)
+    if 'asdf' in name:
+        return get_asdf_meta(file_path)
+    if 'zip' in name:
+        return get_zip_meta(file_path)
+    raise ValueError("File format must be hdf5, asdf or zip")
@@ -0,0 +1,144 @@
+import os
+from functools import partial
+from aigeanpy.satmap import SatMap, get_satmap, load_many
+
+KINDS = ('figure', 'image')
+
+
+def render(satmap, save_path='', resolution=None, kind='figure',
+           cmap=None):
+    """ Save the PNG of a SatMap without pyplot.
+
+    Nothing is kept once the file is written, so rendering many SatMaps in
+    one process doesn't leak figures nor draw them over each other.
+
+    Parameters
+    ----------
+    satmap : SatMap
+        The SatMap.
+    save_path : str, optional
+        The directory the PNG is saved in, by default ''.
+    resolution : int, optional
+        The resolution of the PNG, by default the data resolution. The
+        nearest pyramid level is used to draw it.
+    kind : str, optional
+        'figure' for the figure with axes in earth coordinates SatMap.visualise
+        draws, or 'image' for one pixel of the PNG per pixel of the data, by
+        default 'figure'.
+    cmap : str, optional
+        The colormap, by default the matplotlib default.
+
+    Returns
+    -------
+    str
+        The name of the saved file, see SatMap.figure_name.
+
+    Raises
+    ------
+    TypeError
+        Satmap must in SatMap type
+    TypeError
+        Save_path must be a str
+    ValueError
+        Kind must be figure or image
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> from aigeanpy.satmap import get_satmap
+    >>> from aigeanpy.render import render
+    >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+    >>> with tempfile.TemporaryDirectory() as save_path:
+    ...     filename = render(fand, save_path, kind='image')
+    ...     os.path.isfile(os.path.join(save_path, filename))
+    True
+    >>> filename
+    'Aigean_Fand_20230104_150010.png'
+    """
+    if not isinstance(satmap, SatMap):
+        raise TypeError('Satmap must in SatMap type')
+    if not isinstance(save_path, str):
+        raise TypeError('Save_path must be a str')
+    if kind not in KINDS:
+        raise ValueError('Kind must be figure or image')
+
+    data = satmap.data
+    if resolution is not None:
+        data = satmap.resampled(resolution)
+    filename = satmap.figure_name()
+    file_path = os.path.join(save_path, filename)
+    if kind == 'image':
+        from matplotlib.image import imsave  # pylint: disable = C0415
+
+        # colormapped straight to the PNG, the first row at the bottom
+        imsave(file_path, data, cmap=cmap, origin='lower')
+        return filename
+
+    # pylint: disable = C0415
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    # a figure of its own, drawn on an Agg canvas, as plt.imshow on a new
+    # figure would draw it
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.imshow(data, origin='lower', cmap=cmap,
+                extent=[satmap.meta['xcoords'][0], satmap.meta['xcoords'][1],
+                        satmap.meta['ycoords'][0], satmap.meta['ycoords'][1]])
+    figure.savefig(file_path)
+    return filename
+
+
+def render_many(satmaps, save_path='', *, resolution=None, kind='figure',
+                cmap=None, workers=1, processes=False, root=None):
+    """ Save the PNGs of many SatMaps, keeping going when some of them fail.
+
+    File names are loaded only when they are rendered and without the cache
+    of loaded files, so no more than one SatMap per worker is held in memory
+    at once.
+
+    Parameters
+    ----------
+    satmaps : list of SatMaps or strs
+        The SatMaps, or the names of the files holding them.
+    save_path : str, optional
+        The directory the PNGs are saved in, by default ''.
+    resolution : int, optional
+        The resolution of the PNGs, by default the data resolutions.
+    kind : str, optional
+        'figure' or 'image', by default 'figure'. See render.
+    cmap : str, optional
+        The colormap, by default the matplotlib default.
+    workers : int, optional
+        Number of SatMaps rendered at once, by default 1.
+    processes : bool, optional
+        Whether to use a process pool instead of a thread pool, by default
+        False.
+    root : str, optional
+        The directory to search the files in, by default the current
+        working directory.
+
+    Returns
+    -------
+    list
+        The name of the saved file of each SatMap, in the same order. None
+        for the SatMaps that failed.
+    dict
+        Exception raised by each SatMap that failed, keyed by its index in
+        the SatMaps.
+    """
+    # pylint: disable = R0913
+    draw = partial(_render_one, root=root, save_path=save_path,
+                   resolution=resolution, kind=kind, cmap=cmap)
+    return load_many(draw, satmaps, workers, processes)
+
+
+def _render_one(satmap, root=None, **options):
+    """ Save the PNG of a SatMap, loading it first from its file name.
+
+    The options are given to render.
+    """
+    if isinstance(satmap, str):
+        satmap = get_satmap(satmap, root, use_cache=False)
+    return render(satmap, **options)
@@ -0,0 +1,219 @@
+import numpy as np
+
+METHODS = ('auto', 'skimage', 'linear', 'nearest')
+
+
+def integer_factor(scale):
+    """ Get the integer factor of a scale, when there is one.
+
+    Parameters
+    ----------
+    scale : float
+        Scale factor, larger than 1 for up-sampling and smaller than 1 for
+        down-sampling.
+
+    Returns
+    -------
+    int or None
+        The integer factor, None if neither the scale nor its inverse is
+        integral.
+
+    Examples
+    --------
+    >>> from aigeanpy.resample import integer_factor
+    >>> integer_factor(30 / 5), integer_factor(5 / 15), integer_factor(1.5)
+    (6, 3, None)
+    """
+    factor = scale if scale >= 1 else 1 / scale
+    if abs(factor - round(factor)) > 1e-9:
+        return None
+    return int(round(factor))
+
+
+def resample(data, scale, method='auto'):
+    """ Resample the data by a scale factor.
+
+    Parameters
+    ----------
+    data : array
+        Data to resample.
+    scale : float
+        Scale factor, larger than 1 for up-sampling and smaller than 1 for
+        down-sampling.
+    method : str, optional
+        The resampling method, by default 'auto'.
+
+        - 'skimage': skimage.transform.rescale, for any scale.
+        - 'linear': integer scales only. Block mean for down-sampling and
+          separable linear interpolation for up-sampling, giving the same
+          result as skimage for up-sampling. The block means differ from
+          skimage's down-sampling, which smooths and interpolates.
+        - 'nearest': integer scales only. Block mean for down-sampling and
+          pixel repetition for up-sampling.
+        - 'auto': 'linear' whenever the scale is integer and the data is
+          floating point, 'skimage' otherwise.
+
+    Returns
+    -------
+    array
+        A new resampled array.
+
+    Raises
+    ------
+    ValueError
+        Method must be one of auto, skimage, linear or nearest
+    ValueError
+        Scale must be an integer or the inverse of an integer
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from aigeanpy.resample import resample
+    >>> data = np.arange(16.).reshape(4, 4)
+    >>> resample(data, 1 / 2)
+    array([[ 2.5,  4.5],
+           [10.5, 12.5]])
+    >>> resample(data[:2, :2], 2, method='nearest')
+    array([[0., 0., 1., 1.],
+           [0., 0., 1., 1.],
+           [4., 4., 5., 5.],
+           [4., 4., 5., 5.]])
+    """
+    if method not in METHODS:
+        raise ValueError('Method must be one of auto, skimage, linear or '
+                         'nearest')
+
+    factor = integer_factor(scale)
+    if method == 'auto':
+        floating = np.issubdtype(data.dtype, np.floating)
+        method = 'linear' if factor and floating else 'skimage'
+    if method == 'skimage':
+        from skimage import transform  # pylint: disable = C0415
+
+        return transform.rescale(data, scale)
+    if factor is None:
+        raise ValueError('Scale must be an integer or the inverse of an '
+                         'integer')
+
+    data = np.array(data, dtype=float)
+    if factor == 1:
+        return data
+    if scale < 1:
+        return block_mean(data, factor)
+    if method == 'nearest':
+        return upsample_nearest(data, factor)
+    return upsample_linear(data, factor)
+
+
+def block_mean(data, factor, shape=None):
+    """ Down-sample the data by averaging blocks of factor x factor pixels.
+
+    The number of output pixels along each axis is rounded as in
+    skimage.transform.rescale; a partial last block is averaged over the
+    pixels it holds.
+
+    Parameters
+    ----------
+    data : array
+        Data to down-sample.
+    factor : int
+        Down-sampling factor.
+    shape : tuple, optional
+        The number of output pixels along each axis, by default rounded as
+        above. Used to down-sample a window of larger data.
+
+    Returns
+    -------
+    array
+        Down-sampled data.
+    """
+    for axis in range(data.ndim):
+        length = data.shape[axis]
+        if shape is None:
+            out_length = max(int(np.round(length / factor)), 1)
+        else:
+            out_length = shape[axis]
+        stop = min(length, out_length * factor)
+        starts = np.arange(out_length) * factor
+        counts = np.diff(np.append(starts, stop))
+        index = (slice(None),) * axis + (slice(0, stop),)
+        sums = np.add.reduceat(data[index], starts, axis=axis)
+        counts_shape = [1] * data.ndim
+        counts_shape[axis] = -1
+        data = sums / counts.reshape(counts_shape)
+    return data
+
+
+def upsample_nearest(data, factor):
+    """ Up-sample the data by repeating each pixel factor x factor times.
+
+    Parameters
+    ----------
+    data : array
+        Data to up-sample.
+    factor : int
+        Up-sampling factor.
+
+    Returns
+    -------
+    array
+        Up-sampled data.
+    """
+    for axis in range(data.ndim):
+        data = np.repeat(data, factor, axis=axis)
+    return data
+
+
+def upsample_linear(data, factor):
+    """ Up-sample the data by separable linear interpolation.
+
+    Output pixel centres are interpolated from the input pixel centres, with
+    the data mirrored at its edges, as skimage.transform.rescale does.
+
+    Parameters
+    ----------
+    data : array
+        Data to up-sample.
+    factor : int
+        Up-sampling factor.
+
+    Returns
+    -------
+    array
+        Up-sampled data.
+    """
+    for axis in range(data.ndim):
+        lower, upper, weight = linear_weights(data.shape[axis], factor)
+        shape = [1] * data.ndim
+        shape[axis] = -1
+        weight = weight.reshape(shape)
+        data = (np.take(data, lower, axis=axis) * (1 - weight) +
+                np.take(data, upper, axis=axis) * weight)
+    return data
+
+
+def linear_weights(length, factor):
+    """ Get the input pixels and weights of linear up-sampling along an axis.
+
+    Parameters
+    ----------
+    length : int
+        Number of input pixels.
+    factor : int
+        Up-sampling factor.
+
+    Returns
+    -------
+    array
+        Index of the lower input pixel of each output pixel.
+    array
+        Index of the upper input pixel of each output pixel.
+    array
+        Weight of the upper input pixel of each output pixel.
+    """
+    # input coords of the output pixel centres, mirrored at the edges
+    coords = np.abs((np.arange(length * factor) + 0.5) / factor - 0.5)
+    coords = np.where(coords > length - 1, 2 * (length - 1) - coords, coords)
+    lower = np.clip(np.floor(coords).astype(int), 0, length - 1)
+    upper = np.minimum(lower + 1, length - 1)
+    return lower, upper, coords - lower
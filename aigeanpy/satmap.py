@@ -1,162 +1,66 @@
 # Disabling missing-class-docstring, consider-using-dict-items,
-# too-many-branches, too-many-locals, too-many-statements, unused-import and
-# bare-except
-# pylint: disable = C0115, R0912, R0914, R0915, W0611, W0702
-import json
-import h5py
-import asdf
-import zipfile
-import numpy as np
-from io import BytesIO
-from matplotlib import pyplot as plt
-import skimage
-from skimage import transform
-import os
+# too-many-branches, too-many-locals, too-many-statements, unused-import,
+# bare-except, too-many-instance-attributes and too-many-lines (the SatMap
+# class alone is most of it)
+# pylint: disable = C0115, R0912, R0914, R0915, W0611, W0702, R0902, C0302
 from pathlib import Path
-
-
-def _earth_to_pixel_tuple(x, y, resolution):
-    """ Change earth coordinate to pixel coordinate.
-
-    Parameters
-    ----------
-    x : tuple
-        Earth coordinate, xcoords.
-    y : tuple
-        Earth coordinate, ycoords.
-    resolution : int
-        Data resolution
-
-    Returns
-    -------
-    tuple
-        Pixel coordinate, xcoords.
-    tuple
-        Pixel coordinate, ycoords. Positive y-values going downwards.
-    """
-    # change earth coords to the pixel coords by
-    # dividing resolution and move the coords to the origin
-    pixel_xcoords = [
-        earth_to_pixel(x[0], y[0], resolution)[0],
-        earth_to_pixel(x[1], y[1], resolution)[0]]
-    # Filp the Y-axis to achieve: In the top-left
-    # corner and positive y-values going downwards.
-    pixel_ycoords = [
-        earth_to_pixel(x[0], y[0], resolution)[1],
-        earth_to_pixel(x[1], y[1], resolution)[1]]
-    if (pixel_xcoords[1]-pixel_xcoords[0]) != round((x[1]-x[0])/resolution):
-        if pixel_xcoords[0] == 0:
-            pixel_xcoords[1] = pixel_xcoords[0] + round((x[1]-x[0])/resolution)
-        else:
-            pixel_xcoords[0] = pixel_xcoords[1] - round((x[1]-x[0])/resolution)
-    if (pixel_ycoords[1]-pixel_ycoords[0]) != round((y[1]-y[0])/resolution):
-        if pixel_ycoords[0] == 0:
-            pixel_ycoords[1] = pixel_ycoords[0] + round((y[1]-y[0])/resolution)
-        else:
-            pixel_ycoords[0] = pixel_ycoords[1] - round((y[1]-y[0])/resolution)
-    return tuple(pixel_xcoords), tuple(pixel_ycoords)
-
-
-def earth_to_pixel(x, y, resolution):
-    """ Change earth coordinate to pixel coordinate.
-
-    Parameters
-    ----------
-    x : int
-        Earth coordinate, xcoords.
-    y : int
-        Earth coordinate, ycoords.
-    resolution : int
-        Data resolution.
-
-    Returns
-    -------
-    int
-        Pixel coordinate, xcoords.
-    int
-        Pixel coordinate, ycoords.
-
-    Examples
-    --------
-    >>> from aigeanpy.satmap import earth_to_pixel
-    >>> x = 10
-    >>> y = 20
-    >>> resolution = 5
-    >>> earth_to_pixel(x,y,resolution)
-    (2, 4)
-    """
-    return round(x/resolution), round(y/resolution)
-
-
-def _pixel_to_earth_tuple(x, y, resolution):
-    """ Change pixel coordinate to earth coordinate.
-
-    Parameters
-    ----------
-    x : tuple
-        Pixel coordinate, xcoords.
-    y : tuple
-        Pixel coordinate, ycoords.
-    resolution : int
-        Data resolution.
-
-    Returns
-    -------
-    tuple
-        Earth coordinate, xcoords.
-    tuple
-        Earth coordinate, ycoords.
-    """
-    # change earth coords to the pixel coords by dividing resolution and move
-    # the coords to the origin
-    xcoords = (pixel_to_earth(x[0], y[0], resolution)[0],
-               pixel_to_earth(x[1], y[1], resolution)[0])
-    # Filp the Y-axis to achieve: In the top-left corner and positive y-values
-    # going downwards.
-    ycoords = (pixel_to_earth(x[0], y[0], resolution)[1],
-               pixel_to_earth(x[1], y[1], resolution)[1])
-    return xcoords, ycoords
-
-
-def pixel_to_earth(x, y, resolution):
-    """ Change pixel coordinate to earth coordinate.
-
-    Parameters
-    ----------
-    x : int
-        Pixel coordinate, xcoords.
-    y : int
-        Pixel coordinate, ycoords.
-    resolution : int
-        Data resolution.
-
-    Returns
-    -------
-    int
-        Earth coordinate, xcoords.
-    int
-        Earth coordinate, ycoords.
-
-    Examples
-    --------
-    >>> from aigeanpy.satmap import pixel_to_earth
-    >>> x = 10
-    >>> y = 20
-    >>> resolution = 5
-    >>> pixel_to_earth(x,y,resolution)
-    (50, 100)
-    """
-    return x * resolution, y * resolution
+from importlib import import_module
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from aigeanpy.fileindex import find_file
+from aigeanpy.cache import satmap_cache
+from aigeanpy.resample import resample, block_mean
+from aigeanpy.spatial import FootprintIndex
+# the coordinate helpers, format readers and pyramid files used to be
+# defined here, and are still imported from here
+from aigeanpy.coords import earth_to_pixel, earth_to_pixel_footprints, \
+    pixel_to_earth, _earth_to_pixel_tuple, _pixel_to_earth_tuple, \
+    _pixel_window, _pixel_windows
+from aigeanpy.readers import get_hdf5, get_asdf, get_zip, get_hdf5_meta, \
+    get_asdf_meta, get_zip_meta, _file_meta
+from aigeanpy.pyramid import pyramid_path, pyramid_levels, \
+    read_pyramid_level, write_pyramid, _is_fresh
 
 
 class SatMapFactory():
-    def get_satmap_obj(self, filename):
+    def get_satmap_obj(self, filename, root=None, use_cache=True, *,
+                       mmap=False, xcoords=None, ycoords=None,
+                       resolution=None):
+        # pylint: disable = R0913
         """ Create a SatMap object through data file for SatMap factory.
 
+        Once aigeanpy.cache.satmap_cache is enabled, files loaded before
+        are taken from it unless they changed on disk. The data of cached
+        files is read-only, see SatMap.detach. Windowed reads, with xcoords
+        or ycoords, don't use the cache.
+
+        Reads at a coarser resolution use the nearest level of the pyramid
+        saved next to the file, see SatMap.save_pyramid, when it is newer
+        than the file.
+
         Parameters
         ----------
         filename : str
             The name of the file holding the data information.
+        root : str, optional
+            The directory to search the file in, by default the current
+            working directory.
+        use_cache : bool, optional
+            Whether to use the cache of loaded files when it is enabled, by
+            default True.
+        mmap : bool, optional
+            Whether to memory-map the data from the file instead of reading
+            it, by default False. See get_hdf5, get_asdf and get_zip.
+        xcoords : tuple, optional
+            Earth coordinates of the window to read along x, by default the
+            whole data.
+        ycoords : tuple, optional
+            Earth coordinates of the window to read along y, by default the
+            whole data.
+        resolution : int, optional
+            The resolution to read the data at, by default the resolution
+            of the file.
 
         Returns
         -------
@@ -167,6 +71,8 @@ class SatMapFactory():
         ------
         ValueError
             File must match given file name.
+        ValueError
+            Window must overlap the data
 
         Examples
         --------
@@ -181,41 +87,182 @@ class SatMapFactory():
         """
         meta = {}
         data = []
-        file_path_abs = None
-        try:
-            if filename[0] == '/':
-                filename = filename[1:]
-            file_path_abs = sorted(Path().rglob(filename))[0]
-        except IndexError as e:
-            raise ValueError("No matching file can be found")
-
-        satmap = None
+        filename, file_path_abs = self._find_file(filename, root)
 
         # if it is a HDF5 file, call the get_hdf5 function
         if 'hdf5' in filename:
-            meta, data = get_hdf5(file_path_abs)
-            satmap = Manannan(meta, data)
+            reader, satmap_type = get_hdf5, Manannan
 
         # if it is a ASDF file, call the get_asdf function
         elif 'asdf' in filename:
-            meta, data = get_asdf(file_path_abs)
-            satmap = Lir(meta, data)
+            reader, satmap_type = get_asdf, Lir
 
         # if it is a zip file, call the get_zip function
         elif 'zip' in filename:
-            meta, data = get_zip(file_path_abs)
-            satmap = Fand(meta, data)
+            reader, satmap_type = get_zip, Fand
+
+        else:
+            return None
+
+        if resolution is not None:
+            meta, data = self._read_level(reader, file_path_abs, mmap=mmap,
+                                          xcoords=xcoords, ycoords=ycoords,
+                                          resolution=resolution)
+            return satmap_type(meta, data)
+
+        # only read the window from disk
+        if xcoords is not None or ycoords is not None:
+            meta, data = reader(file_path_abs, mmap, xcoords, ycoords)
+            return satmap_type(meta, data)
+
+        # reuse the decoded data if the file didn't change since last loaded
+        key = None
+        cached = None
+        if use_cache and satmap_cache.enabled:
+            key = satmap_cache.key(file_path_abs) + (mmap,)
+            cached = satmap_cache.get(key)
+        if cached is None:
+            meta, data = reader(file_path_abs, mmap)
+            if key is not None:
+                satmap_cache.put(key, meta, data)
+        else:
+            meta, data = cached
 
+        satmap = satmap_type(meta, data)
+        satmap.source = file_path_abs
         return satmap
 
+    @staticmethod
+    def _read_level(reader, file_path, *, mmap, xcoords, ycoords,
+                    resolution):
+        # pylint: disable = R0913
+        """ Read the data of a file, or a window of it, at a resolution.
+
+        The data is read from the nearest level of the saved pyramid the
+        resolution is a multiple of, or from the file when there is none.
+
+        Returns
+        -------
+        tuple
+            The meta-data and data at the resolution.
+        """
+        path = pyramid_path(file_path)
+        levels = []
+        if _is_fresh(path, file_path):
+            levels = [level for level in pyramid_levels(path)
+                      if level <= resolution and resolution % level == 0]
+        if levels:
+            level = max(levels)
+            meta = _file_meta(file_path)
+            meta, data = read_pyramid_level(path, level, meta, xcoords,
+                                            ycoords)
+        else:
+            meta, data = reader(file_path, mmap, xcoords, ycoords)
+            level = meta['resolution']
+        data = resample(data, level / resolution)
+        meta['resolution'] = resolution
+        return meta, data
+
+    def get_meta(self, filename, root=None):
+        """ Read only the meta-data of a data file, without its image data.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file holding the data information.
+        root : str, optional
+            The directory to search the file in, by default the current
+            working directory.
+
+        Returns
+        -------
+        dict
+            Including info of data. keys including ('archive', 'instrument',
+            'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_date')
+
+        Raises
+        ------
+        ValueError
+            File must match given file name.
+        ValueError
+            File format must be hdf5, asdf or zip.
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import SatMapFactory
+        >>> satMapFactory = SatMapFactory()
+        >>> filename = 'aigean_lir_20230104_145310.asdf'
+        >>> satMapFactory.get_meta(filename)
+        {'archive': 'ISA', 'instrument': 'Lir', 'observatory': 'Aigean', \
+'resolution': 30, 'xcoords': (100, 700), 'ycoords': (0, 300), \
+'obs_date': '2023-01-04 14:53:10'}
+        """
+        _, file_path_abs = self._find_file(filename, root)
+        meta = _file_meta(file_path_abs)
+
+        return meta
+
+    def _find_file(self, filename, root=None):
+        """ Find the path of the file matching the given file name.
+
+        Parameters
+        ----------
+        filename : str
+            The name of the file holding the data information.
+        root : str, optional
+            The directory to search the file in, by default the current
+            working directory.
 
-def get_satmap(filename):
+        Returns
+        -------
+        str
+            File name without leading slash.
+        Path
+            Path of the first matching file.
+
+        Raises
+        ------
+        ValueError
+            File must match given file name.
+        """
+        if filename and filename[0] == '/':
+            filename = filename[1:]
+        # look the file up in the cached index of the search root
+        file_path_abs = find_file(filename, root)
+        if file_path_abs is None:
+            raise ValueError("No matching file can be found")
+        return filename, file_path_abs
+
+
+def get_satmap(filename, root=None, use_cache=True, *, mmap=False,
+               xcoords=None, ycoords=None, resolution=None):
+    # pylint: disable = R0913
     """ Create a SatMap object through SatMap Factory.
 
     Parameters
     ----------
     filename : str
         The name of the file holding the data information.
+    root : str, optional
+        The directory to search the file in, by default the current working
+        directory.
+    use_cache : bool, optional
+        Whether to use aigeanpy.cache.satmap_cache when it is enabled, by
+        default True. The data of cached files is read-only.
+    mmap : bool, optional
+        Whether to memory-map the data from the file instead of reading it,
+        by default False. The data of large files is then only read from
+        disk when used.
+    xcoords : tuple, optional
+        Earth coordinates of the window to read along x, by default the whole
+        data. Only the pixels in the window are read from disk.
+    ycoords : tuple, optional
+        Earth coordinates of the window to read along y, by default the whole
+        data. Only the pixels in the window are read from disk.
+    resolution : int, optional
+        The resolution to read the data at, by default the resolution of the
+        file. The nearest level of a pyramid saved next to the file is used
+        when there is one, see SatMap.save_pyramid.
 
     Returns
     -------
@@ -230,152 +277,206 @@ def get_satmap(filename):
     {'archive': 'ISA', 'instrument': 'Fand', 'observatory': 'Aigean', \
 'resolution': 5, 'xcoords': (600, 825), 'ycoords': (150, 200), \
 'obs_date': '2023-01-12 07:47:02'}
+    >>> window = get_satmap(filename, xcoords=(700, 750), ycoords=(150, 175))
+    >>> window.meta['xcoords'], window.meta['ycoords'], window.shape
+    ((700, 750), (150, 175), (5, 10))
     """
     # create a SatMap object calling SatMap Factory
     satMapFactory = SatMapFactory()
-    satmap = satMapFactory.get_satmap_obj(filename)
+    satmap = satMapFactory.get_satmap_obj(filename, root, use_cache,
+                                          mmap=mmap, xcoords=xcoords,
+                                          ycoords=ycoords,
+                                          resolution=resolution)
 
     return satmap
 
 
-def get_hdf5(file_path):
-    """ Get meta and data from file.
+def read_meta(filename, root=None):
+    """ Read the meta-data of a file through SatMap Factory.
+
+    Only the HDF5 attributes, the ASDF tree or the zip JSON member are read,
+    so it is much faster than ``get_satmap(filename).meta``.
 
     Parameters
     ----------
-    file_path : str
-        The file path of the file holding the data information.
+    filename : str
+        The name of the file holding the data information.
+    root : str, optional
+        The directory to search the file in, by default the current working
+        directory.
 
     Returns
     -------
     dict
         Including info of data. keys including ('archive', 'instrument',
-        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_time')
-    array
-        Data array.
+        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_date')
 
     Examples
     --------
-    >>> from aigeanpy.satmap import get_hdf5
-    >>> filename = 'aigean_man_20221205_194510.hdf5'
-    >>> file_path_abs = sorted(Path().rglob(filename))[0]
-    >>> get_hdf5(file_path_abs)[0]
-    {'archive': '', 'instrument': 'Manannan', \
-'observatory': 'Aigean', 'resolution': 15, \
-'xcoords': (750, 1200), 'ycoords': (250, 400), \
-'obs_date': '2022-12-05 19:45:10'}
-
+    >>> from aigeanpy.satmap import read_meta
+    >>> filename = 'aigean_fan_20230112_074702.zip'
+    >>> read_meta(filename)
+    {'archive': 'ISA', 'instrument': 'Fand', 'observatory': 'Aigean', \
+'resolution': 5, 'xcoords': (600, 825), 'ycoords': (150, 200), \
+'obs_date': '2023-01-12 07:47:02'}
     """
-    with h5py.File(file_path, 'r') as f:
-        for key in f.keys():
-            data = np.array(f[key]['data'])
-            meta = _meta_generate(f[key].attrs)
-    return meta, data
+    satMapFactory = SatMapFactory()
+    meta = satMapFactory.get_meta(filename, root)
+
+    return meta
 
 
-def get_asdf(file_path):
-    """ Get meta and data from file.
+def load_many(loader, filenames, workers=1, processes=False):
+    """ Load many files at once, keeping going when some of them fail.
 
     Parameters
     ----------
-    file_path : str
-        The file path of the file holding the data information.
+    loader : function
+        Function loading a single file from its name, as get_satmap.
+    filenames : list of strs
+        The names of the files holding the data information.
+    workers : int, optional
+        Number of files loaded at once, by default 1.
+    processes : bool, optional
+        Whether to use a process pool instead of a thread pool, by default
+        False. The loader must then be picklable.
 
     Returns
     -------
+    list
+        Result of the loader for each file, in the same order as the file
+        names. None for the files that failed.
     dict
-        Including info of data. keys including ('archive', 'instrument',
-        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_time')
-    array
-        Data array.
+        Exception raised by each file that failed, keyed by its index in the
+        file names, so repeated names are kept apart.
+
+    Raises
+    ------
+    TypeError
+        Workers must be int type
+    ValueError
+        Workers must larger than 0
 
     Examples
     --------
-    >>> from aigeanpy.satmap import get_asdf
-    >>> filename = 'aigean_lir_20230104_145310.asdf'
-    >>> file_path_abs = sorted(Path().rglob(filename))[0]
-    >>> get_asdf(file_path_abs)[0]
-    {'archive': 'ISA', 'instrument': 'Lir', \
-'observatory': 'Aigean', 'resolution': 30, \
-'xcoords': (100, 700), 'ycoords': (0, 300), \
-'obs_date': '2023-01-04 14:53:10'}
+    >>> from aigeanpy.satmap import load_many, read_meta
+    >>> filenames = ['aigean_lir_20230104_145310.asdf', 'foo.zip']
+    >>> metas, errors = load_many(read_meta, filenames, workers=2)
+    >>> metas[0]['instrument'], metas[1]
+    ('Lir', None)
+    >>> errors
+    {1: ValueError('No matching file can be found')}
     """
-    with asdf.open(file_path, 'r') as f:
-        meta = _meta_generate(f)
-        data = np.array(f['data'])
-    return meta, data
+    if not isinstance(workers, int):
+        raise TypeError('Workers must be int type')
+    if workers <= 0:
+        raise ValueError('Workers must larger than 0')
 
+    load = partial(_try_load, loader)
+    if workers == 1:
+        outcomes = list(map(load, filenames))
+    else:
+        executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        with executor(max_workers=workers) as pool:
+            # map keeps the results in the same order as the file names
+            outcomes = list(pool.map(load, filenames))
 
-def get_zip(file_path):
-    """ Get meta and data from file.
+    results = [result for result, _ in outcomes]
+    errors = {index: err for index, (_, err) in enumerate(outcomes)
+              if err is not None}
+    return results, errors
+
+
+def _try_load(loader, filename):
+    """ Load a single file, catching the exception if it fails.
 
     Parameters
     ----------
-    file_path : str
-        The file path of the file holding the data information.
+    loader : function
+        Function loading a single file from its name.
+    filename : str
+        The name of the file holding the data information.
+
+    Returns
+    -------
+    tuple
+        Result of the loader, or None, and the exception raised, or None.
+    """
+    try:
+        return loader(filename), None
+    except Exception as err:  # pylint: disable = W0703
+        return None, err
+
+
+def get_satmaps(filenames, workers=1, processes=False, root=None,
+                mmap=False):
+    """ Create many SatMap objects at once through SatMap Factory.
+
+    Parameters
+    ----------
+    filenames : list of strs
+        The names of the files holding the data information.
+    workers : int, optional
+        Number of files loaded at once, by default 1.
+    processes : bool, optional
+        Whether to use a process pool instead of a thread pool, by default
+        False.
+    root : str, optional
+        The directory to search the files in, by default the current working
+        directory.
+    mmap : bool, optional
+        Whether to memory-map the data from the files instead of reading it,
+        by default False.
 
     Returns
     -------
+    list of SatMaps
+        A SatMap object for each file, in the same order as the file names.
+        None for the files that failed.
     dict
-        including info of data. keys including ('archive', 'instrument',
-        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_time')
-    array
-        Data array.
+        Exception raised by each file that failed, keyed by its index in the
+        file names.
 
     Examples
     --------
-    >>> from aigeanpy.satmap import get_zip
-    >>> filename = 'aigean_fan_20230112_074702.zip'
-    >>> file_path_abs = sorted(Path().rglob(filename))[0]
-    >>> get_zip(file_path_abs)[0]
-    {'archive': 'ISA', 'instrument': 'Fand', \
-'observatory': 'Aigean', 'resolution': 5, \
-'xcoords': (600, 825), 'ycoords': (150, 200), \
-'obs_date': '2023-01-12 07:47:02'}
-
+    >>> from aigeanpy.satmap import get_satmaps
+    >>> filenames = ['aigean_fan_20230112_074702.zip',
+    ...              'aigean_man_20221205_194510.hdf5']
+    >>> satmaps, errors = get_satmaps(filenames, workers=2)
+    >>> [satmap.meta['instrument'] for satmap in satmaps], errors
+    (['Fand', 'Manannan'], {})
     """
-
-    with zipfile.ZipFile(file_path, 'r') as f:
-        file_json = json.load(BytesIO(f.read(f.namelist()[0])))
-        meta = _meta_generate(file_json)
-        data = np.load(BytesIO(f.read(f.namelist()[1])))
-    return meta, data
+    return load_many(partial(get_satmap, root=root, mmap=mmap), filenames,
+                     workers, processes)
 
 
-def _meta_generate(meta_origin):
-    """ Generate meta data.
+def read_metas(filenames, workers=1, processes=False, root=None):
+    """ Read the meta-data of many files at once through SatMap Factory.
 
     Parameters
     ----------
-    meta_origin : dict
-        A dict with multiple informations.
+    filenames : list of strs
+        The names of the files holding the data information.
+    workers : int, optional
+        Number of files read at once, by default 1.
+    processes : bool, optional
+        Whether to use a process pool instead of a thread pool, by default
+        False.
+    root : str, optional
+        The directory to search the files in, by default the current working
+        directory.
 
     Returns
     -------
+    list of dicts
+        The meta-data of each file, in the same order as the file names.
+        None for the files that failed.
     dict
-        A dict including info of data. keys including ('archive', 'instrument',
-        'observatory','resolution','xcoords','ycoords','obs_time')
+        Exception raised by each file that failed, keyed by its index in the
+        file names.
     """
-    meta = {}
-    # meta contain following keys
-    meta_list = ['archive', 'instrument', 'observatory', 'resolution',
-                 'xcoords', 'ycoords']
-    for key in meta_list:
-        # update the information to the meta
-        try:
-            meta.update({key: meta_origin[key]})
-        # update with an empty value if the file do not contain the key
-        except:  # noqa
-            meta.update({key: ''})
-
-    # change coords into tuple, the type of each element is int
-    meta['xcoords'] = tuple(map(int, meta['xcoords']))
-    meta['ycoords'] = tuple(map(int, meta['ycoords']))
-    # combine the date and time
-    date = f"{meta_origin['date']} {meta_origin['time']}"
-    meta.update({'obs_date': date})
-
-    return meta
+    return load_many(partial(read_meta, root=root), filenames, workers,
+                     processes)
 
 
 class SatMap:
@@ -390,6 +491,10 @@ class SatMap:
         'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_date')
     data : array
         Data to generate the corresponding figure.
+    source : Path or None
+        Path of the file the data was loaded from, None for derived SatMaps.
+    pyramid : dict
+        Down-sampled copies of the data, keyed by their resolution.
 
     Methods
     -------
@@ -402,8 +507,34 @@ class SatMap:
         Subtract this Satmap with the other input Satmap.
     mosaic(another_satmap, resolution=None, padding=True)
         Do the more complex Satmap object adding.
-    visualise(self, save=False, save_path='')
+    visualise(self, save=False, save_path='', resolution=None)
         Visualise this Satmap object with correponding figure data attribute.
+    figure_name()
+        Get the name of the PNG the data is saved in.
+    build_pyramid(resolutions=None)
+        Build down-sampled copies of the data.
+    nearest_level(resolution)
+        Get the pyramid level closest to a resolution.
+    resampled(resolution, method='auto')
+        Get the data at a resolution, from the nearest pyramid level.
+    save_pyramid(path=None)
+        Save the pyramid next to the source file.
+    load_pyramid(path=None)
+        Load the pyramid saved next to the source file.
+    lazy()
+        Start a deferred expression of SatMap arithmetic.
+    crop(xcoords=None, ycoords=None)
+        Get a window of the data, sharing its buffer.
+    window(xcoords=None, ycoords=None)
+        Get the meta-data and the view of a window of the data.
+    detach()
+        Copy the data, so it can be changed without changing other maps.
+    integral_image()
+        Get the summed-area table of the data.
+    zonal_stats(boxes)
+        Get the sum, mean and count of the data in many boxes.
+    sample(x, y, method='nearest', fill_value=np.nan)
+        Get the values of the data at many points.
     """
 
     def __init__(self, meta, data):
@@ -446,6 +577,10 @@ class SatMap:
         self.centre = (int((meta['xcoords'][1] + meta['xcoords'][0]) / 2),
                        int((meta['ycoords'][1] + meta['ycoords'][0]) / 2))
         self.extra = False
+        self.source = None
+        self.pyramid = {}
+        # data the summed-area table was built from, and the table
+        self._integral = None
 
     def __add__(self, another_satmap):
         """ Do the object adding.
@@ -615,49 +750,10 @@ with different resolution cannot be added')
 
         if not (data_ex[1] > data_ex[0] and data_ey[1] > data_ey[0]):
             raise ValueError('Two data must overlap')
-        # earth distance from new object bottom left to the origin(0,0)
-        offset = (data_ex[0], data_ey[0])
-
-        # get resolution from object
-        resolution = self.meta['resolution']
-
-        # earth coords without offset
-        data_ex_offset = (data_ex[0]-offset[0], data_ex[1]-offset[0])
-        data_ey_offset = (data_ey[0]-offset[1], data_ey[1]-offset[1])
-        self_ex_offset = (self.meta['xcoords'][0]-offset[0],
-                          self.meta['xcoords'][1]-offset[0])
-        self_ey_offset = (self.meta['ycoords'][0]-offset[1],
-                          self.meta['ycoords'][1]-offset[1])
-        another_ex_offset = (another_satmap.meta['xcoords'][0] - offset[0],
-                             another_satmap.meta['xcoords'][1] - offset[0])
-        another_ey_offset = (another_satmap.meta['ycoords'][0] - offset[1],
-                             another_satmap.meta['ycoords'][1] - offset[1])
-
-        # change earth coords to pixel coords
-        data_px, data_py = _earth_to_pixel_tuple(data_ex_offset,
-                                                 data_ey_offset, resolution)
-        self_px, self_py = _earth_to_pixel_tuple(self_ex_offset,
-                                                 self_ey_offset, resolution)
-        another_px, another_py = _earth_to_pixel_tuple(another_ex_offset,
-                                                       another_ey_offset,
-                                                       resolution)
-
-        # generate empty subtracted data
-        data = np.zeros((data_py[1] - data_py[0], data_px[1] - data_px[0]))
-        # find the pixel coordinates of the overlaps on the original data
-        self_offset = (max(0, -self_py[0]), max(0, -self_px[0]))
-        # import data from origin data into the empty subtracted data
-        data = self.data[self_offset[0]:data_py[1] + self_offset[0],
-                         self_offset[1]:data_px[1] + self_offset[1]]
-
-        # find the pixel coordinates of the overlaps on another original data
-        another_offset = (max(0, -another_py[0]), max(0, -another_px[0]))
-        # import data from another_data into the empty subtracted data, and
-        # subtract 2 data
-        data = data - another_satmap.data[another_offset[0]:data_py[1] +
-                                          another_offset[0],
-                                          another_offset[1]:data_px[1] +
-                                          another_offset[1]]
+        # subtract the views of the overlap on both data, the only new
+        # array is the result
+        data = self.window(data_ex, data_ey)[1] - \
+            another_satmap.window(data_ex, data_ey)[1]
 
         # copy the data info from the addend, but update the new coords
         meta = self.meta.copy()
@@ -677,7 +773,8 @@ with different resolution cannot be added')
 
         return new_satmap
 
-    def mosaic(self, another_satmap, resolution=None, padding=True):
+    def mosaic(self, another_satmap, resolution=None, padding=True,
+               method='auto'):
         """ Do the more complex object adding.
 
         Parameters
@@ -688,6 +785,12 @@ with different resolution cannot be added')
             The resolution of the desired data, by default None.
         padding : bool, optional
             A flag determines whether emtpy space is reserved, by default True.
+        method : str, optional
+            The resampling method, by default 'auto', which uses the fast
+            integer-ratio resampler whenever the resolutions allow it.
+            Its block means don't match skimage's down-sampling, use
+            'skimage' for the results of earlier versions. See
+            aigeanpy.resample.resample.
 
         Returns
         -------
@@ -754,11 +857,10 @@ with different resolution cannot be added')
             if resolution <= 0:
                 raise ValueError('Resolution must larger than 0')
 
-        # rescale the data, up-sampling or down-sampling
-        data_self = transform.rescale(
-            self.data, self.meta['resolution']/resolution)
-        data_another = transform.rescale(
-            another_satmap.data, another_satmap.meta['resolution']/resolution)
+        # rescale the data, up-sampling or down-sampling from the nearest
+        # pyramid level
+        data_self = self.resampled(resolution, method)
+        data_another = another_satmap.resampled(resolution, method)
 
         # copy the data info from the addend, but update the new resolution
         meta_self = self.meta.copy()
@@ -780,96 +882,16 @@ with different resolution cannot be added')
             # mosaic added with padding=True
             setmap_padding = setmap_self + setmap_another
 
-            # get the intersection coords
-            intersect_coords_x = (max(setmap_self.meta['xcoords'][0],
-                                      setmap_another.meta['xcoords'][0]),
-                                  min(setmap_self.meta['xcoords'][1],
-                                      setmap_another.meta['xcoords'][1]))
-            intersect_coords_y = (max(setmap_self.meta['ycoords'][0],
-                                      setmap_another.meta['ycoords'][0]),
-                                  min(setmap_self.meta['ycoords'][1],
-                                      setmap_another.meta['ycoords'][1]))
-            # earth distance from new object bottom left to the origin(0,0)
-            offset = (setmap_padding.meta['xcoords'][0],
-                      setmap_padding.meta['ycoords'][0])
-
-            data_ex_offset = (intersect_coords_x[0]-offset[0],
-                              intersect_coords_x[1]-offset[0])
-            data_ey_offset = (intersect_coords_y[0]-offset[1],
-                              intersect_coords_y[1]-offset[1])
-            added_ex_offset = (setmap_padding.meta['xcoords'][0]-offset[0],
-                               setmap_padding.meta['xcoords'][1]-offset[0])
-            added_ey_offset = (setmap_padding.meta['ycoords'][0]-offset[1],
-                               setmap_padding.meta['ycoords'][1]-offset[1])
-            self_ex_offset = (self.meta['xcoords'][0]-offset[0],
-                              self.meta['xcoords'][1]-offset[0])
-            self_ey_offset = (self.meta['ycoords'][0]-offset[1],
-                              self.meta['ycoords'][1]-offset[1])
-            another_ex_offset = (another_satmap.meta['xcoords'][0]-offset[0],
-                                 another_satmap.meta['xcoords'][1]-offset[0])
-            another_ey_offset = (another_satmap.meta['ycoords'][0]-offset[1],
-                                 another_satmap.meta['ycoords'][1]-offset[1])
-
-            # change earth coords to pixel coords
-            data_px, data_py = _earth_to_pixel_tuple(data_ex_offset,
-                                                     data_ey_offset,
-                                                     resolution)
-            added_px, added_py = _earth_to_pixel_tuple(added_ex_offset,
-                                                       added_ey_offset,
-                                                       resolution)
-            self_px, self_py = _earth_to_pixel_tuple(self_ex_offset,
-                                                     self_ey_offset,
-                                                     resolution)
-            another_px, another_py = _earth_to_pixel_tuple(another_ex_offset,
-                                                           another_ey_offset,
-                                                           resolution)
-
-            # 4 conditions. and shape=['pixel_xcoords', 'pixel_ycoords'] of
-            # each condition.
-            # shape_1 is: Intercept the overlap area horizontally in the mosaic
-            # added data
-            # shape_2 is: Intercept the overlap area vertically in the mosaic
-            # added data
-            # shape_3 is: The 'self.data' is the largest after up-sampling or
-            # down-sampling
-            # shape_4 is: The 'another_satmap.data' is the largest after
-            # up-sampling or down-sampling
-            shape_1 = [data_px, added_py]
-            shape_2 = [added_px, data_py]
-            shape_3 = [self_px, self_py]
-            shape_4 = [another_px, another_py]
-            # list of 4 condition coords
-            shape = [shape_1, shape_2, shape_3, shape_4]
-
-            # get the index of maximum area by multiplying the length and width
-            # of the data
-            index = np.argmax(np.array(
-                [(shape[i][0][1] - shape[i][0][0]) *
-                 (shape[i][1][1] - shape[i][1][0])
-                 for i in range(len(shape))]))
-
-            # get the coords of max area
-            max_coords_x = shape[index][0]
-            max_coords_y = shape[index][1]
-
-            # import data from mosaic added data into the non-empty mosaic
-            # added data
-            data = setmap_padding.data[max_coords_y[0]:max_coords_y[1],
-                                       max_coords_x[0]:max_coords_x[1]]
-
-            # change the pixel coords to the earth coords
-            earth_xcoords, earth_ycoords = _pixel_to_earth_tuple(max_coords_x,
-                                                                 max_coords_y,
-                                                                 resolution)
+            # earth coords of the largest non-empty area
+            xcoords, ycoords = _mosaic_crop(self.meta, another_satmap.meta,
+                                            resolution)
+            # view of the non-empty area on the mosaic added data
+            data = setmap_padding.window(xcoords, ycoords)[1]
 
             # copy the data info from the addend, but update the new coords
             meta = setmap_self.meta.copy()
-            meta['xcoords'] = (earth_xcoords[0] + offset[0],
-                               earth_xcoords[1] + offset[0])
-            # meta['ycoords'] = (offset[1] - earth_ycoords[1],
-            # offset[1] - earth_ycoords[0])
-            meta['ycoords'] = (earth_ycoords[0] + offset[1],
-                               earth_ycoords[1] + offset[1])
+            meta['xcoords'] = xcoords
+            meta['ycoords'] = ycoords
 
             # generate a new SatMap object and return
             setmap = type(self)(meta, data)
@@ -884,15 +906,19 @@ with different resolution cannot be added')
         setmap.extra = True
         return setmap
 
-    def visualise(self, save=False, save_path=''):  # pylint: disable = R1710
+    def visualise(self, save=False, save_path='', resolution=None):
         """ Visualise the data.
 
         Parameters
         ----------
         save : bool, optional
-            Choose plot the figure or show the figure, by default False.
+            Choose plot the figure or show the figure, by default False. The
+            figure is saved without pyplot, see aigeanpy.render.render.
         save_path : str, optional
             The path figure saved, by default ''.
+        resolution : int, optional
+            The resolution of the figure, by default the data resolution. The
+            nearest pyramid level is used to draw it.
 
         Returns
         -------
@@ -920,9 +946,41 @@ with different resolution cannot be added')
             raise TypeError('Save must in bool type')
         if not isinstance(save_path, str):
             raise TypeError('Save_path must be a str')
-        plt.imshow(self.data, origin='lower',
+
+        if save:
+            # saved without pyplot, so no figure is left behind, through
+            # aigeanpy.render which imports this module
+            render = import_module('aigeanpy.render').render
+            return render(self, save_path, resolution)
+
+        from matplotlib import pyplot as plt  # pylint: disable = C0415
+
+        data = self.data
+        if resolution is not None:
+            data = self.resampled(resolution)
+        plt.imshow(data, origin='lower',
                    extent=[self.meta['xcoords'][0], self.meta['xcoords'][1],
                            self.meta['ycoords'][0], self.meta['ycoords'][1]])
+        plt.show()
+        return None
+
+    def figure_name(self):
+        """ Get the name of the PNG the data is saved in.
+
+        Returns
+        -------
+        str
+            The observatory, instrument, date and time, with '_extra' for
+            the SatMaps which aren't the data of a single file.
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> fand.figure_name(), fand.crop((450, 500)).figure_name()
+        ('Aigean_Fand_20230104_150010.png', \
+'Aigean_Fand_20230104_150010_extra.png')
+        """
         if self.extra:
             extra = '_extra'
         else:
@@ -932,10 +990,394 @@ with different resolution cannot be added')
         time = ''.join(date_time[1].split(':'))
         filename = str(self.meta['observatory']) + '_' + str(
             self.meta['instrument']) + '_' + date + '_' + time + extra + '.png'
-        if save:
-            plt.savefig(os.path.join(save_path, filename))
-            return filename
-        plt.show()
+        return filename
+
+    def build_pyramid(self, resolutions=None):
+        """ Build down-sampled copies of the data.
+
+        Each level is down-sampled by block means from the nearest level
+        already built, so building many levels costs little more than the
+        first one. Levels have the shape the data down-sampled in one step
+        would have.
+
+        Parameters
+        ----------
+        resolutions : list of ints, optional
+            The resolutions of the levels, multiples of the data resolution.
+            By default the data resolution times 2, 4, 8, ... while the
+            level holds at least one pixel.
+
+        Returns
+        -------
+        dict
+            The pyramid, keyed by the resolution of each level.
+
+        Raises
+        ------
+        ValueError
+            Pyramid resolutions must be multiples of the data resolution
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> pyramid = fand.build_pyramid([15, 30])
+        >>> {resolution: level.shape for resolution, level in pyramid.items()}
+        {15: (3, 15), 30: (2, 8)}
+        """
+        native = int(self.meta['resolution'])
+        if resolutions is None:
+            resolutions = []
+            factor = 2
+            while min(self.shape) // factor >= 1:
+                resolutions.append(native * factor)
+                factor *= 2
+        for resolution in resolutions:
+            if resolution <= native or resolution % native != 0:
+                raise ValueError('Pyramid resolutions must be multiples of '
+                                 'the data resolution')
+
+        for resolution in sorted(resolutions):
+            level_resolution, data = self.nearest_level(resolution)
+            factor = resolution // level_resolution
+            # round the shape from the data, rounding each level in turn
+            # may drift by a pixel
+            shape = tuple(max(int(np.round(length * native / resolution)), 1)
+                          for length in self.shape)
+            if any(length > -(-level_length // factor) for length,
+                   level_length in zip(shape, data.shape)):
+                data, factor = self.data, resolution // native
+            self.pyramid[int(resolution)] = block_mean(
+                np.asarray(data, dtype=float), factor, shape)
+        return self.pyramid
+
+    def nearest_level(self, resolution):
+        """ Get the pyramid level closest to a resolution.
+
+        That is the coarsest level finer or equal to the resolution,
+        preferring levels the resolution is a multiple of, so the level can
+        be down-sampled by an integer factor. The data itself is the finest
+        level.
+
+        Parameters
+        ----------
+        resolution : int
+            The desired resolution.
+
+        Returns
+        -------
+        int
+            The resolution of the level.
+        array
+            The data of the level.
+        """
+        levels = {int(self.meta['resolution']): self.data, **self.pyramid}
+        finer = [level for level in levels if level <= resolution]
+        if not finer:
+            return min(levels), levels[min(levels)]
+        multiples = [level for level in finer if resolution % level == 0]
+        level = max(multiples) if multiples else max(finer)
+        return level, levels[level]
+
+    def resampled(self, resolution, method='auto'):
+        """ Get the data at a resolution, from the nearest pyramid level.
+
+        Parameters
+        ----------
+        resolution : int
+            The desired resolution.
+        method : str, optional
+            The resampling method, by default 'auto'. See
+            aigeanpy.resample.resample.
+
+        Returns
+        -------
+        array
+            A new array with the data at the resolution.
+        """
+        level_resolution, data = self.nearest_level(resolution)
+        return resample(data, level_resolution / resolution, method)
+
+    def save_pyramid(self, path=None):
+        """ Save the pyramid next to the source file.
+
+        Parameters
+        ----------
+        path : str or Path, optional
+            The path of the saved pyramid, by default the path of the source
+            file followed by '.pyramid.npz'.
+
+        Returns
+        -------
+        Path
+            The path of the saved pyramid.
+
+        Raises
+        ------
+        ValueError
+            Path must be given for SatMaps without source file
+        """
+        if path is None:
+            if self.source is None:
+                raise ValueError('Path must be given for SatMaps without '
+                                 'source file')
+            path = pyramid_path(self.source)
+        return write_pyramid(self.pyramid, path)
+
+    def load_pyramid(self, path=None):
+        """ Load the pyramid saved next to the source file.
+
+        The levels are memory-mapped, so only the parts used are read. A
+        pyramid older than the source file is ignored.
+
+        Parameters
+        ----------
+        path : str or Path, optional
+            The path of the saved pyramid, by default the path of the source
+            file followed by '.pyramid.npz'.
+
+        Returns
+        -------
+        bool
+            Whether the pyramid was loaded.
+        """
+        if path is None:
+            if self.source is None:
+                return False
+            path = pyramid_path(self.source)
+            if not _is_fresh(path, self.source):
+                return False
+        path = Path(path)
+        if not path.is_file():
+            return False
+        for resolution in pyramid_levels(path):
+            self.pyramid[resolution] = read_pyramid_level(path, resolution)
+        return True
+
+    def crop(self, xcoords=None, ycoords=None):
+        """ Get a window of the data, sharing its buffer.
+
+        The data of the window is a read-only view on the data, so cropping
+        a large scene many times doesn't copy it. Call detach on the window
+        before changing its data.
+
+        Parameters
+        ----------
+        xcoords : tuple, optional
+            Earth coordinates of the window along x, by default the whole
+            data.
+        ycoords : tuple, optional
+            Earth coordinates of the window along y, by default the whole
+            data.
+
+        Returns
+        -------
+        SatMap
+            A new SatMap of the window, snapped to the pixels of the data.
+
+        Raises
+        ------
+        ValueError
+            Window must overlap the data
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> fand = get_satmap('aigean_fan_20230112_074702.zip')
+        >>> window = fand.crop((700, 750), (150, 175))
+        >>> window.meta['xcoords'], window.meta['ycoords'], window.centre
+        ((700, 750), (150, 175), (725, 162))
+        >>> window.data.base is not None, window.data.flags.writeable
+        (True, False)
+        """
+        meta, data = self.window(xcoords, ycoords)
+        data = data.view()
+        data.flags.writeable = False
+        satmap = type(self)(meta, data)
+        satmap.extra = True
+        return satmap
+
+    def window(self, xcoords=None, ycoords=None):
+        """ Get the meta-data and the view of a window of the data.
+
+        Unlike crop, the view keeps the writeable flag of the data.
+
+        Parameters
+        ----------
+        xcoords : tuple, optional
+            Earth coordinates of the window along x, by default the whole
+            data.
+        ycoords : tuple, optional
+            Earth coordinates of the window along y, by default the whole
+            data.
+
+        Returns
+        -------
+        dict
+            Meta-data of the window.
+        array
+            View of the window on the data.
+        """
+        rows, cols, meta = _pixel_window(self.meta, self.data.shape,
+                                         xcoords, ycoords)
+        return meta.copy(), self.data[rows, cols]
+
+    def detach(self):
+        """ Copy the data, so it can be changed without changing other maps.
+
+        The data is only copied when it is shared or read-only, as the data
+        of windows, memory-mapped files and cached files are.
+
+        Returns
+        -------
+        SatMap
+            This SatMap.
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> fand = get_satmap('aigean_fan_20230112_074702.zip')
+        >>> window = fand.crop((700, 750), (150, 175)).detach()
+        >>> window.data[0, 0] = 0
+        >>> window.data.flags.owndata
+        True
+        """
+        if self.data.base is not None or not self.data.flags.writeable:
+            self.data = self.data.copy()
+        return self
+
+    def integral_image(self):
+        """ Get the summed-area table of the data.
+
+        The table is built on first use and kept until the data array is
+        replaced, e.g. by detach. Changes made to the data in place are not
+        seen, assign new data to the SatMap instead.
+
+        Returns
+        -------
+        array
+            The table, of one more row and column than the data. Each value
+            is the sum of the data above and left of it.
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> from aigeanpy.satmap import SatMap
+        >>> meta = {'resolution': 10, 'xcoords': (0, 30), 'ycoords': (0, 20)}
+        >>> satmap = SatMap(meta, np.arange(6.).reshape(2, 3))
+        >>> satmap.integral_image()
+        array([[ 0.,  0.,  0.,  0.],
+               [ 0.,  0.,  1.,  3.],
+               [ 0.,  3.,  8., 15.]])
+        """
+        if self._integral is None or self._integral[0] is not self.data:
+            table = np.zeros((self.data.shape[0] + 1, self.data.shape[1] + 1))
+            np.cumsum(self.data, axis=0, out=table[1:, 1:])
+            np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+            self._integral = (self.data, table)
+        return self._integral[1]
+
+    def zonal_stats(self, boxes):
+        """ Get the sum, mean and count of the data in many boxes.
+
+        Each box is snapped to the pixels of the data as crop does, then its
+        sum is read from the summed-area table with four lookups, so the
+        cost of a box doesn't depend on its size.
+
+        Parameters
+        ----------
+        boxes : list of tuples
+            Earth coordinates of the boxes, as (xcoords, ycoords).
+
+        Returns
+        -------
+        dict
+            Keys including ('sum', 'mean', 'count'), an array each with a
+            value per box. Boxes off the data have a count and sum of 0 and
+            a NaN mean.
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> fand = get_satmap('aigean_fan_20230112_074702.zip')
+        >>> boxes = [((700, 750), (150, 175)), ((0, 100), (0, 100))]
+        >>> stats = fand.zonal_stats(boxes)
+        >>> stats['count']
+        array([50,  0])
+        >>> np.isclose(stats['sum'][0], fand.crop(*boxes[0]).data.sum())
+        True
+        """
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 2, 2)
+        rows, cols = _pixel_windows(self.meta, self.data.shape,
+                                    boxes[:, 0], boxes[:, 1])
+        table = self.integral_image()
+        (top, bottom), (left, right) = rows.T, cols.T
+        sums = (table[bottom, right] - table[top, right]
+                - table[bottom, left] + table[top, left])
+        counts = (rows[:, 1] - rows[:, 0]) * (cols[:, 1] - cols[:, 0])
+        means = np.divide(sums, counts, out=np.full(len(sums), np.nan),
+                          where=counts > 0)
+        return {'sum': sums, 'mean': means, 'count': counts}
+
+    def sample(self, x, y, method='nearest', fill_value=np.nan):
+        """ Get the values of the data at many points.
+
+        Parameters
+        ----------
+        x : float or array
+            Earth coordinates of the points along x.
+        y : float or array
+            Earth coordinates of the points along y.
+        method : str, optional
+            'nearest' for the value of the pixel holding each point, or
+            'bilinear' to interpolate between the centres of the 4 nearest
+            pixels, by default 'nearest'.
+        fill_value : float, optional
+            The value of the points off the data, by default NaN.
+
+        Returns
+        -------
+        array
+            The value at each point, of the shape of x and y.
+
+        Raises
+        ------
+        ValueError
+            Method must be nearest or bilinear
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> fand = get_satmap('aigean_fan_20230112_074702.zip')
+        >>> values = fand.sample([600, 702.5, 900], [150, 177.5, 160])
+        >>> values[:2] == fand.data[[0, 5], [0, 20]], values[2]
+        (array([ True,  True]), nan)
+        """
+        pixels = _sample_pixels(self.meta, self.data.shape, x, y, method)
+        return _interpolate(self.data, pixels, fill_value)
+
+    def lazy(self):
+        """ Start a deferred expression of SatMap arithmetic.
+
+        Adding and subtracting the result builds an expression, evaluated
+        in one pass by compute. See aigeanpy.expression.LazySatMap.
+
+        Returns
+        -------
+        LazySatMap
+            The SatMap as a leaf of an expression.
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> fand1 = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> fand2 = get_satmap('aigean_fan_20230112_074702.zip')
+        >>> diff = ((fand1.lazy() + fand1) - fand2).compute()
+        >>> (diff.data == ((fand1 + fand1) - fand2).data).all()
+        True
+        """
+        # aigeanpy.expression imports this module
+        return import_module('aigeanpy.expression').LazySatMap(self)
 
 
 class Lir(SatMap):
@@ -957,3 +1399,356 @@ class Fand(SatMap):
     Fand class extends to SatMap, which contains
         all the attributes and methods from SatMap.
     """
+
+
+def mosaic_many(satmaps, resolution=None, method='auto'):
+    """ Build a mosaic from many SatMap objects in a single pass.
+
+    The footprints are checked and ordered up front, the mosaic data is
+    allocated once and each SatMap is rescaled once before being written in.
+    Where SatMaps overlap, the data of the later one is kept. SatMaps are
+    added in the same order as chaining SatMap.mosaic would: first the first
+    overlapping pair in the list, then always the first remaining SatMap
+    overlapping the mosaic.
+
+    Parameters
+    ----------
+    satmaps : list of SatMaps
+        SatMap objects to build the mosaic.
+    resolution : int, optional
+        The resolution of the mosaic, by default the smallest resolution among
+        the SatMaps.
+    method : str, optional
+        The resampling method, by default 'auto'. Use 'skimage' for the
+        down-sampling of earlier versions. See aigeanpy.resample.resample.
+
+    Returns
+    -------
+    SatMap
+        A new object holding the mosaic.
+
+    Raises
+    ------
+    TypeError
+        Satmaps must in SatMap type
+    TypeError
+        Resolution must be int type
+    ValueError
+        Resolution must larger than 0
+    ValueError
+        At least one SatMap is needed
+    ValueError
+        2 data must in the same day
+    ValueError
+        Two data must overlap
+
+    Examples
+    --------
+    >>> from aigeanpy.satmap import get_satmap, mosaic_many
+    >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+    >>> lir = get_satmap('aigean_lir_20230104_145310.asdf')
+    >>> mosaic = mosaic_many([fand, lir])
+    >>> mosaic.meta['resolution'], mosaic.centre, mosaic.shape
+    (5, (400, 150), (60, 120))
+    """
+    if len(satmaps) == 0:
+        raise ValueError('At least one SatMap is needed')
+    for satmap in satmaps:
+        if not isinstance(satmap, SatMap):
+            raise TypeError('Satmaps must in SatMap type')
+
+    # if the resolution is not specified, choose the smallest resolution
+    if resolution is None:
+        resolution = int(min(satmap.meta['resolution'] for satmap in satmaps))
+    else:
+        if not isinstance(resolution, int):
+            raise TypeError('Resolution must be int type')
+        if resolution <= 0:
+            raise ValueError('Resolution must larger than 0')
+
+    # check the footprints up front, before touching any data
+    first = satmaps[0]
+    for satmap in satmaps:
+        if satmap.meta['obs_date'][:10] != first.meta['obs_date'][:10]:
+            raise ValueError('2 data must in the same day')
+    order = FootprintIndex.from_metas(
+        [satmap.meta for satmap in satmaps]).mosaic_order()
+    first = satmaps[order[0]]
+
+    # earth coords of the mosaic
+    data_ex = (min(satmap.meta['xcoords'][0] for satmap in satmaps),
+               max(satmap.meta['xcoords'][1] for satmap in satmaps))
+    data_ey = (min(satmap.meta['ycoords'][0] for satmap in satmaps),
+               max(satmap.meta['ycoords'][1] for satmap in satmaps))
+    # earth distance from mosaic bottom left to the origin(0,0)
+    offset = (data_ex[0], data_ey[0])
+
+    # generate the empty mosaic data once
+    data_px, data_py = _earth_to_pixel_tuple(
+        (data_ex[0]-offset[0], data_ex[1]-offset[0]),
+        (data_ey[0]-offset[1], data_ey[1]-offset[1]), resolution)
+    data = np.zeros((data_py[1] - data_py[0], data_px[1] - data_px[0]))
+
+    for i in order:
+        satmap = satmaps[i]
+        # change earth coords to pixel coords
+        satmap_px, satmap_py = _earth_to_pixel_tuple(
+            (satmap.meta['xcoords'][0]-offset[0],
+             satmap.meta['xcoords'][1]-offset[0]),
+            (satmap.meta['ycoords'][0]-offset[1],
+             satmap.meta['ycoords'][1]-offset[1]), resolution)
+        # rescale the data once, up-sampling or down-sampling, and write it in
+        data[satmap_py[0]:satmap_py[1], satmap_px[0]:satmap_px[1]] = \
+            satmap.resampled(resolution, method)
+
+    # copy the data info from the first SatMap, but update the new coords
+    meta = first.meta.copy()
+    meta['resolution'] = resolution
+    meta['xcoords'] = data_ex
+    meta['ycoords'] = data_ey
+
+    # generate a new SatMap object and return
+    mosaic = type(first)(meta, data)
+    mosaic.extra = True
+    return mosaic
+
+
+def sample_many(satmaps, x, y, method='nearest', fill_value=np.nan):
+    """ Get the values of the data of SatMaps sharing a grid at many points.
+
+    The pixels and weights of the points are found once for every SatMap.
+
+    Parameters
+    ----------
+    satmaps : list of SatMaps
+        The SatMaps, with the same coordinates, resolution and shape.
+    x : float or array
+        Earth coordinates of the points along x.
+    y : float or array
+        Earth coordinates of the points along y.
+    method : str, optional
+        'nearest' or 'bilinear', by default 'nearest'. See SatMap.sample.
+    fill_value : float, optional
+        The value of the points off the data, by default NaN.
+
+    Returns
+    -------
+    array
+        The value of each SatMap at each point, of shape
+        (len(satmaps),) + the shape of x and y.
+
+    Raises
+    ------
+    ValueError
+        At least one SatMap is needed
+    ValueError
+        SatMaps must share a grid
+
+    Examples
+    --------
+    >>> from aigeanpy.satmap import get_satmap, sample_many
+    >>> from aigeanpy.temporal import SatMapStack
+    >>> fand1 = get_satmap('aigean_fan_20230104_150010.zip')
+    >>> fand2 = get_satmap('aigean_fan_20230112_074702.zip')
+    >>> stack = SatMapStack([fand1, fand2])
+    >>> satmaps = [stack.satmap(index, np.nan) for index in range(2)]
+    >>> np.isnan(sample_many(satmaps, [500, 700], [160, 160]))
+    array([[False,  True],
+           [ True, False]])
+    """
+    if len(satmaps) == 0:
+        raise ValueError('At least one SatMap is needed')
+    grid = satmaps[0]
+    for satmap in satmaps:
+        if satmap.data.shape != grid.data.shape or any(
+                satmap.meta[key] != grid.meta[key]
+                for key in ('resolution', 'xcoords', 'ycoords')):
+            raise ValueError('SatMaps must share a grid')
+    pixels = _sample_pixels(grid.meta, grid.data.shape, x, y, method)
+    return np.stack([_interpolate(satmap.data, pixels, fill_value)
+                     for satmap in satmaps])
+
+
+def _sample_pixels(meta, shape, x, y, method):
+    """ Find the pixels and weights the values at points are read from.
+
+    Pixel (row, col) covers the earth coordinates from xcoords[0] + col *
+    resolution and ycoords[0] + row * resolution, up to the next pixel.
+    Points on the edges of the data are on it.
+
+    Parameters
+    ----------
+    meta : dict
+        Meta-data of the data.
+    shape : tuple
+        Shape of the data.
+    x : float or array
+        Earth coordinates of the points along x.
+    y : float or array
+        Earth coordinates of the points along y.
+    method : str
+        'nearest' or 'bilinear'.
+
+    Returns
+    -------
+    list of tuples
+        The rows, columns and weights of the pixels of each point.
+    array
+        Whether each point is on the data.
+
+    Raises
+    ------
+    ValueError
+        Method must be nearest or bilinear
+    """
+    if method not in ('nearest', 'bilinear'):
+        raise ValueError('Method must be nearest or bilinear')
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float),
+                               np.asarray(y, dtype=float))
+    resolution = meta['resolution']
+    # pixel coordinates of the points
+    col = (x - meta['xcoords'][0]) / resolution
+    row = (y - meta['ycoords'][0]) / resolution
+    inside = (col >= 0) & (col <= shape[1]) & (row >= 0) & (row <= shape[0])
+
+    if method == 'nearest':
+        rows = np.clip(np.floor(row).astype(np.int64), 0, shape[0] - 1)
+        cols = np.clip(np.floor(col).astype(np.int64), 0, shape[1] - 1)
+        return [(rows, cols, 1.)], inside
+
+    # distances to the centres of the pixels, clamped at the edges
+    row = np.clip(row - 0.5, 0, shape[0] - 1)
+    col = np.clip(col - 0.5, 0, shape[1] - 1)
+    rows = np.minimum(np.floor(row).astype(np.int64), max(shape[0] - 2, 0))
+    cols = np.minimum(np.floor(col).astype(np.int64), max(shape[1] - 2, 0))
+    weight_y, weight_x = row - rows, col - cols
+    next_row = np.minimum(rows + 1, shape[0] - 1)
+    next_col = np.minimum(cols + 1, shape[1] - 1)
+    return [(rows, cols, (1 - weight_y) * (1 - weight_x)),
+            (rows, next_col, (1 - weight_y) * weight_x),
+            (next_row, cols, weight_y * (1 - weight_x)),
+            (next_row, next_col, weight_y * weight_x)], inside
+
+
+def _interpolate(data, pixels, fill_value):
+    """ Get the values of data at points from their pixels and weights.
+
+    Parameters
+    ----------
+    data : array
+        The data.
+    pixels : tuple
+        The pixels and weights of each point, and whether each point is on
+        the data, as given by _sample_pixels.
+    fill_value : float
+        The value of the points off the data.
+
+    Returns
+    -------
+    array
+        The value at each point.
+    """
+    weights, inside = pixels
+    values = sum(weight * data[rows, cols] for rows, cols, weight in weights)
+    return np.where(inside, values, fill_value)
+
+
+def _mosaic_crop(meta_self, meta_another, resolution):
+    """ Get the largest non-empty area of the mosaic of two data.
+
+    Parameters
+    ----------
+    meta_self : dict
+        Meta-data of the first data.
+    meta_another : dict
+        Meta-data of the second data.
+    resolution : int
+        The resolution of the mosaic.
+
+    Returns
+    -------
+    tuple
+        Earth coordinate, xcoords.
+    tuple
+        Earth coordinate, ycoords.
+    """
+    # get the intersection coords
+    intersect_coords_x = (max(meta_self['xcoords'][0],
+                              meta_another['xcoords'][0]),
+                          min(meta_self['xcoords'][1],
+                              meta_another['xcoords'][1]))
+    intersect_coords_y = (max(meta_self['ycoords'][0],
+                              meta_another['ycoords'][0]),
+                          min(meta_self['ycoords'][1],
+                              meta_another['ycoords'][1]))
+    # earth distance from the mosaic bottom left to the origin(0,0)
+    offset = (min(meta_self['xcoords'][0], meta_another['xcoords'][0]),
+              min(meta_self['ycoords'][0], meta_another['ycoords'][0]))
+    added_ex = (offset[0],
+                max(meta_self['xcoords'][1], meta_another['xcoords'][1]))
+    added_ey = (offset[1],
+                max(meta_self['ycoords'][1], meta_another['ycoords'][1]))
+
+    data_ex_offset = (intersect_coords_x[0]-offset[0],
+                      intersect_coords_x[1]-offset[0])
+    data_ey_offset = (intersect_coords_y[0]-offset[1],
+                      intersect_coords_y[1]-offset[1])
+    added_ex_offset = (added_ex[0]-offset[0], added_ex[1]-offset[0])
+    added_ey_offset = (added_ey[0]-offset[1], added_ey[1]-offset[1])
+    self_ex_offset = (meta_self['xcoords'][0]-offset[0],
+                      meta_self['xcoords'][1]-offset[0])
+    self_ey_offset = (meta_self['ycoords'][0]-offset[1],
+                      meta_self['ycoords'][1]-offset[1])
+    another_ex_offset = (meta_another['xcoords'][0]-offset[0],
+                         meta_another['xcoords'][1]-offset[0])
+    another_ey_offset = (meta_another['ycoords'][0]-offset[1],
+                         meta_another['ycoords'][1]-offset[1])
+
+    # change earth coords to pixel coords
+    data_px, data_py = _earth_to_pixel_tuple(data_ex_offset,
+                                             data_ey_offset,
+                                             resolution)
+    added_px, added_py = _earth_to_pixel_tuple(added_ex_offset,
+                                               added_ey_offset,
+                                               resolution)
+    self_px, self_py = _earth_to_pixel_tuple(self_ex_offset,
+                                             self_ey_offset,
+                                             resolution)
+    another_px, another_py = _earth_to_pixel_tuple(another_ex_offset,
+                                                   another_ey_offset,
+                                                   resolution)
+
+    # 4 conditions. and shape=['pixel_xcoords', 'pixel_ycoords'] of
+    # each condition.
+    # shape_1 is: Intercept the overlap area horizontally in the mosaic
+    # added data
+    # shape_2 is: Intercept the overlap area vertically in the mosaic
+    # added data
+    # shape_3 is: The first data is the largest after up-sampling or
+    # down-sampling
+    # shape_4 is: The second data is the largest after up-sampling or
+    # down-sampling
+    shape_1 = [data_px, added_py]
+    shape_2 = [added_px, data_py]
+    shape_3 = [self_px, self_py]
+    shape_4 = [another_px, another_py]
+    # list of 4 condition coords
+    shape = [shape_1, shape_2, shape_3, shape_4]
+
+    # get the index of maximum area by multiplying the length and width
+    # of the data
+    index = np.argmax(np.array(
+        [(shape[i][0][1] - shape[i][0][0]) *
+         (shape[i][1][1] - shape[i][1][0])
+         for i in range(len(shape))]))
+
+    # get the coords of max area
+    max_coords_x = shape[index][0]
+    max_coords_y = shape[index][1]
+
+    # change the pixel coords to the earth coords
+    earth_xcoords, earth_ycoords = _pixel_to_earth_tuple(max_coords_x,
+                                                         max_coords_y,
+                                                         resolution)
+    return ((earth_xcoords[0] + offset[0], earth_xcoords[1] + offset[0]),
+            (earth_ycoords[0] + offset[1], earth_ycoords[1] + offset[1]))
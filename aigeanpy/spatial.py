@@ -0,0 +1,421 @@
+import heapq
+from math import floor
+from statistics import median
+
+
+class FootprintIndex:
+    """
+    FootprintIndex is a uniform grid over the earth coordinates of
+    footprints, such as the 'xcoords' and 'ycoords' of SatMaps. Each
+    footprint is stored in the grid cells it covers, so queries only test
+    the footprints sharing a cell with the query instead of all of them.
+
+    Footprints are (xcoords, ycoords) tuples and are referred to by the
+    order they were inserted in.
+
+    Attributes
+    ----------
+    cell_size : float
+        Width and height of the grid cells, in earth coordinates.
+    footprints : list of tuples
+        The footprints, as (xcoords, ycoords).
+
+    Methods
+    -------
+    from_metas(metas, cell_size=None)
+        Create a FootprintIndex over the footprints of meta-data.
+    insert(footprint)
+        Add a footprint to the index.
+    overlapping(xcoords, ycoords)
+        Find the footprints overlapping a box.
+    containing(x, y)
+        Find the footprints containing a point.
+    within(xcoords, ycoords)
+        Find the footprints inside a box.
+    covering(xcoords, ycoords)
+        Find the footprints covering a whole box.
+    overlap_graph()
+        Get the footprints overlapping each footprint.
+    components()
+        Group the footprints connected by overlaps.
+    mosaic_order()
+        Get the order in which the footprints are added to a mosaic.
+    """
+
+    def __init__(self, footprints=(), cell_size=None):
+        """ Initiate the FootprintIndex class.
+
+        Parameters
+        ----------
+        footprints : list of tuples, optional
+            The footprints, as (xcoords, ycoords), by default none.
+        cell_size : float, optional
+            Width and height of the grid cells, by default the median size
+            of the footprints, so each footprint covers a few cells.
+
+        Raises
+        ------
+        ValueError
+            Cell_size must larger than 0
+        """
+        footprints = list(footprints)
+        if cell_size is None and footprints:
+            cell_size = median(max(x[1] - x[0], y[1] - y[0])
+                               for x, y in footprints)
+        if cell_size is not None and cell_size <= 0:
+            raise ValueError('Cell_size must larger than 0')
+        self.cell_size = cell_size
+        self.footprints = []
+        self._cells = {}
+        for footprint in footprints:
+            self.insert(footprint)
+
+    def __len__(self):
+        return len(self.footprints)
+
+    @classmethod
+    def from_metas(cls, metas, cell_size=None):
+        """ Create a FootprintIndex over the footprints of meta-data.
+
+        Parameters
+        ----------
+        metas : list of dicts
+            Meta-data, as SatMap.meta or aigeanpy.satmap.read_meta give.
+        cell_size : float, optional
+            Width and height of the grid cells, by default the median size
+            of the footprints.
+
+        Returns
+        -------
+        FootprintIndex
+            A new FootprintIndex.
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.spatial import FootprintIndex
+        >>> files = ['aigean_lir_20230104_145310.asdf',
+        ...          'aigean_fan_20230104_150010.zip',
+        ...          'aigean_fan_20221208_170852.zip']
+        >>> index = FootprintIndex.from_metas(
+        ...     [get_satmap(filename).meta for filename in files])
+        >>> index.containing(500, 175), index.components()
+        ([0, 1], [[0, 1], [2]])
+        """
+        return cls([(meta['xcoords'], meta['ycoords']) for meta in metas],
+                   cell_size)
+
+    def insert(self, footprint):
+        """ Add a footprint to the index.
+
+        Parameters
+        ----------
+        footprint : tuple
+            The footprint, as (xcoords, ycoords).
+
+        Returns
+        -------
+        int
+            The number the footprint is referred to by.
+        """
+        xcoords, ycoords = footprint
+        if self.cell_size is None:
+            self.cell_size = max(xcoords[1] - xcoords[0],
+                                 ycoords[1] - ycoords[0], 1)
+        number = len(self.footprints)
+        self.footprints.append((tuple(xcoords), tuple(ycoords)))
+        for cell in self._cells_of(xcoords, ycoords):
+            self._cells.setdefault(cell, []).append(number)
+        return number
+
+    def _cells_of(self, xcoords, ycoords):
+        """ Get the grid cells a box covers, its edges included.
+
+        Returns
+        -------
+        list of tuples
+            The cells, as (column, row).
+        """
+        columns = range(floor(xcoords[0] / self.cell_size),
+                        floor(xcoords[1] / self.cell_size) + 1)
+        rows = range(floor(ycoords[0] / self.cell_size),
+                     floor(ycoords[1] / self.cell_size) + 1)
+        return [(column, row) for column in columns for row in rows]
+
+    def _candidates(self, xcoords, ycoords):
+        """ Get the footprints sharing a grid cell with a box.
+
+        Returns
+        -------
+        set of ints
+            The footprints.
+        """
+        if self.cell_size is None:
+            return set()
+        candidates = set()
+        for cell in self._cells_of(xcoords, ycoords):
+            candidates.update(self._cells.get(cell, ()))
+        return candidates
+
+    def overlapping(self, xcoords, ycoords):
+        """ Find the footprints overlapping a box.
+
+        Footprints only touching the box along an edge don't overlap it, as
+        in SatMap.mosaic.
+
+        Parameters
+        ----------
+        xcoords : tuple
+            Earth coordinates of the box along x.
+        ycoords : tuple
+            Earth coordinates of the box along y.
+
+        Returns
+        -------
+        list of ints
+            The footprints, in the order they were inserted.
+        """
+        box = (xcoords, ycoords)
+        return sorted(number for number in self._candidates(*box)
+                      if overlap(self.footprints[number], box))
+
+    def containing(self, x, y):
+        """ Find the footprints containing a point, their edges included.
+
+        Parameters
+        ----------
+        x : float
+            Earth coordinate of the point along x.
+        y : float
+            Earth coordinate of the point along y.
+
+        Returns
+        -------
+        list of ints
+            The footprints, in the order they were inserted.
+        """
+        point = ((x, x), (y, y))
+        return sorted(number for number in self._candidates(*point)
+                      if contains(self.footprints[number], point))
+
+    def within(self, xcoords, ycoords):
+        """ Find the footprints inside a box, touching its edges or not.
+
+        Parameters
+        ----------
+        xcoords : tuple
+            Earth coordinates of the box along x.
+        ycoords : tuple
+            Earth coordinates of the box along y.
+
+        Returns
+        -------
+        list of ints
+            The footprints, in the order they were inserted.
+        """
+        box = (xcoords, ycoords)
+        return sorted(number for number in self._candidates(*box)
+                      if contains(box, self.footprints[number]))
+
+    def covering(self, xcoords, ycoords):
+        """ Find the footprints covering a whole box.
+
+        Parameters
+        ----------
+        xcoords : tuple
+            Earth coordinates of the box along x.
+        ycoords : tuple
+            Earth coordinates of the box along y.
+
+        Returns
+        -------
+        list of ints
+            The footprints, in the order they were inserted.
+        """
+        box = (xcoords, ycoords)
+        return sorted(number for number in self._candidates(*box)
+                      if contains(self.footprints[number], box))
+
+    def overlap_graph(self):
+        """ Get the footprints overlapping each footprint.
+
+        Returns
+        -------
+        dict
+            The overlapping footprints of each footprint, in the order they
+            were inserted.
+        """
+        return {number: [other for other in self.overlapping(*footprint)
+                         if other != number]
+                for number, footprint in enumerate(self.footprints)}
+
+    def components(self):
+        """ Group the footprints connected by overlaps.
+
+        Returns
+        -------
+        list of lists of ints
+            The groups, each in the order the footprints were inserted,
+            ordered by their first footprint.
+        """
+        parents = list(range(len(self.footprints)))
+
+        def find(number):
+            # path halving keeps the trees flat
+            while parents[number] != number:
+                parents[number] = parents[parents[number]]
+                number = parents[number]
+            return number
+
+        for number, others in self.overlap_graph().items():
+            for other in others:
+                roots = sorted((find(number), find(other)))
+                parents[roots[1]] = roots[0]
+        groups = {}
+        for number in range(len(self.footprints)):
+            groups.setdefault(find(number), []).append(number)
+        return sorted(groups.values())
+
+    def mosaic_order(self):
+        """ Get the order in which the footprints are added to a mosaic.
+
+        The first footprint overlapping another one starts the mosaic with
+        the first of those, then the first remaining footprint overlapping
+        the bounding box of the mosaic is always added next.
+
+        Returns
+        -------
+        list of ints
+            The footprints, in the order they are added.
+
+        Raises
+        ------
+        ValueError
+            Two data must overlap
+        """
+        if len(self.footprints) == 1:
+            return [0]
+
+        # the first overlapping pair starts the mosaic
+        order = None
+        for number, footprint in enumerate(self.footprints):
+            others = [other for other in self.overlapping(*footprint)
+                      if other != number]
+            if others:
+                order = [number, others[0]]
+                break
+        if order is None:
+            raise ValueError('Two data must overlap')
+
+        # footprints overlapping the bounding box, first ones first
+        bbox = union(self.footprints[order[0]], self.footprints[order[1]])
+        added = set(order)
+        frontier = []
+        for number in self.overlapping(*bbox):
+            if number not in added:
+                heapq.heappush(frontier, number)
+                added.add(number)
+        while len(order) < len(self.footprints):
+            if not frontier:
+                raise ValueError('Two data must overlap')
+            number = heapq.heappop(frontier)
+            order.append(number)
+            new_bbox = union(bbox, self.footprints[number])
+            # only the part the bounding box grew by holds new footprints
+            for strip in _difference(new_bbox, bbox):
+                for other in self.overlapping(*strip):
+                    if other not in added:
+                        heapq.heappush(frontier, other)
+                        added.add(other)
+            bbox = new_bbox
+        return order
+
+
+def overlap(coords, other_coords):
+    """ Check whether two footprints overlap.
+
+    Parameters
+    ----------
+    coords : tuple
+        Earth coordinates of a footprint, as (xcoords, ycoords).
+    other_coords : tuple
+        Earth coordinates of another footprint, as (xcoords, ycoords).
+
+    Returns
+    -------
+    bool
+        Whether the footprints overlap.
+    """
+    (xcoords, ycoords), (other_xcoords, other_ycoords) = coords, other_coords
+    return (max(xcoords[0], other_xcoords[0]) <
+            min(xcoords[1], other_xcoords[1]) and
+            max(ycoords[0], other_ycoords[0]) <
+            min(ycoords[1], other_ycoords[1]))
+
+
+def contains(coords, other_coords):
+    """ Check whether a footprint contains another one.
+
+    Parameters
+    ----------
+    coords : tuple
+        Earth coordinates of a footprint, as (xcoords, ycoords).
+    other_coords : tuple
+        Earth coordinates of another footprint, as (xcoords, ycoords).
+
+    Returns
+    -------
+    bool
+        Whether the first footprint contains the second one.
+    """
+    (xcoords, ycoords), (other_xcoords, other_ycoords) = coords, other_coords
+    return (xcoords[0] <= other_xcoords[0] and
+            other_xcoords[1] <= xcoords[1] and
+            ycoords[0] <= other_ycoords[0] and
+            other_ycoords[1] <= ycoords[1])
+
+
+def union(coords, other_coords):
+    """ Get the bounding box of two footprints.
+
+    Parameters
+    ----------
+    coords : tuple
+        Earth coordinates of a footprint, as (xcoords, ycoords).
+    other_coords : tuple
+        Earth coordinates of another footprint, as (xcoords, ycoords).
+
+    Returns
+    -------
+    tuple
+        Earth coordinates of the bounding box, as (xcoords, ycoords).
+    """
+    (xcoords, ycoords), (other_xcoords, other_ycoords) = coords, other_coords
+    return ((min(xcoords[0], other_xcoords[0]),
+             max(xcoords[1], other_xcoords[1])),
+            (min(ycoords[0], other_ycoords[0]),
+             max(ycoords[1], other_ycoords[1])))
+
+
+def _difference(bbox, inner):
+    """ Split the part of a box outside an inner box into boxes.
+
+    Parameters
+    ----------
+    bbox : tuple
+        Earth coordinates of the box, as (xcoords, ycoords).
+    inner : tuple
+        Earth coordinates of the inner box, as (xcoords, ycoords), inside the
+        box.
+
+    Returns
+    -------
+    list of tuples
+        Up to 4 boxes, below, above, left and right of the inner box.
+    """
+    (x0, x1), (y0, y1) = bbox
+    (ix0, ix1), (iy0, iy1) = inner
+    boxes = [((x0, x1), (y0, iy0)), ((x0, x1), (iy1, y1)),
+             ((x0, ix0), (iy0, iy1)), ((ix1, x1), (iy0, iy1))]
+    return [box for box in boxes
+            if box[0][1] > box[0][0] and box[1][1] > box[1][0]]
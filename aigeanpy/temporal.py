@@ -0,0 +1,716 @@
+import warnings
+import numpy as np
+from aigeanpy.satmap import SatMap
+from aigeanpy.coords import _earth_to_pixel_tuple
+
+# Reductions over the time axis, skipping the pixels without data
+STATISTICS = {'mean': np.nanmean, 'median': np.nanmedian, 'min': np.nanmin,
+              'max': np.nanmax, 'std': np.nanstd, 'sum': np.nansum}
+
+# Number of values of the data filled with NaN at once by the statistics
+_BLOCK_SIZE = 2 ** 22
+
+
+class SatMapStack:
+    """
+    SatMapStack aligns SatMaps of the same resolution onto a common grid
+    once, as a (time, y, x) array ordered by observation date, so the
+    differences, rolling statistics and per-pixel reductions over time are
+    single NumPy calls instead of one SatMap operation per pair.
+
+    Pixels of the grid a SatMap doesn't cover have no data, and are marked
+    in the mask.
+
+    Attributes
+    ----------
+    meta : dict
+        Meta-data of the grid. The archive, instrument and observatory are
+        the ones of the first SatMap, the obs_date the latest one.
+    obs_dates : list of strs
+        Observation date of each time step.
+    data : array
+        The (time, y, x) data, 0 where there is no data.
+    mask : array
+        The (time, y, x) mask, True where there is no data.
+
+    Methods
+    -------
+    masked()
+        Get the data as a masked array.
+    satmap(index, fill_value=0.)
+        Get a time step as a SatMap.
+    diff(lag=1)
+        Get the differences between time steps.
+    rolling(window, statistic='mean')
+        Get a statistic over a moving window of time steps.
+    reduce(statistic='mean', fill_value=0.)
+        Get a statistic of each pixel over time.
+    """
+
+    def __init__(self, satmaps, xcoords=None, ycoords=None, extent='union',
+                 path=None):
+        """ Initiate the SatMapStack class, aligning the SatMaps.
+
+        Parameters
+        ----------
+        satmaps : list of SatMaps
+            The SatMaps, of the same resolution.
+        xcoords : tuple, optional
+            Earth coordinates of the grid along x, by default given by the
+            extent.
+        ycoords : tuple, optional
+            Earth coordinates of the grid along y, by default given by the
+            extent.
+        extent : str, optional
+            Whether the default grid is the 'union' or the 'intersection' of
+            the footprints, by default 'union'.
+        path : str or Path, optional
+            The path of a .npy file memory-mapping the data, by default the
+            data is held in memory. The mask is always held in memory.
+
+        Raises
+        ------
+        ValueError
+            At least one SatMap is needed
+        TypeError
+            Satmap must in SatMap type
+        ValueError
+            SatMaps must have the same resolution
+        ValueError
+            Extent must be union or intersection
+        ValueError
+            Two data must overlap
+        """
+        if len(satmaps) == 0:
+            raise ValueError('At least one SatMap is needed')
+        for satmap in satmaps:
+            if not isinstance(satmap, SatMap):
+                raise TypeError('Satmap must in SatMap type')
+        resolution = satmaps[0].meta['resolution']
+        if any(satmap.meta['resolution'] != resolution for satmap in satmaps):
+            raise ValueError('SatMaps must have the same resolution')
+        if extent not in ('union', 'intersection'):
+            raise ValueError('Extent must be union or intersection')
+
+        # the time axis is ordered by observation date
+        satmaps = sorted(satmaps, key=lambda satmap: satmap.meta['obs_date'])
+        metas = [satmap.meta for satmap in satmaps]
+        xcoords, ycoords = _extent(metas, extent, xcoords, ycoords)
+        if xcoords[1] <= xcoords[0] or ycoords[1] <= ycoords[0]:
+            raise ValueError('Two data must overlap')
+
+        self.meta = satmaps[0].meta.copy()
+        self.meta.update({'xcoords': tuple(xcoords),
+                          'ycoords': tuple(ycoords),
+                          'obs_date': metas[-1]['obs_date']})
+        self.obs_dates = [meta['obs_date'] for meta in metas]
+        self._type = type(satmaps[0])
+        shape = (len(satmaps),) + _grid_shape(self.meta)
+        if path is None:
+            self.data = np.zeros(shape)
+        else:
+            self.data = np.lib.format.open_memmap(path, mode='w+',
+                                                  dtype=np.float64,
+                                                  shape=shape)
+        self.mask = np.ones(shape, dtype=bool)
+
+        # each SatMap is copied once into its time step
+        for index, satmap in enumerate(satmaps):
+            window = _align(satmap, satmap.data, self.meta, shape[1:])
+            if window is None:
+                continue
+            rows, cols, data = window
+            self.data[index, rows, cols] = data
+            self.mask[index, rows, cols] = False
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    @property
+    def shape(self):
+        """ Shape of the (time, y, x) data.
+        """
+        return self.data.shape
+
+    def masked(self):
+        """ Get the data as a masked array.
+
+        Returns
+        -------
+        MaskedArray
+            The (time, y, x) data, sharing the data and the mask.
+        """
+        return np.ma.MaskedArray(self.data, self.mask, copy=False)
+
+    def satmap(self, index, fill_value=0.):
+        """ Get a time step as a SatMap.
+
+        Parameters
+        ----------
+        index : int
+            The time step.
+        fill_value : float, optional
+            The value of the pixels without data, by default 0.
+
+        Returns
+        -------
+        SatMap
+            A new SatMap covering the grid.
+        """
+        data = np.where(self.mask[index], fill_value, self.data[index])
+        return self._to_satmap(data, self.obs_dates[index])
+
+    def diff(self, lag=1):
+        """ Get the differences between time steps.
+
+        Parameters
+        ----------
+        lag : int, optional
+            The number of time steps between the data subtracted, by
+            default 1.
+
+        Returns
+        -------
+        MaskedArray
+            The (time - lag, y, x) differences of each time step with the
+            one lag steps before it, masked where either has no data.
+
+        Raises
+        ------
+        ValueError
+            Lag must be between 1 and the number of time steps
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.temporal import SatMapStack
+        >>> fand1 = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> fand2 = get_satmap('aigean_fan_20230112_074702.zip')
+        >>> stack = SatMapStack([fand2, fand1], extent='intersection')
+        >>> stack.shape, stack.obs_dates[0]
+        ((2, 10, 15), '2023-01-04 15:00:10')
+        >>> (stack.diff()[0] == (fand2 - fand1).data).all()
+        True
+        """
+        if not 0 < lag < len(self):
+            raise ValueError('Lag must be between 1 and the number of time '
+                             'steps')
+        return np.ma.MaskedArray(self.data[lag:] - self.data[:-lag],
+                                 self.mask[lag:] | self.mask[:-lag])
+
+    def rolling(self, window, statistic='mean'):
+        """ Get a statistic over a moving window of time steps.
+
+        Parameters
+        ----------
+        window : int
+            The number of time steps in the window.
+        statistic : str, optional
+            'mean', 'median', 'min', 'max', 'std' or 'sum', by default
+            'mean'.
+
+        Returns
+        -------
+        MaskedArray
+            The (time - window + 1, y, x) statistic of each window, over the
+            data in the window, masked where there is none.
+
+        Raises
+        ------
+        ValueError
+            Window must be between 1 and the number of time steps
+        """
+        if not 0 < window <= len(self):
+            raise ValueError('Window must be between 1 and the number of '
+                             'time steps')
+        return self._by_rows(lambda data: self._statistic(
+            np.lib.stride_tricks.sliding_window_view(data, window, axis=0),
+            statistic, axis=-1))
+
+    def reduce(self, statistic='mean', fill_value=0.):
+        """ Get a statistic of each pixel over time.
+
+        Parameters
+        ----------
+        statistic : str, optional
+            'mean', 'median', 'min', 'max', 'std' or 'sum', by default
+            'mean'.
+        fill_value : float, optional
+            The value of the pixels without any data, by default 0.
+
+        Returns
+        -------
+        SatMap
+            A new SatMap covering the grid, with the obs_date of the latest
+            time step.
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.temporal import SatMapStack
+        >>> fand1 = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> fand2 = get_satmap('aigean_fan_20230112_074702.zip')
+        >>> stack = SatMapStack([fand1, fand2])
+        >>> mean = stack.reduce('mean')
+        >>> mean.meta['xcoords'], mean.meta['obs_date']
+        ((450, 825), '2023-01-12 07:47:02')
+        >>> (mean.data[:, :30] == fand1.data[:, :30]).all()
+        True
+        """
+        result = self._by_rows(
+            lambda data: self._statistic(data, statistic, axis=0))
+        return self._to_satmap(result.filled(fill_value),
+                               self.meta['obs_date'])
+
+    def _by_rows(self, function):
+        """ Apply a function to blocks of rows of the data, NaN filled.
+
+        Only a block of the data, of about _BLOCK_SIZE values, is copied
+        with NaN where there is no data at once.
+
+        Parameters
+        ----------
+        function : callable
+            Function taking the (time, rows, x) block of NaN filled data and
+            returning a MaskedArray with the rows along the second to last
+            axis.
+
+        Returns
+        -------
+        MaskedArray
+            The results of the blocks joined along the rows.
+        """
+        rows = max(_BLOCK_SIZE // (self.shape[0] * self.shape[2]), 1)
+        results = []
+        for row in range(0, self.shape[1], rows):
+            block = (slice(None), slice(row, row + rows))
+            results.append(function(
+                np.where(self.mask[block], np.nan, self.data[block])))
+        return np.ma.MaskedArray(np.ma.concatenate(results, axis=-2))
+
+    @staticmethod
+    def _statistic(data, statistic, axis):
+        """ Reduce NaN filled data along an axis, skipping the NaNs.
+
+        Returns
+        -------
+        MaskedArray
+            The statistic, masked where every value was NaN.
+
+        Raises
+        ------
+        ValueError
+            Statistic must be one of mean, median, min, max, std or sum
+        """
+        if statistic not in STATISTICS:
+            raise ValueError('Statistic must be one of mean, median, min, '
+                             'max, std or sum')
+        empty = np.isnan(data).all(axis=axis)
+        # reductions of pixels without any data warn, they are masked
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            result = STATISTICS[statistic](data, axis=axis)
+        return np.ma.MaskedArray(result, empty)
+
+    def _to_satmap(self, data, obs_date):
+        """ Wrap data covering the grid into a SatMap.
+        """
+        meta = self.meta.copy()
+        meta['obs_date'] = obs_date
+        satmap = self._type(meta, data)
+        satmap.extra = True
+        return satmap
+
+
+class TemporalStats:
+    """
+    TemporalStats accumulates the per-pixel count, mean, variance, minimum
+    and maximum of SatMaps consumed one at a time onto a fixed grid, with
+    Welford's algorithm, so the statistics of many observations are found
+    holding only the grid and one SatMap in memory.
+
+    Accumulators filled separately, e.g. by worker processes, are combined
+    with merge.
+
+    Attributes
+    ----------
+    meta : dict
+        Meta-data of the grid. The archive, instrument and observatory are
+        the ones of the first SatMap consumed, the obs_date the latest one.
+    count : array
+        Number of SatMaps covering each pixel.
+    mean : array
+        Running mean of each pixel.
+    m2 : array
+        Running sum of the squared differences to the mean of each pixel.
+    min : array
+        Minimum of each pixel, inf where there is no data.
+    max : array
+        Maximum of each pixel, -inf where there is no data.
+
+    Methods
+    -------
+    for_metas(metas, resolution=None)
+        Create a TemporalStats covering the footprints of meta-data.
+    update(satmap, method='auto')
+        Add a SatMap to the statistics.
+    consume(satmaps, method='auto')
+        Add every SatMap of an iterable to the statistics.
+    merge(other)
+        Add the statistics of another TemporalStats on the same grid.
+    variance(ddof=0)
+        Get the variance of each pixel.
+    result(statistic='mean', fill_value=0., ddof=0)
+        Get a statistic as a SatMap.
+    """
+
+    def __init__(self, xcoords, ycoords, resolution):
+        """ Initiate the TemporalStats class with an empty grid.
+
+        Parameters
+        ----------
+        xcoords : tuple
+            Earth coordinates of the grid along x.
+        ycoords : tuple
+            Earth coordinates of the grid along y.
+        resolution : int
+            The resolution of the grid.
+
+        Raises
+        ------
+        TypeError
+            Resolution must be int type
+        ValueError
+            Resolution must larger than 0
+        """
+        if not isinstance(resolution, (int, np.integer)):
+            raise TypeError('Resolution must be int type')
+        if resolution <= 0:
+            raise ValueError('Resolution must larger than 0')
+
+        self.meta = {'archive': '', 'instrument': '', 'observatory': '',
+                     'resolution': int(resolution),
+                     'xcoords': tuple(xcoords), 'ycoords': tuple(ycoords),
+                     'obs_date': ''}
+        shape = _grid_shape(self.meta)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.min = np.full(shape, np.inf)
+        self.max = np.full(shape, -np.inf)
+        self._type = None
+
+    @property
+    def satmap_type(self):
+        """ Type of the first SatMap consumed, None before any.
+        """
+        return self._type
+
+    @classmethod
+    def for_metas(cls, metas, resolution=None):
+        """ Create a TemporalStats covering the footprints of meta-data.
+
+        The meta-data is cheap to read first, e.g. with
+        aigeanpy.satmap.read_metas, so the SatMaps themselves can be streamed
+        afterwards.
+
+        Parameters
+        ----------
+        metas : list of dicts
+            Meta-data, as SatMap.meta or aigeanpy.satmap.read_meta give.
+        resolution : int, optional
+            The resolution of the grid, by default the smallest resolution
+            of the meta-data.
+
+        Returns
+        -------
+        TemporalStats
+            A new TemporalStats.
+
+        Raises
+        ------
+        ValueError
+            At least one SatMap is needed
+        """
+        metas = list(metas)
+        if len(metas) == 0:
+            raise ValueError('At least one SatMap is needed')
+        if resolution is None:
+            resolution = min(meta['resolution'] for meta in metas)
+        xcoords = (min(meta['xcoords'][0] for meta in metas),
+                   max(meta['xcoords'][1] for meta in metas))
+        ycoords = (min(meta['ycoords'][0] for meta in metas),
+                   max(meta['ycoords'][1] for meta in metas))
+        return cls(xcoords, ycoords, resolution)
+
+    def update(self, satmap, method='auto'):
+        """ Add a SatMap to the statistics.
+
+        The SatMap is resampled to the resolution of the grid, and only the
+        part of it on the grid is added.
+
+        Parameters
+        ----------
+        satmap : SatMap
+            The SatMap.
+        method : str, optional
+            The resampling method, by default 'auto'. See
+            aigeanpy.resample.resample.
+
+        Raises
+        ------
+        TypeError
+            Satmap must in SatMap type
+        """
+        if not isinstance(satmap, SatMap):
+            raise TypeError('Satmap must in SatMap type')
+        resolution = self.meta['resolution']
+        if satmap.meta['resolution'] == resolution:
+            data = satmap.data
+        else:
+            data = satmap.resampled(resolution, method)
+        self._update_meta(satmap.meta, type(satmap))
+
+        window = _align(satmap, data, self.meta, self.count.shape)
+        if window is None:
+            return
+        rows, cols, data = window
+        count = self.count[rows, cols]
+        mean = self.mean[rows, cols]
+        count += 1
+        # Welford's update, in place on views of the grid
+        delta = data - mean
+        mean += delta / count
+        self.m2[rows, cols] += delta * (data - mean)
+        np.minimum(self.min[rows, cols], data, out=self.min[rows, cols])
+        np.maximum(self.max[rows, cols], data, out=self.max[rows, cols])
+
+    def consume(self, satmaps, method='auto'):
+        """ Add every SatMap of an iterable to the statistics.
+
+        Parameters
+        ----------
+        satmaps : iterable of SatMaps
+            The SatMaps, e.g. a generator loading them one at a time.
+        method : str, optional
+            The resampling method, by default 'auto'.
+
+        Returns
+        -------
+        TemporalStats
+            The TemporalStats itself.
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap, read_meta
+        >>> from aigeanpy.temporal import TemporalStats
+        >>> files = ['aigean_fan_20230104_150010.zip',
+        ...          'aigean_fan_20230112_074702.zip']
+        >>> stats = TemporalStats.for_metas(read_meta(f) for f in files)
+        >>> _ = stats.consume(get_satmap(f) for f in files)
+        >>> stats.count.max(), stats.result('count').meta['xcoords']
+        (2, (450, 825))
+        """
+        for satmap in satmaps:
+            self.update(satmap, method)
+        return self
+
+    def merge(self, other):
+        """ Add the statistics of another TemporalStats on the same grid.
+
+        Parameters
+        ----------
+        other : TemporalStats
+            The other TemporalStats, left unchanged.
+
+        Returns
+        -------
+        TemporalStats
+            The TemporalStats itself.
+
+        Raises
+        ------
+        TypeError
+            Other must in TemporalStats type
+        ValueError
+            TemporalStats must have the same grid
+        """
+        if not isinstance(other, TemporalStats):
+            raise TypeError('Other must in TemporalStats type')
+        for key in ('resolution', 'xcoords', 'ycoords'):
+            if self.meta[key] != other.meta[key]:
+                raise ValueError('TemporalStats must have the same grid')
+        if other.satmap_type is not None:
+            self._update_meta(other.meta, other.satmap_type)
+
+        # pairwise update of Chan et al.
+        count = self.count + other.count
+        covered = count > 0
+        delta = other.mean - self.mean
+        weight = np.divide(other.count, count, out=np.zeros(count.shape),
+                           where=covered)
+        self.mean += delta * weight
+        self.m2 += other.m2 + delta ** 2 * self.count * weight
+        self.count = count
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        return self
+
+    def variance(self, ddof=0):
+        """ Get the variance of each pixel.
+
+        Parameters
+        ----------
+        ddof : int, optional
+            Delta degrees of freedom, by default 0, as np.var.
+
+        Returns
+        -------
+        MaskedArray
+            The variance, masked where there are no more than ddof data.
+        """
+        valid = self.count > ddof
+        variance = np.divide(self.m2, self.count - ddof,
+                             out=np.zeros(self.m2.shape), where=valid)
+        return np.ma.MaskedArray(variance, ~valid)
+
+    def result(self, statistic='mean', fill_value=0., ddof=0):
+        """ Get a statistic as a SatMap.
+
+        Parameters
+        ----------
+        statistic : str, optional
+            'mean', 'variance', 'std', 'min', 'max' or 'count', by default
+            'mean'.
+        fill_value : float, optional
+            The value of the pixels without data, by default 0.
+        ddof : int, optional
+            Delta degrees of freedom of the variance and std, by default 0.
+
+        Returns
+        -------
+        SatMap
+            A new SatMap of the type of the first SatMap consumed, covering
+            the grid.
+
+        Raises
+        ------
+        ValueError
+            At least one SatMap is needed
+        ValueError
+            Statistic must be one of mean, variance, std, min, max or count
+        """
+        if self._type is None:
+            raise ValueError('At least one SatMap is needed')
+        empty = self.count == 0
+        if statistic == 'count':
+            data = self.count.astype(np.float64)
+        elif statistic in ('mean', 'min', 'max'):
+            data = np.where(empty, fill_value, getattr(self, statistic))
+        elif statistic in ('variance', 'std'):
+            variance = self.variance(ddof)
+            if statistic == 'std':
+                variance = np.ma.sqrt(variance)
+            data = variance.filled(fill_value)
+        else:
+            raise ValueError('Statistic must be one of mean, variance, std, '
+                             'min, max or count')
+        satmap = self._type(self.meta.copy(), data)
+        satmap.extra = True
+        return satmap
+
+    def _update_meta(self, meta, satmap_type):
+        """ Take the names of the first SatMap and the latest obs_date.
+        """
+        if self._type is None:
+            self._type = satmap_type
+            for key in ('archive', 'instrument', 'observatory'):
+                self.meta[key] = meta[key]
+        if meta['obs_date'] > self.meta['obs_date']:
+            self.meta['obs_date'] = meta['obs_date']
+
+
+def _extent(metas, extent, xcoords=None, ycoords=None):
+    """ Get the union or the intersection of footprints.
+
+    Parameters
+    ----------
+    metas : list of dicts
+        Meta-data of the footprints.
+    extent : str
+        'union' or 'intersection'.
+    xcoords : tuple, optional
+        Earth coordinates along x replacing the extent, by default None.
+    ycoords : tuple, optional
+        Earth coordinates along y replacing the extent, by default None.
+
+    Returns
+    -------
+    tuple
+        Earth coordinates of the extent along x.
+    tuple
+        Earth coordinates of the extent along y.
+    """
+    first, last = (min, max) if extent == 'union' else (max, min)
+    if xcoords is None:
+        xcoords = (first(meta['xcoords'][0] for meta in metas),
+                   last(meta['xcoords'][1] for meta in metas))
+    if ycoords is None:
+        ycoords = (first(meta['ycoords'][0] for meta in metas),
+                   last(meta['ycoords'][1] for meta in metas))
+    return xcoords, ycoords
+
+
+def _grid_shape(meta):
+    """ Get the shape of the data covering a grid.
+
+    Parameters
+    ----------
+    meta : dict
+        Meta-data of the grid.
+
+    Returns
+    -------
+    tuple
+        Number of rows and columns.
+    """
+    data_px, data_py = _earth_to_pixel_tuple(
+        (0, meta['xcoords'][1] - meta['xcoords'][0]),
+        (0, meta['ycoords'][1] - meta['ycoords'][0]), meta['resolution'])
+    return data_py[1] - data_py[0], data_px[1] - data_px[0]
+
+
+def _align(satmap, data, meta, shape):
+    """ Get the part of the data of a SatMap on a grid.
+
+    Parameters
+    ----------
+    satmap : SatMap
+        The SatMap.
+    data : array
+        The data of the SatMap, at the resolution of the grid.
+    meta : dict
+        Meta-data of the grid.
+    shape : tuple
+        Shape of the data covering the grid.
+
+    Returns
+    -------
+    tuple or None
+        The rows and the columns of the grid, as slices, and the data on
+        them. None if the SatMap is off the grid.
+    """
+    # pixels of the data on the grid
+    offset = (meta['xcoords'][0], meta['ycoords'][0])
+    satmap_px, satmap_py = _earth_to_pixel_tuple(
+        (satmap.meta['xcoords'][0] - offset[0],
+         satmap.meta['xcoords'][1] - offset[0]),
+        (satmap.meta['ycoords'][0] - offset[1],
+         satmap.meta['ycoords'][1] - offset[1]), meta['resolution'])
+    rows = (max(satmap_py[0], 0), min(satmap_py[1], shape[0]))
+    cols = (max(satmap_px[0], 0), min(satmap_px[1], shape[1]))
+    if rows[0] >= rows[1] or cols[0] >= cols[1]:
+        return None
+    return (slice(*rows), slice(*cols),
+            data[rows[0] - satmap_py[0]:rows[1] - satmap_py[0],
+                 cols[0] - satmap_px[0]:cols[1] - satmap_px[0]])
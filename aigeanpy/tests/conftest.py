@@ -0,0 +1,51 @@
+# Disabling missing-module-docstring
+# pylint: disable = C0114
+import numpy as np
+import pytest
+from aigeanpy.satmap import SatMap
+
+
+def _satmap(data, xcoords=None, ycoords=None,
+            obs_date='2023-01-04 15:00:10', resolution=10):
+    """ Create a Fand SatMap without a file.
+
+    Parameters
+    ----------
+    data : array or float
+        The data, or the value filling the footprint.
+    xcoords : tuple, optional
+        Earth coordinates along x, by default from 0 to the width of the
+        data.
+    ycoords : tuple, optional
+        Earth coordinates along y, by default from 0 to the height of the
+        data.
+    obs_date : str, optional
+        The observation date, by default '2023-01-04 15:00:10'.
+    resolution : int, optional
+        The resolution, by default 10.
+
+    Returns
+    -------
+    SatMap
+        The SatMap.
+    """
+    if np.ndim(data) == 0:
+        shape = ((ycoords[1] - ycoords[0]) // resolution,
+                 (xcoords[1] - xcoords[0]) // resolution)
+        data = np.full(shape, data)
+    data = np.asarray(data, dtype=float)
+    if xcoords is None:
+        xcoords = (0, data.shape[1] * resolution)
+    if ycoords is None:
+        ycoords = (0, data.shape[0] * resolution)
+    meta = {'archive': 'ISA', 'instrument': 'Fand', 'observatory': 'Aigean',
+            'resolution': resolution, 'xcoords': xcoords, 'ycoords': ycoords,
+            'obs_date': obs_date}
+    return SatMap(meta, data)
+
+
+@pytest.fixture(name='make_satmap')
+def fixture_make_satmap():
+    """ Get the factory of SatMaps created without a file.
+    """
+    return _satmap
@@ -0,0 +1,109 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from aigeanpy.cache import SatMapCache, satmap_cache
+from aigeanpy.satmap import get_satmap
+from aigeanpy.fileindex import find_file
+
+
+@pytest.fixture(name='enabled_cache')
+def fixture_enabled_cache():
+    satmap_cache.enable()
+    satmap_cache.clear()
+    yield satmap_cache
+    satmap_cache.disable()
+
+
+def test_cache_evicts_least_recently_used_entries_by_bytes():
+    cache = SatMapCache(max_bytes=2 * 80)
+    for name in ['a', 'b']:
+        cache.put((name, 0, 0), {'name': name}, np.zeros(10))
+    cache.get(('a', 0, 0))
+    cache.put(('c', 0, 0), {'name': 'c'}, np.zeros(10))
+    assert cache.get(('b', 0, 0)) is None
+    assert cache.get(('a', 0, 0))[0] == {'name': 'a'}
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'entries': 2,
+                             'nbytes': 160, 'max_bytes': 160}
+
+
+def test_cache_does_not_store_data_larger_than_budget():
+    cache = SatMapCache(max_bytes=8)
+    data = np.zeros(10)
+    cache.put(('a', 0, 0), {}, data)
+    assert len(cache) == 0 and cache.nbytes == 0
+    # data which isn't cached can still be changed in place
+    assert data.flags.writeable
+
+
+def test_cache_replaces_entries_of_a_changed_file():
+    cache = SatMapCache()
+    cache.put(('a', 0, 0), {}, np.zeros(10))
+    cache.put(('a', 1, 0), {}, np.zeros(10))
+    assert len(cache) == 1 and cache.nbytes == 80
+
+
+def test_cache_can_be_shared_by_threads():
+    cache = SatMapCache(max_bytes=5 * 80)
+
+    def use(number):
+        key = (str(number % 7), number % 3, 0)
+        if cache.get(key) is None:
+            cache.put(key, {}, np.zeros(10))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(use, range(2000)))
+    # one entry per path, and the size of the entries is counted once
+    assert len(cache) <= 5
+    assert cache.nbytes == 80 * len(cache)
+    assert cache.hits + cache.misses == 2000
+
+
+def test_cache_raise_errors_with_invalid_budget():
+    with pytest.raises(TypeError):
+        SatMapCache(max_bytes=1.5)
+    with pytest.raises(ValueError):
+        SatMapCache(max_bytes=-1)
+
+
+def test_get_satmap_does_not_cache_by_default():
+    assert not satmap_cache.enabled
+    fand = get_satmap('aigean_fan_20230104_150010.zip')
+    fand.data[0, 0] = 0
+    assert satmap_cache.stats()['entries'] == 0
+
+
+def test_get_satmap_reuses_cached_data(enabled_cache):
+    filename = 'aigean_fan_20230104_150010.zip'
+    fand1 = get_satmap(filename)
+    fand2 = get_satmap(filename)
+    assert enabled_cache.hits == 1 and enabled_cache.misses == 1
+    assert fand2.data is fand1.data
+    assert not fand2.data.flags.writeable
+    assert fand2.detach().data.flags.writeable
+    # the meta-data of each SatMap can be changed independently
+    fand1.meta['obs_date'] = '2023-01-05 15:00:10'
+    assert fand2.meta['obs_date'] == '2023-01-04 15:00:10'
+
+
+def test_get_satmap_decodes_again_when_file_changes(tmp_path,
+                                                    enabled_cache):
+    file_path = tmp_path/'aigean_fan_20230104_150010.zip'
+    shutil.copy(find_file('aigean_fan_20230104_150010.zip'), file_path)
+    fand1 = get_satmap(file_path.name, root=tmp_path)
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    fand2 = get_satmap(file_path.name, root=tmp_path)
+    assert enabled_cache.misses == 2
+    assert fand2.data is not fand1.data
+
+
+def test_get_satmap_without_cache(enabled_cache):
+    get_satmap('aigean_fan_20230104_150010.zip', use_cache=False)
+    enabled_cache.disable()
+    get_satmap('aigean_fan_20230104_150010.zip')
+    assert enabled_cache.stats()['entries'] == 0
+    assert enabled_cache.misses == 0
@@ -0,0 +1,96 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import os
+import shutil
+import sys
+import pytest
+from aigeanpy import command
+from aigeanpy.catalog import Catalog
+from aigeanpy.satmap import get_satmaps, read_meta
+from aigeanpy.fileindex import find_file
+
+FILES = ['aigean_fan_20230104_150010.zip', 'aigean_fan_20230112_074702.zip',
+         'aigean_lir_20230104_145310.asdf', 'aigean_man_20221205_194510.hdf5']
+
+
+@pytest.fixture(name='root')
+def fixture_root(tmp_path):
+    (tmp_path/'sub').mkdir()
+    for filename in FILES:
+        target = tmp_path/('sub' if 'man' in filename else '')/filename
+        shutil.copy(find_file(filename), target)
+    (tmp_path/'notes.txt').write_text('not a data file')
+    return tmp_path
+
+
+def test_update_is_incremental(root):
+    with Catalog(root) as catalog:
+        assert catalog.update() == {'added': 4, 'updated': 0, 'removed': 0,
+                                    'unchanged': 0, 'failed': 0}
+        assert catalog.update()['unchanged'] == 4
+        # a changed file is read again, a removed one is dropped
+        file_path = root/FILES[0]
+        stat = file_path.stat()
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        (root/FILES[1]).unlink()
+        (root/'aigean_fan_20221208_170852.zip').write_bytes(b'corrupted')
+        assert catalog.update() == {'added': 1, 'updated': 1, 'removed': 1,
+                                    'unchanged': 2, 'failed': 1}
+        assert len(catalog) == 3
+        assert list(catalog.failed()) == ['aigean_fan_20221208_170852.zip']
+        # files which failed aren't read again until they change
+        assert catalog.update()['unchanged'] == 4
+    # the catalog is saved in the search root
+    with Catalog(root) as catalog:
+        assert len(catalog) == 3
+
+
+def test_get_meta_equals_read_meta(root):
+    with Catalog(root) as catalog:
+        catalog.update(workers=2)
+        for filename in FILES[:3] + ['sub/' + FILES[3]]:
+            assert catalog.get_meta(filename) == read_meta(filename, root)
+        assert catalog.get_meta('foo.zip') is None
+
+
+@pytest.mark.parametrize('conditions, expected', [
+    ({}, ['sub/' + FILES[3], FILES[2], FILES[0], FILES[1]]),
+    ({'xcoords': (675, 700)}, [FILES[2], FILES[1]]),
+    # touching edges don't overlap
+    ({'xcoords': (0, 100), 'ycoords': (0, 300)}, []),
+    ({'ycoords': (300, 350)}, ['sub/' + FILES[3]]),
+    ({'start': '2023-01-04', 'stop': '2023-01-04'}, [FILES[2], FILES[0]]),
+    ({'start': '2023-01-04 14:55:00'}, [FILES[0], FILES[1]]),
+    ({'stop': '2023-01-04 15:00:00'}, ['sub/' + FILES[3], FILES[2]]),
+    ({'instrument': 'fand', 'resolution': 5}, [FILES[0], FILES[1]]),
+    ({'instrument': 'Manannan', 'resolution': 5}, []),
+])
+def test_query(root, conditions, expected):
+    with Catalog(root) as catalog:
+        catalog.update()
+        assert catalog.query(**conditions) == expected
+
+
+def test_query_results_load(root):
+    with Catalog(root) as catalog:
+        catalog.update()
+        paths = catalog.query(instrument='Fand')
+        satmaps, errors = get_satmaps(paths, root=catalog.root)
+    assert not errors
+    assert [satmap.meta['obs_date'][:10] for satmap in satmaps] == \
+        ['2023-01-04', '2023-01-12']
+
+
+def test_catalog_command(root, capsys, monkeypatch):
+    monkeypatch.setattr(command, 'CWD', root)
+    monkeypatch.setattr(sys, 'argv', ['aigean_catalog', '-i', 'lir',
+                                      '-x', '650', '700'])
+    command.catalog()
+    assert capsys.readouterr().out == f'{FILES[2]}\n'
+    monkeypatch.setattr(sys, 'argv', ['aigean_catalog', '--root', 'sub',
+                                      '--no-update'])
+    command.catalog()
+    assert capsys.readouterr().out == ''
+    monkeypatch.setattr(sys, 'argv', ['aigean_catalog', '--root', 'sub'])
+    command.catalog()
+    assert capsys.readouterr().out == f'sub/{FILES[3]}\n'
@@ -0,0 +1,83 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import numpy as np
+import pytest
+from aigeanpy.temporal import SatMapStack
+from aigeanpy.change import changes, detect_changes, stack_changes
+
+# Earth coordinates of the SatMaps of the tests
+FOOTPRINT = ((100, 180), (0, 60))
+
+
+@pytest.fixture(name='days')
+def fixture_days(make_satmap):
+    base = np.zeros((6, 8))
+    second = base.copy()
+    # a 2x3 block and two diagonal pixels
+    second[1:3, 2:5] = 10
+    second[4, 0] = -20
+    second[5, 1] = -5
+    third = second.copy()
+    third[5, 7] = 30
+    return [make_satmap(third, *FOOTPRINT, '2023-01-03 10:00:00'),
+            make_satmap(base, *FOOTPRINT, '2023-01-01 10:00:00'),
+            make_satmap(second, *FOOTPRINT, '2023-01-02 10:00:00')]
+
+
+def test_changes_summarise_regions(days):
+    regions = changes(days[1], days[2], threshold=1)
+    assert regions == [
+        {'before': '2023-01-01 10:00:00', 'after': '2023-01-02 10:00:00',
+         'xcoords': (120, 150), 'ycoords': (10, 30), 'pixels': 6,
+         'mean_change': 10., 'max_change': 10.},
+        {'before': '2023-01-01 10:00:00', 'after': '2023-01-02 10:00:00',
+         'xcoords': (100, 120), 'ycoords': (40, 60), 'pixels': 2,
+         'mean_change': -12.5, 'max_change': -20.}]
+    assert len(changes(days[1], days[2], threshold=1, connectivity=1)) == 3
+    assert len(changes(days[1], days[2], threshold=1, min_pixels=3)) == 1
+    assert len(changes(days[1], days[2], threshold=10)) == 1
+
+
+def test_changes_use_the_overlap(make_satmap):
+    before = make_satmap(0, *FOOTPRINT, '2023-01-01 10:00:00')
+    after = make_satmap(5, (150, 230), (20, 80), '2023-01-02 10:00:00')
+    regions = changes(before, after, threshold=1)
+    assert [(region['xcoords'], region['ycoords'], region['pixels'])
+            for region in regions] == [((150, 180), (20, 60), 12)]
+    with pytest.raises(ValueError):
+        changes(before, make_satmap(0, *FOOTPRINT, '2023-01-01 12:00:00'), 1)
+
+
+@pytest.mark.parametrize('workers, processes', [(1, False), (2, False),
+                                                (2, True)])
+def test_detect_changes_compares_consecutive_days(days, make_satmap, workers,
+                                                  processes):
+    # each observation is compared with the next one of another day
+    # overlapping it
+    satmaps = days + [make_satmap(1, *FOOTPRINT, '2023-01-02 12:00:00'),
+                      make_satmap(1, (500, 580), (0, 60),
+                                  '2023-01-04 10:00:00')]
+    regions = detect_changes(satmaps, threshold=1, workers=workers,
+                             processes=processes)
+    assert [(region['before'][:10], region['after'][:10], region['pixels'])
+            for region in regions] == [
+        ('2023-01-01', '2023-01-02', 6), ('2023-01-01', '2023-01-02', 2),
+        ('2023-01-02', '2023-01-03', 1), ('2023-01-02', '2023-01-03', 6),
+        ('2023-01-02', '2023-01-03', 2), ('2023-01-02', '2023-01-03', 1)]
+
+
+def test_stack_changes_equal_pairwise_changes(days):
+    stack = SatMapStack(days)
+    assert stack_changes(stack, threshold=1) == \
+        changes(days[1], days[2], 1) + changes(days[2], days[0], 1)
+    assert stack_changes(stack, threshold=1, lag=2) == \
+        changes(days[1], days[0], 1)
+
+
+def test_detect_changes_raise_errors(days):
+    with pytest.raises(TypeError):
+        detect_changes(days, 1, workers=1.5)
+    with pytest.raises(ValueError):
+        detect_changes(days, 1, workers=0)
+    with pytest.raises(TypeError):
+        detect_changes(days + [np.zeros((6, 8))], 1)
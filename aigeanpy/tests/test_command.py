@@ -6,7 +6,7 @@ import os
 import subprocess  # pylint: disable = W0611
 from subprocess import check_output, STDOUT, CalledProcessError
 import sys
-from pytest import mark
+from pytest import mark, raises
 import yaml
 import numpy as np
 from aigeanpy.satmap import get_satmap
@@ -64,10 +64,10 @@ def test_get_latest_obs(test_name):
 
 
 # ~~~ AIGEAN_METADATA TESTS ~~~
-# Mocking aigeanpy.satmap.get_satmap function which requires to open files.
-# Returns 'SatMap' object with only-defined meta member variable.
+# Mocking aigeanpy.satmap.read_meta function which requires to open files.
+# Returns the metadata dict of the file.
 # With Aigean observations from the 05/Dec/2022 to the 20/Dec/2022
-def get_satmap_mock(filename):
+def read_meta_mock(filename):
     with open(TEST_DIR/'extra_aigean_files/metadata_sample.json', 'r',
               encoding="utf-8") as json_metadata:
         dict_metadata = json.load(json_metadata)
@@ -84,16 +84,12 @@ def get_satmap_mock(filename):
         elif f'{key}' == 'ycoords':
             meta['ycoords'] = tuple(meta['ycoords'])
 
-    # Defining mock class
-    class MockClass:  # pylint: disable = C0115, R0903
-        def __init__(self, meta):
-            self.meta = meta
-
-    return MockClass(meta)
+    return meta
 
 
+@mark.parametrize('workers', [1, 3])
 @mark.parametrize('test_name', fixtures['output_info'])
-def test_output_info(capsys, test_name):
+def test_output_info(capsys, test_name, workers):
     properties = list(test_name.values())[0]
     files = properties['parameters']
     expected_output = properties['expected_value']
@@ -103,7 +99,7 @@ def test_output_info(capsys, test_name):
     expected_print = capsys.readouterr().out
 
     # Asserting print-out message when calling output_info is as expected
-    output_info(files, get_satmap_mock, TEST_DIR)
+    output_info(files, read_meta_mock, TEST_DIR, workers)
     assert capsys.readouterr().out == expected_print
 
 
@@ -149,3 +145,12 @@ def test_unordered_mosaic():
     expected_array = np.load(TEST_DIR/'extra_aigean_files/'
                              'mosaic_data_sample.npy')
     np.testing.assert_almost_equal(mosaic.data, expected_array)
+
+
+def test_unordered_mosaic_exits_when_satmaps_cannot_be_combined(capsys):
+    fan_map_1 = get_satmap('aigean_fan_20230104_150010.zip')
+    lir_map = get_satmap('aigean_lir_20221205_191610.asdf')
+    with raises(SystemExit):
+        unordered_mosaic([fan_map_1, lir_map])
+    assert capsys.readouterr().err.endswith(
+        "ValueError: 2 data must in the same day\n")
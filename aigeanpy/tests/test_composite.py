@@ -0,0 +1,86 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import numpy as np
+import pytest
+from aigeanpy.satmap import get_satmap, mosaic_many
+from aigeanpy.composite import Compositor, composite
+
+FAND_1 = 'aigean_fan_20230104_150010.zip'
+FAND_2 = 'aigean_fan_20230112_074702.zip'
+
+
+@pytest.fixture(name='fands')
+def fixture_fands():
+    return get_satmap(FAND_1), get_satmap(FAND_2)
+
+
+def test_last_equals_mosaic_many():
+    lir = get_satmap('aigean_lir_20221205_191610.asdf')
+    man = get_satmap('aigean_man_20221205_194510.hdf5')
+    expected = mosaic_many([lir, man])
+    actual = composite([lir, man])
+    assert type(actual) is type(expected)
+    assert actual.meta == expected.meta
+    np.testing.assert_almost_equal(actual.data, expected.data)
+
+
+def test_blend_modes_in_the_overlap(fands):
+    fand1, fand2 = fands
+    # the overlap is the last 15 columns of fand1, the first 15 of fand2
+    overlap1, overlap2 = fand1.data[:, 30:], fand2.data[:, :15]
+    expected = {'last': overlap1,
+                'mean': (overlap1 + overlap2) / 2,
+                'max': np.maximum(overlap1, overlap2),
+                'latest': overlap2}
+    for mode, overlap in expected.items():
+        actual = composite([fand2, fand1], mode=mode)
+        np.testing.assert_almost_equal(actual.data[:, 30:45], overlap)
+        np.testing.assert_array_equal(actual.data[:, :30], fand1.data[:, :30])
+        np.testing.assert_array_equal(actual.data[:, 45:], fand2.data[:, 15:])
+
+
+def test_empty_pixels_are_filled(fands):
+    compositor = Compositor((400, 700), (100, 200), 5, mode='max')
+    compositor.add(fands[0])
+    actual = compositor.finalize(fill_value=np.nan)
+    assert np.isnan(actual.data[:10]).all()
+    assert np.isnan(actual.data[:, :10]).all()
+    np.testing.assert_array_equal(actual.data[10:, 10:55], fands[0].data)
+    assert (compositor.count == ~np.isnan(actual.data)).all()
+
+
+def test_add_resamples_and_clips_to_the_canvas(fands):
+    compositor = Compositor((400, 600), (150, 200), 25)
+    compositor.add(fands[0])
+    actual = compositor.finalize()
+    assert actual.shape == (2, 8)
+    assert (actual.data[:, :2] == 0).all()
+    np.testing.assert_almost_equal(actual.data[:, 2:],
+                                   fands[0].resampled(25)[:, :6])
+
+
+def test_compositor_raise_errors(fands):
+    with pytest.raises(ValueError):
+        Compositor((0, 10), (0, 10), 5, mode='median')
+    with pytest.raises(TypeError):
+        Compositor((0, 10), (0, 10), 2.5)
+    with pytest.raises(ValueError):
+        Compositor((0, 10), (0, 10), 5).finalize()
+    with pytest.raises(ValueError):
+        Compositor.for_satmaps([])
+    compositor = Compositor.for_satmaps(fands)
+    with pytest.raises(TypeError):
+        compositor.add(1)
+    compositor.add(fands[0])
+    compositor.finalize()
+    with pytest.raises(ValueError):
+        compositor.add(fands[1])
+
+
+def test_latest_mode_needs_an_obs_date(fands):
+    compositor = Compositor.for_satmaps(fands, mode='latest')
+    fands[0].meta['obs_date'] = ''
+    with pytest.raises(ValueError, match='Obs_date must be an ISO date'):
+        compositor.add(fands[0])
+    compositor.add(fands[1])
+    assert compositor.finalize().meta['obs_date'] == '2023-01-12 07:47:02'
@@ -0,0 +1,67 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import numpy as np
+import pytest
+from aigeanpy.satmap import get_satmap
+from aigeanpy.expression import LazySatMap
+
+FILES = ['aigean_fan_20230104_150010.zip', 'aigean_fan_20230112_074702.zip',
+         'aigean_fan_20221205_191610.zip', 'aigean_fan_20221205_192210.zip',
+         'aigean_fan_20221208_170852.zip', 'aigean_fan_20221210_150420.zip']
+
+
+@pytest.fixture(name='fand')
+def fixture_fand():
+    return [get_satmap(filename) for filename in FILES]
+
+
+@pytest.mark.parametrize('chunk_rows', [None, 1, 4])
+@pytest.mark.parametrize('expression', [
+    lambda a, b, c, d, e, f: a - b,
+    lambda a, b, c, d, e, f: c + (d + c),
+    lambda a, b, c, d, e, f: (a - b) + (a - b),
+    lambda a, b, c, d, e, f: (e - f) - (f - e),
+    lambda a, b, c, d, e, f: (e - f) - f,
+    lambda a, b, c, d, e, f: (a - b) + a,
+    lambda a, b, c, d, e, f: a - (b + (b - a)),
+])
+def test_compute_equals_eager_operators(fand, expression, chunk_rows):
+    expected = expression(*fand)
+    lazy = expression(*[satmap.lazy() for satmap in fand])
+    assert lazy.meta == expected.meta
+    assert lazy.shape == expected.shape
+    actual = lazy.compute(chunk_rows=chunk_rows)
+    assert type(actual) is type(expected)
+    assert actual.extra
+    assert actual.meta == expected.meta
+    np.testing.assert_array_equal(actual.data, expected.data)
+
+
+def test_compute_writes_into_the_given_buffer(fand, tmp_path):
+    lazy = (fand[4].lazy() - fand[5]) - (fand[5] - fand[4])
+    out = np.lib.format.open_memmap(tmp_path / 'out.npy', mode='w+',
+                                    shape=lazy.shape)
+    assert lazy.compute(out, chunk_rows=2).data is out
+    np.testing.assert_array_equal(
+        np.load(tmp_path / 'out.npy'),
+        ((fand[4] - fand[5]) - (fand[5] - fand[4])).data)
+    with pytest.raises(ValueError):
+        lazy.compute(np.zeros((1, 1)))
+    with pytest.raises(TypeError):
+        lazy.compute([[0]])
+
+
+def test_operators_raise_errors_when_building_the_expression(fand):
+    lazy = fand[0].lazy()
+    with pytest.raises(TypeError):
+        _ = lazy + 1
+    with pytest.raises(TypeError):
+        LazySatMap(1)
+    with pytest.raises(ValueError, match='2 data must in the same day'):
+        _ = lazy + fand[1]
+    with pytest.raises(ValueError, match='2 data must in different days'):
+        _ = lazy - fand[0]
+    with pytest.raises(ValueError, match='Two data must overlap'):
+        _ = lazy - fand[2]
+    with pytest.raises(ValueError, match='different resolution'):
+        _ = lazy + get_satmap('aigean_lir_20230104_145310.asdf')
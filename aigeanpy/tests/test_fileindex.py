@@ -0,0 +1,137 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import pytest
+from aigeanpy.fileindex import FileIndex, find_file, get_file_index, \
+    parse_filename, scan_files
+
+
+def _make_tree(root):
+    (root/'a').mkdir()
+    (root/'b'/'c').mkdir(parents=True)
+    (root/'a'/'aigean_fan_20230104_150010.zip').write_bytes(b'')
+    (root/'b'/'c'/'aigean_fan_20230104_150010.zip').write_bytes(b'')
+    (root/'b'/'c'/'aigean_lir_20230104_145310.asdf').write_bytes(b'')
+
+
+def test_find_returns_first_sorted_match(tmp_path):
+    _make_tree(tmp_path)
+    index = FileIndex(tmp_path)
+    assert index.find('aigean_fan_20230104_150010.zip') == \
+        tmp_path/'a'/'aigean_fan_20230104_150010.zip'
+
+
+def test_find_matches_parent_directories(tmp_path):
+    _make_tree(tmp_path)
+    index = FileIndex(tmp_path)
+    assert index.find('c/aigean_fan_20230104_150010.zip') == \
+        tmp_path/'b'/'c'/'aigean_fan_20230104_150010.zip'
+    assert index.find('/c/aigean_lir_20230104_145310.asdf') == \
+        tmp_path/'b'/'c'/'aigean_lir_20230104_145310.asdf'
+
+
+def test_find_returns_None_when_no_match(tmp_path):
+    _make_tree(tmp_path)
+    assert FileIndex(tmp_path).find('aigean_man_20221205_194510.hdf5') is None
+    assert FileIndex(tmp_path).find('') is None
+
+
+def test_find_refreshes_index_when_tree_changes(tmp_path):
+    _make_tree(tmp_path)
+    index = FileIndex(tmp_path)
+    index.build()
+    new_file = tmp_path/'b'/'aigean_man_20221205_194510.hdf5'
+    new_file.write_bytes(b'')
+    assert index.find('aigean_man_20221205_194510.hdf5') == new_file
+
+    (tmp_path/'a'/'aigean_fan_20230104_150010.zip').unlink()
+    assert index.find('aigean_fan_20230104_150010.zip') == \
+        tmp_path/'b'/'c'/'aigean_fan_20230104_150010.zip'
+
+
+def test_find_remembers_misses_until_invalidated(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    index = FileIndex(tmp_path)
+    assert index.find('aigean_man_20221205_194510.hdf5') is None
+    new_file = tmp_path/'b'/'aigean_man_20221205_194510.hdf5'
+    new_file.write_bytes(b'')
+    builds = []
+    monkeypatch.setattr(FileIndex, 'build', builds.append)
+    # the miss is answered without walking the tree again
+    assert index.find('aigean_man_20221205_194510.hdf5') is None
+    assert not builds
+    monkeypatch.undo()
+    index.invalidate()
+    assert index.find('aigean_man_20221205_194510.hdf5') == new_file
+
+
+def test_saved_index_is_loaded_without_walking(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    saved = tmp_path/'index.json'
+    FileIndex(tmp_path, saved).build()
+    monkeypatch.setattr(FileIndex, 'build', None)
+    index = FileIndex(tmp_path, saved)
+    assert index.find('c/aigean_lir_20230104_145310.asdf') == \
+        tmp_path/'b'/'c'/'aigean_lir_20230104_145310.asdf'
+    monkeypatch.undo()
+    # a saved index is rebuilt and saved again when it misses a file
+    new_file = tmp_path/'b'/'aigean_man_20221205_194510.hdf5'
+    new_file.write_bytes(b'')
+    assert index.find('aigean_man_20221205_194510.hdf5') == new_file
+    assert 'b/aigean_man_20221205_194510.hdf5' in saved.read_text()
+    index.invalidate()
+    assert not saved.exists()
+
+
+def test_get_file_index_is_built_once_per_root(tmp_path):
+    _make_tree(tmp_path)
+    index = get_file_index(tmp_path)
+    assert get_file_index(str(tmp_path)) is index
+    assert find_file('aigean_lir_20230104_145310.asdf', tmp_path) == \
+        tmp_path/'b'/'c'/'aigean_lir_20230104_145310.asdf'
+
+
+@pytest.mark.parametrize('filename, instrument, obs_date', [
+    ('aigean_fan_20230112_074702.zip', 'Fand', '2023-01-12 07:47:02'),
+    ('a/b/aigean_man_20221205_194510.hdf5', 'Manannan',
+     '2022-12-05 19:45:10'),
+    ('aigean_lir_20230104_145310.asdf', 'Lir', '2023-01-04 14:53:10'),
+    ('aigean_ecn_20230104_145310.csv', 'Ecne', '2023-01-04 14:53:10'),
+])
+def test_parse_filename(filename, instrument, obs_date):
+    meta = parse_filename(filename)
+    assert meta['observatory'] == 'Aigean'
+    assert meta['instrument'] == instrument
+    assert meta['obs_date'] == obs_date
+    assert meta['format'] == filename.rsplit('.', 1)[1]
+
+
+@pytest.mark.parametrize('filename', [
+    'aigean_foo_20230112_074702.zip', 'aigean_fan_20230112_074702.png',
+    'aigean_fan_2023011_074702.zip', 'aigean_fan_20230112_074702.zip.npz'])
+def test_parse_filename_raise_error(filename):
+    with pytest.raises(ValueError):
+        parse_filename(filename)
+
+
+def test_scan_files_filters_by_name_only(tmp_path):
+    _make_tree(tmp_path)
+    # the files are empty, so opening any of them would fail
+    (tmp_path/'a'/'aigean_man_20230104_235959.hdf5').write_bytes(b'')
+    (tmp_path/'a'/'aigean_man_20230105_000000.hdf5').write_bytes(b'')
+    (tmp_path/'notes_20230104.txt').write_bytes(b'')
+    assert scan_files(tmp_path) == [
+        'b/c/aigean_lir_20230104_145310.asdf',
+        'a/aigean_fan_20230104_150010.zip',
+        'b/c/aigean_fan_20230104_150010.zip',
+        'a/aigean_man_20230104_235959.hdf5',
+        'a/aigean_man_20230105_000000.hdf5']
+    assert scan_files(tmp_path, 'man', stop='2023-01-04') == \
+        ['a/aigean_man_20230104_235959.hdf5']
+    assert scan_files(tmp_path, 'Manannan', '2023-01-05') == \
+        ['a/aigean_man_20230105_000000.hdf5']
+    assert scan_files(tmp_path, start='2023-01-04 14:55:00',
+                      stop='2023-01-04 15:00:10') == \
+        ['a/aigean_fan_20230104_150010.zip',
+         'b/c/aigean_fan_20230104_150010.zip']
+    with pytest.raises(ValueError):
+        scan_files(tmp_path, 'foo')
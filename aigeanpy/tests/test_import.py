@@ -0,0 +1,43 @@
+import sys
+import subprocess
+import pytest
+import aigeanpy
+from aigeanpy import satmap
+
+HEAVY_MODULES = ['matplotlib', 'skimage', 'h5py', 'asdf', 'requests']
+
+
+def _imported_modules(statement):
+    code = f'import sys\n{statement}\nprint(" ".join(sys.modules))'
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+def _imported_names(statement):
+    code = f'{statement}\nprint(" ".join(dir()))'
+    output = subprocess.run([sys.executable, '-c', code], check=True,
+                            capture_output=True, text=True).stdout
+    return set(output.split())
+
+
+@pytest.mark.parametrize('statement', ['import aigeanpy',
+                                       'import aigeanpy.command',
+                                       'from aigeanpy import get_satmap'])
+def test_import_does_not_load_heavy_modules(statement):
+    modules = _imported_modules(statement)
+    assert modules.isdisjoint(HEAVY_MODULES)
+
+
+def test_public_names_are_loaded_on_first_use():
+    assert aigeanpy.get_satmap is satmap.get_satmap
+    assert aigeanpy.satmap is satmap
+    assert 'mosaic_many' in dir(aigeanpy)
+    with pytest.raises(AttributeError):
+        _ = aigeanpy.foo
+
+
+def test_star_import_loads_every_public_name():
+    names = _imported_names('from aigeanpy import *')
+    assert {'get_satmap', 'query_isa', 'satmap_cache', 'kmeans'} <= names
+    assert 'import_module' not in names
@@ -0,0 +1,32 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import numpy as np
+from aigeanpy.readers import _remap
+
+
+def _memmap(path, values, offset):
+    path.write_bytes(b'\0' * offset + np.asarray(values, float).tobytes())
+    return np.memmap(path, dtype=float, mode='r', offset=offset,
+                     shape=(len(values),))
+
+
+def test_remap_maps_the_same_bytes(tmp_path):
+    data = _memmap(tmp_path/'data.bin', [1., 1., 2., 3., 5., 8.], 8)
+    mapped = _remap(tmp_path/'data.bin', data, 8)
+    assert isinstance(mapped, np.memmap)
+    assert mapped.tolist() == data.tolist()
+
+
+def test_remap_copies_when_the_offset_is_wrong(tmp_path):
+    data = _memmap(tmp_path/'data.bin', [1., 1., 2., 3., 5., 8.], 8)
+    # data[1:] starts at byte 16, the first elements at 8 and 16 match
+    remapped = _remap(tmp_path/'data.bin', data[1:], 8)
+    assert not isinstance(remapped, np.memmap)
+    assert remapped.tolist() == [1., 2., 3., 5., 8.]
+
+
+def test_remap_copies_past_the_end_of_the_file(tmp_path):
+    data = _memmap(tmp_path/'data.bin', [1., 2., 3.], 0)
+    remapped = _remap(tmp_path/'data.bin', data, 16)
+    assert not isinstance(remapped, np.memmap)
+    assert remapped.tolist() == [1., 2., 3.]
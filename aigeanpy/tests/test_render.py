@@ -0,0 +1,70 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import os
+import numpy as np
+import pytest
+from matplotlib import pyplot as plt
+from matplotlib.image import imread
+from aigeanpy.satmap import get_satmap
+from aigeanpy.render import render, render_many
+
+FILES = ['aigean_fan_20230104_150010.zip', 'aigean_lir_20230104_145310.asdf',
+         'aigean_man_20221205_194510.hdf5']
+
+
+def test_render_draws_the_pyplot_figure(tmp_path):
+    man = get_satmap(FILES[2])
+    filename = render(man, str(tmp_path))
+    # the figure visualise used to draw with pyplot
+    plt.figure()
+    plt.imshow(man.data, origin='lower',
+               extent=[750, 1200, 250, 400])
+    plt.savefig(tmp_path/'pyplot.png')
+    plt.close('all')
+    assert (imread(tmp_path/filename) == imread(tmp_path/'pyplot.png')).all()
+
+
+def test_render_image_has_a_pixel_per_data_pixel(tmp_path):
+    fand = get_satmap(FILES[0])
+    filename = render(fand, str(tmp_path), kind='image', cmap='gray')
+    image = imread(tmp_path/filename)
+    assert image.shape[:2] == fand.shape
+    # the first row of the data is at the bottom of the image
+    brightness = image[::-1, :, 0]
+    order = np.argsort(fand.data, axis=None)
+    assert (np.diff(brightness.ravel()[order]) >= 0).all()
+    assert render(fand, str(tmp_path), resolution=25, kind='image') == \
+        filename
+    assert imread(tmp_path/filename).shape[:2] == (2, 9)
+
+
+def test_visualise_saves_without_pyplot_figures(tmp_path):
+    plt.close('all')
+    fand = get_satmap(FILES[0])
+    filename = fand.visualise(save=True, save_path=str(tmp_path))
+    assert filename == 'Aigean_Fand_20230104_150010.png'
+    assert os.path.isfile(tmp_path/filename)
+    assert plt.get_fignums() == []
+
+
+@pytest.mark.parametrize('workers, processes', [(1, False), (3, False),
+                                                (2, True)])
+def test_render_many(tmp_path, workers, processes):
+    satmaps = FILES[:2] + [get_satmap(FILES[2]), 'foo.zip']
+    filenames, errors = render_many(satmaps, str(tmp_path), workers=workers,
+                                    processes=processes)
+    assert filenames == ['Aigean_Fand_20230104_150010.png',
+                         'Aigean_Lir_20230104_145310.png',
+                         'Aigean_Manannan_20221205_194510.png', None]
+    assert list(errors) == [3]
+    assert sorted(os.listdir(tmp_path)) == sorted(filenames[:3])
+
+
+def test_render_raise_errors(tmp_path):
+    fand = get_satmap(FILES[0])
+    with pytest.raises(TypeError):
+        render(fand.data)
+    with pytest.raises(TypeError):
+        render(fand, tmp_path)
+    with pytest.raises(ValueError):
+        render(fand, str(tmp_path), kind='svg')
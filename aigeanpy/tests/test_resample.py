@@ -0,0 +1,48 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import numpy as np
+import pytest
+from skimage import transform
+from aigeanpy.resample import resample, block_mean, integer_factor
+
+
+@pytest.mark.parametrize('shape', [(10, 20), (1, 5), (7, 3)])
+@pytest.mark.parametrize('factor', [2, 3, 6])
+def test_linear_upsampling_matches_skimage(shape, factor):
+    data = np.random.default_rng(0).random(shape) * 900
+    np.testing.assert_almost_equal(resample(data, factor, method='linear'),
+                                   transform.rescale(data, factor))
+
+
+@pytest.mark.parametrize('shape', [(10, 20), (9, 7), (1, 5)])
+@pytest.mark.parametrize('factor', [2, 3, 6])
+def test_downsampling_has_the_same_shape_as_skimage(shape, factor):
+    data = np.ones(shape)
+    actual = resample(data, 1 / factor)
+    assert actual.shape == transform.rescale(data, 1 / factor).shape
+    assert (actual == 1).all()
+
+
+def test_block_mean_averages_blocks():
+    data = np.arange(36.).reshape(6, 6)
+    expected = data.reshape(2, 3, 2, 3).mean(axis=(1, 3))
+    assert (block_mean(data, 3) == expected).all()
+
+
+def test_nearest_upsampling_repeats_pixels():
+    data = np.array([[1., 2.]])
+    expected = np.array([[1., 1., 1., 2., 2., 2.]] * 3)
+    assert (resample(data, 3, method='nearest') == expected).all()
+
+
+def test_auto_falls_back_to_skimage_for_non_integer_scale():
+    data = np.random.default_rng(0).random((10, 20))
+    assert integer_factor(1.5) is None
+    assert (resample(data, 1.5) == transform.rescale(data, 1.5)).all()
+    with pytest.raises(ValueError):
+        resample(data, 1.5, method='linear')
+
+
+def test_resample_raise_ValueError_with_unknown_method():
+    with pytest.raises(ValueError):
+        resample(np.ones((2, 2)), 2, method='cubic')
@@ -1,13 +1,17 @@
 # Disabling missing-class-docstring, pointless-statement, redefined-builtin and
 # and bare-except
 # pylint: disable = C0115, W0104, W0622, W0702
+import os
 import pytest
 import json
+import shutil
 import asdf
 import zipfile
 import numpy as np
 from io import BytesIO
 from aigeanpy import satmap
+from aigeanpy.resample import resample
+from aigeanpy.coords import _earth_to_pixel_tuple
 from pathlib import Path
 from unittest import mock, TestCase
 
@@ -79,6 +83,40 @@ def test_pixel_to_earth_return_correct_value():
     assert satmap.pixel_to_earth(x, y, resolution) == (1125, 375)
 
 
+@pytest.mark.parametrize('resolution', [1, 4, 5, 15, 30])
+def test_coordinate_transforms_of_arrays_equal_scalar_ones(resolution):
+    rng = np.random.default_rng(resolution)
+    # integers and halves of pixels, which are rounded to even
+    x = np.concatenate([rng.integers(-1000, 1000, 200),
+                        (rng.integers(-100, 100, 50) + 0.5) * resolution])
+    y = rng.permutation(x)
+    pixel_x, pixel_y = satmap.earth_to_pixel(x, y, resolution)
+    assert list(zip(pixel_x, pixel_y)) == \
+        [satmap.earth_to_pixel(ex, ey, resolution) for ex, ey in zip(x, y)]
+    earth_x, earth_y = satmap.pixel_to_earth(pixel_x, pixel_y, resolution)
+    assert (earth_x == pixel_x * resolution).all()
+    assert (earth_y == pixel_y * resolution).all()
+
+
+@pytest.mark.parametrize('resolution', [1, 4, 5, 15, 30])
+def test_footprint_transforms_of_arrays_equal_scalar_ones(resolution):
+    rng = np.random.default_rng(resolution)
+    footprints_x = np.sort(rng.integers(-1000, 1000, (300, 2)), axis=1)
+    footprints_y = np.sort(rng.integers(-1000, 1000, (300, 2)), axis=1)
+    footprints_x[:100, 0] = 0
+    px, py = satmap.earth_to_pixel_footprints(footprints_x, footprints_y,
+                                              resolution)
+    for fx, fy, fpx, fpy in zip(footprints_x, footprints_y, px, py):
+        assert _earth_to_pixel_tuple(fx, fy, resolution) == \
+            (tuple(fpx), tuple(fpy))
+
+
+def test_coordinate_transforms_of_scalars_return_ints():
+    pixel = satmap.earth_to_pixel(np.float64(752.5), 250, 5)
+    assert pixel == (150, 50) and all(isinstance(p, int) for p in pixel)
+    assert satmap.pixel_to_earth(2, 3, 5) == (10, 15)
+
+
 def test_SatMap_generate_correct_fov_attribute_value():
     xcoords = (750, 1200)
     ycoords = (250, 400)
@@ -357,3 +395,337 @@ class mocktest(TestCase):
         self.assertEqual(get_substracted.called, True)
         self.assertEqual(get_substracted.call_count, 1)
         self.assertEqual(result.centre, (800, 350))
+
+
+@pytest.mark.parametrize('filename', ['aigean_lir_20230104_145310.asdf',
+                                      'aigean_fan_20230104_150010.zip',
+                                      'aigean_man_20221205_194510.hdf5'])
+def test_read_meta_return_the_same_meta_as_get_satmap(filename):
+    assert satmap.read_meta(filename) == satmap.get_satmap(filename).meta
+
+
+def test_read_meta_raise_ValueError_when_file_format_not_supported():
+    with pytest.raises(ValueError) as err:
+        satmap.read_meta('aigean_ecn_20230104_145310.csv')
+
+
+@pytest.mark.parametrize('processes', [False, True])
+def test_get_satmaps_keep_order_and_collect_errors(processes):
+    filenames = ['aigean_man_20221205_194510.hdf5', 'foo.zip',
+                 'aigean_lir_20230104_145310.asdf', 'foo.zip',
+                 'aigean_fan_20230104_150010.zip']
+    satmaps, errors = satmap.get_satmaps(filenames, workers=3,
+                                         processes=processes)
+    assert [type(s) for s in satmaps] == [satmap.Manannan, type(None),
+                                          satmap.Lir, type(None),
+                                          satmap.Fand]
+    # repeated names are kept apart
+    assert list(errors) == [1, 3]
+    assert isinstance(errors[1], ValueError)
+
+
+def test_load_many_raise_errors_with_invalid_workers():
+    with pytest.raises(TypeError) as err:
+        satmap.load_many(satmap.read_meta, [], workers=1.5)
+    with pytest.raises(ValueError) as err:
+        satmap.load_many(satmap.read_meta, [], workers=0)
+
+
+@pytest.mark.parametrize('filename', ['aigean_lir_20230104_145310.asdf',
+                                      'aigean_man_20221205_194510.hdf5'])
+def test_get_satmap_with_mmap_is_backed_by_the_file(filename):
+    mapped = satmap.get_satmap(filename, use_cache=False, mmap=True)
+    loaded = satmap.get_satmap(filename, use_cache=False)
+    assert isinstance(mapped.data, np.memmap)
+    assert mapped.meta == loaded.meta
+    assert (mapped.data == loaded.data).all()
+
+
+def test_get_zip_with_mmap_maps_stored_npy(tmp_path):
+    fand = satmap.get_satmap('aigean_fan_20230104_150010.zip')
+    file_path = tmp_path/'aigean_fan_20230104_150010.zip'
+    file_json = {'archive': 'ISA', 'instrument': 'Fand',
+                 'observatory': 'Aigean', 'resolution': 5,
+                 'xcoords': [450, 675], 'ycoords': [150, 200],
+                 'date': '2023-01-04', 'time': '15:00:10'}
+    npy = BytesIO()
+    np.save(npy, fand.data)
+    with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_STORED) as f:
+        f.writestr('metadata.json', json.dumps(file_json))
+        f.writestr('observation.npy', npy.getvalue())
+
+    meta, data = satmap.get_zip(file_path, mmap=True)
+    assert isinstance(data, np.memmap)
+    assert meta == fand.meta
+    assert (data == fand.data).all()
+
+
+def test_get_zip_with_mmap_reads_compressed_npy():
+    file_path = sorted(Path().rglob('aigean_fan_20230104_150010.zip'))[0]
+    meta, data = satmap.get_zip(file_path, mmap=True)
+    assert not isinstance(data, np.memmap)
+    assert data.shape == (10, 45)
+
+
+@pytest.mark.parametrize('mmap', [False, True])
+@pytest.mark.parametrize('filename, xcoords, ycoords, pixels',
+                         [('aigean_man_20221205_194510.hdf5', (900, 1050),
+                           (250, 325), ((0, 5), (10, 20))),
+                          ('aigean_lir_20230104_145310.asdf', (400, 1000),
+                           (150, 300), ((5, 10), (10, 20))),
+                          ('aigean_fan_20230104_150010.zip', (500, 600),
+                           (160, 190), ((2, 8), (10, 30)))])
+def test_get_satmap_reads_only_the_window(filename, xcoords, ycoords, pixels,
+                                          mmap):
+    rows, cols = pixels
+    full = satmap.get_satmap(filename)
+    window = satmap.get_satmap(filename, xcoords=xcoords, ycoords=ycoords,
+                               mmap=mmap)
+    expected_xcoords = (max(xcoords[0], full.meta['xcoords'][0]),
+                        min(xcoords[1], full.meta['xcoords'][1]))
+    assert window.meta['xcoords'] == expected_xcoords
+    assert window.meta['ycoords'] == ycoords
+    assert window.shape == (rows[1] - rows[0], cols[1] - cols[0])
+    assert (window.data == full.data[rows[0]:rows[1],
+                                     cols[0]:cols[1]]).all()
+
+
+def test_get_satmap_raise_ValueError_when_window_does_not_overlap():
+    with pytest.raises(ValueError) as err:
+        satmap.get_satmap('aigean_man_20221205_194510.hdf5',
+                          xcoords=(0, 100), ycoords=(0, 100))
+
+
+def test_mosaic_many_equals_chained_mosaic():
+    lir = satmap.get_satmap('aigean_lir_20221205_191610.asdf')
+    man = satmap.get_satmap('aigean_man_20221205_194510.hdf5')
+    expected = lir.mosaic(man)
+    actual = satmap.mosaic_many([lir, man])
+    assert actual.meta == expected.meta
+    assert type(actual) is type(expected)
+    np.testing.assert_almost_equal(actual.data, expected.data)
+
+
+def test_mosaic_many_raise_ValueError_when_footprints_do_not_overlap():
+    fand = _get_fand('aigean_fan_20230104_150010.zip')
+    lir = _get_lir('aigean_lir_20230104_145310.asdf')
+    lir.meta['xcoords'] = (10, 20)
+    lir.meta['ycoords'] = (15, 25)
+    with pytest.raises(ValueError, match='Two data must overlap'):
+        satmap.mosaic_many([fand, lir])
+
+
+def test_mosaic_many_raise_ValueError_when_from_diff_days():
+    fand1 = _get_fand('aigean_fan_20230104_150010.zip')
+    fand2 = _get_fand('aigean_fan_20230112_074702.zip')
+    with pytest.raises(ValueError, match='2 data must in the same day'):
+        satmap.mosaic_many([fand1, fand2])
+
+
+def test_mosaic_many_raise_errors_with_invalid_input():
+    fand = _get_fand('aigean_fan_20230104_150010.zip')
+    with pytest.raises(ValueError):
+        satmap.mosaic_many([])
+    with pytest.raises(TypeError):
+        satmap.mosaic_many([fand, Ecne()])
+    with pytest.raises(TypeError):
+        satmap.mosaic_many([fand, fand], resolution=2.5)
+
+
+def test_build_pyramid_default_levels_halve_the_data():
+    fand = _get_fand('aigean_fan_20230104_150010.zip')
+    pyramid = fand.build_pyramid()
+    assert list(pyramid) == [10, 20, 40]
+    assert [level.shape for level in pyramid.values()] == \
+        [(5, 22), (2, 11), (1, 6)]
+
+
+def test_pyramid_levels_have_the_shape_of_one_step_down_sampling():
+    meta = {'archive': 'ISA', 'instrument': 'Fand', 'observatory': 'Aigean',
+            'resolution': 5, 'xcoords': (0, 55), 'ycoords': (0, 55),
+            'obs_date': '2023-01-04 15:00:10'}
+    data = np.arange(121.).reshape(11, 11) + 1
+    expected = satmap.Fand(meta, data).resampled(40)
+    fand = satmap.Fand(meta, data)
+    fand.build_pyramid()
+    assert list(fand.pyramid) == [10, 20, 40]
+    assert fand.resampled(40).shape == expected.shape == (1, 1)
+    satmap.mosaic_many([fand, satmap.Fand(meta, data)], 40)
+
+
+def test_build_pyramid_raise_ValueError_with_invalid_resolutions():
+    fand = _get_fand('aigean_fan_20230104_150010.zip')
+    with pytest.raises(ValueError):
+        fand.build_pyramid([5])
+    with pytest.raises(ValueError):
+        fand.build_pyramid([12])
+
+
+def test_resampled_uses_the_nearest_pyramid_level():
+    man = satmap.get_satmap('aigean_man_20221205_194510.hdf5')
+    pyramid = man.build_pyramid([30, 60])
+    assert man.nearest_level(120)[0] == 60
+    assert man.nearest_level(90)[0] == 30
+    assert man.nearest_level(10)[0] == 15
+    np.testing.assert_almost_equal(man.resampled(120),
+                                   resample(pyramid[60], 1 / 2))
+
+
+def test_save_and_load_pyramid_next_to_the_source(tmp_path):
+    filename = 'aigean_lir_20230104_145310.asdf'
+    shutil.copy(satmap.find_file(filename), tmp_path)
+    lir = satmap.get_satmap(filename, root=tmp_path, use_cache=False)
+    assert lir.source == tmp_path / filename
+    pyramid = lir.build_pyramid([60, 120])
+    assert lir.save_pyramid() == tmp_path / (filename + '.pyramid.npz')
+
+    loaded = satmap.get_satmap(filename, root=tmp_path, use_cache=False)
+    assert loaded.load_pyramid()
+    assert list(loaded.pyramid) == [60, 120]
+    for resolution, level in pyramid.items():
+        assert isinstance(loaded.pyramid[resolution], np.memmap)
+        np.testing.assert_almost_equal(loaded.pyramid[resolution], level)
+
+    # a pyramid older than its source is ignored
+    os.utime(tmp_path / filename, ns=(0, 2 ** 62))
+    assert not loaded.load_pyramid()
+
+
+def test_get_satmap_at_resolution_reads_the_pyramid_window(tmp_path):
+    filename = 'aigean_man_20221205_194510.hdf5'
+    shutil.copy(satmap.find_file(filename), tmp_path)
+    man = satmap.get_satmap(filename, root=tmp_path, use_cache=False)
+    window = {'xcoords': (900, 1140), 'ycoords': (250, 370)}
+    expected = satmap.get_satmap(filename, root=tmp_path, resolution=30,
+                                 **window)
+    man.build_pyramid([30])
+    man.save_pyramid()
+    actual = satmap.get_satmap(filename, root=tmp_path, resolution=30,
+                               **window)
+    assert actual.meta == expected.meta
+    assert actual.shape == (4, 8)
+    np.testing.assert_almost_equal(actual.data, expected.data)
+
+
+def test_crop_shares_the_buffer_of_the_data():
+    man = satmap.get_satmap('aigean_man_20221205_194510.hdf5',
+                            use_cache=False)
+    window = man.crop((900, 1050), (250, 325))
+    assert isinstance(window, satmap.Manannan)
+    assert np.shares_memory(window.data, man.data)
+    np.testing.assert_array_equal(window.data, man.data[:5, 10:20])
+    assert window.meta['xcoords'] == (900, 1050)
+    assert window.meta['ycoords'] == (250, 325)
+    assert window.fov == (150, 75)
+    assert window.centre == (975, 287)
+    assert window.shape == (5, 10)
+    assert man.meta['xcoords'] == (750, 1200)
+    # the crop of a crop is still a view on the data
+    assert np.shares_memory(window.crop((1000, 1050)).data, man.data)
+
+
+def test_crop_is_read_only_until_detached():
+    man = satmap.get_satmap('aigean_man_20221205_194510.hdf5',
+                            use_cache=False)
+    window = man.crop((900, 1050), (250, 325))
+    with pytest.raises(ValueError):
+        window.data[0, 0] = -1
+    assert window.detach() is window
+    window.data[0, 0] = -1
+    assert not np.shares_memory(window.data, man.data)
+    assert man.data[0, 10] != -1
+
+
+def test_sub_returns_writeable_data():
+    fand1 = satmap.get_satmap('aigean_fan_20230104_150010.zip')
+    fand2 = satmap.get_satmap('aigean_fan_20230112_074702.zip')
+    subtracted = fand1 - fand2
+    assert subtracted.data.flags.writeable
+    assert not np.shares_memory(subtracted.data, fand1.data)
+
+
+def test_zonal_stats_equal_crop_reductions():
+    man = satmap.get_satmap('aigean_man_20221205_194510.hdf5')
+    rng = np.random.default_rng(0)
+    boxes = []
+    for _ in range(300):
+        # boxes off the pixel grid, across the edges and off the data
+        x0, y0 = rng.integers(700, 1250), rng.integers(200, 450)
+        boxes.append(((x0, x0 + rng.integers(1, 120)),
+                      (y0, y0 + rng.integers(1, 120))))
+    stats = man.zonal_stats(boxes)
+    for box, total, mean, count in zip(boxes, stats['sum'], stats['mean'],
+                                       stats['count']):
+        try:
+            window = man.crop(*box).data
+        except ValueError:
+            assert count == 0 and total == 0 and np.isnan(mean)
+            continue
+        assert count == window.size
+        assert np.isclose(total, window.sum())
+        assert np.isclose(mean, window.mean())
+
+
+def test_integral_image_is_cached_until_data_is_replaced():
+    fand = satmap.get_satmap('aigean_fan_20230104_150010.zip')
+    table = fand.integral_image()
+    assert fand.integral_image() is table
+    assert table.shape == (fand.shape[0] + 1, fand.shape[1] + 1)
+    assert np.isclose(table[-1, -1], fand.data.sum())
+    fand.data = np.ones(fand.shape)
+    assert fand.zonal_stats([((450, 675), (150, 200))])['sum'][0] == \
+        fand.data.size
+
+
+def test_sample_nearest_equals_pixel_lookup():
+    man = satmap.get_satmap('aigean_man_20221205_194510.hdf5')
+    rng = np.random.default_rng(0)
+    x = rng.uniform(700, 1250, 1000)
+    y = rng.uniform(200, 450, 1000)
+    values = man.sample(x, y, fill_value=-1)
+    for px, py, value in zip(x, y, values):
+        if 750 <= px <= 1200 and 250 <= py <= 400:
+            row = min(int((py - 250) // 15), man.shape[0] - 1)
+            col = min(int((px - 750) // 15), man.shape[1] - 1)
+            assert value == man.data[row, col]
+        else:
+            assert value == -1
+
+
+def test_sample_bilinear_equals_map_coordinates():
+    ndimage = pytest.importorskip('scipy.ndimage')
+    man = satmap.get_satmap('aigean_man_20221205_194510.hdf5')
+    rng = np.random.default_rng(1)
+    x = rng.uniform(750, 1200, (20, 50))
+    y = rng.uniform(250, 400, (20, 50))
+    values = man.sample(x, y, method='bilinear')
+    assert values.shape == (20, 50)
+    expected = ndimage.map_coordinates(man.data, [(y - 250) / 15 - 0.5,
+                                                  (x - 750) / 15 - 0.5],
+                                       order=1, mode='nearest')
+    np.testing.assert_allclose(values, expected)
+    # at the centres of the pixels, the values are the data
+    assert man.sample(757.5, 257.5, 'bilinear') == man.data[0, 0]
+    assert np.isnan(man.sample(1200.1, 300, 'bilinear'))
+
+
+def test_sample_many_equals_sample():
+    fand = satmap.get_satmap('aigean_fan_20230104_150010.zip')
+    other = satmap.SatMap(fand.meta.copy(), fand.data * 2)
+    x, y = [450, 500.5, 675, 700], [150, 170.2, 200, 160]
+    for method in ('nearest', 'bilinear'):
+        values = satmap.sample_many([fand, other], x, y, method, 0)
+        np.testing.assert_array_equal(values[0],
+                                      fand.sample(x, y, method, 0))
+        np.testing.assert_allclose(values[1], values[0] * 2)
+
+
+def test_sample_raise_errors():
+    fand1 = satmap.get_satmap('aigean_fan_20230104_150010.zip')
+    fand2 = satmap.get_satmap('aigean_fan_20230112_074702.zip')
+    with pytest.raises(ValueError):
+        fand1.sample(500, 160, method='cubic')
+    with pytest.raises(ValueError):
+        satmap.sample_many([fand1, fand2], 500, 160)
+    with pytest.raises(ValueError):
+        satmap.sample_many([], 500, 160)
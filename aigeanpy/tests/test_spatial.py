@@ -0,0 +1,91 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import random
+import pytest
+from aigeanpy.spatial import FootprintIndex, overlap, contains, union
+
+
+def _random_footprints(seed, number):
+    rng = random.Random(seed)
+    footprints = []
+    for _ in range(number):
+        x0, y0 = rng.randint(0, 100) * 5, rng.randint(0, 100) * 5
+        footprints.append(((x0, x0 + rng.randint(1, 40) * 5),
+                           (y0, y0 + rng.randint(1, 40) * 5)))
+    return footprints
+
+
+def _greedy_order(footprints):
+    # the pairwise search mosaic_many used to do
+    for i, footprint in enumerate(footprints):
+        others = [j for j, other in enumerate(footprints)
+                  if i != j and overlap(footprint, other)]
+        if others:
+            order = [i, others[0]]
+            break
+    else:
+        raise ValueError('Two data must overlap')
+    bbox = union(footprints[order[0]], footprints[order[1]])
+    while len(order) < len(footprints):
+        remaining = [i for i in range(len(footprints)) if i not in order
+                     and overlap(bbox, footprints[i])]
+        if not remaining:
+            raise ValueError('Two data must overlap')
+        order.append(remaining[0])
+        bbox = union(bbox, footprints[remaining[0]])
+    return order
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('cell_size', [None, 3, 1000])
+def test_queries_equal_brute_force(seed, cell_size):
+    footprints = _random_footprints(seed, 40)
+    index = FootprintIndex(footprints, cell_size)
+    box = ((100, 300), (150, 320))
+    everything = range(len(footprints))
+    assert index.overlapping(*box) == \
+        [i for i in everything if overlap(footprints[i], box)]
+    assert index.within(*box) == \
+        [i for i in everything if contains(box, footprints[i])]
+    assert index.covering(*box) == \
+        [i for i in everything if contains(footprints[i], box)]
+    assert index.containing(200, 250) == \
+        [i for i in everything
+         if contains(footprints[i], ((200, 200), (250, 250)))]
+    graph = index.overlap_graph()
+    for i in everything:
+        assert graph[i] == [j for j in everything
+                            if i != j and overlap(footprints[i],
+                                                  footprints[j])]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_mosaic_order_equals_the_pairwise_search(seed):
+    footprints = _random_footprints(seed, random.Random(seed).randint(2, 15))
+    try:
+        expected = _greedy_order(footprints)
+    except ValueError:
+        with pytest.raises(ValueError, match='Two data must overlap'):
+            FootprintIndex(footprints).mosaic_order()
+    else:
+        assert FootprintIndex(footprints).mosaic_order() == expected
+
+
+def test_components_group_overlapping_footprints():
+    footprints = [((0, 10), (0, 10)), ((50, 60), (0, 10)),
+                  ((5, 15), (5, 15)), ((10, 20), (10, 20)),
+                  ((60, 70), (0, 10))]
+    index = FootprintIndex(footprints)
+    # touching edges don't connect footprints
+    assert index.components() == [[0, 2, 3], [1], [4]]
+    index.insert(((55, 65), (5, 8)))
+    assert index.components() == [[0, 2, 3], [1, 4, 5]]
+    assert len(index) == 6
+
+
+def test_empty_index():
+    index = FootprintIndex()
+    assert index.overlapping((0, 1), (0, 1)) == []
+    assert index.components() == []
+    with pytest.raises(ValueError):
+        FootprintIndex(cell_size=0)
@@ -0,0 +1,184 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import pickle
+import numpy as np
+import pytest
+from aigeanpy import temporal
+from aigeanpy.satmap import get_satmap
+from aigeanpy.temporal import SatMapStack, TemporalStats
+
+
+@pytest.fixture(name='satmaps')
+def fixture_satmaps(make_satmap):
+    return [make_satmap(3, (0, 40), (0, 20), '2023-01-03 10:00:00'),
+            make_satmap(1, (0, 40), (0, 20), '2023-01-01 10:00:00'),
+            make_satmap(2, (20, 60), (10, 30), '2023-01-02 10:00:00')]
+
+
+def test_stack_aligns_satmaps_by_date(satmaps):
+    stack = SatMapStack(satmaps)
+    assert stack.shape == (3, 3, 6) and len(stack) == 3
+    assert stack.obs_dates == ['2023-01-01 10:00:00', '2023-01-02 10:00:00',
+                               '2023-01-03 10:00:00']
+    assert stack.meta['xcoords'] == (0, 60)
+    assert stack.meta['obs_date'] == '2023-01-03 10:00:00'
+    assert stack.mask.sum() == 3 * 18 - 8 - 8 - 8
+    assert (stack.data[1][stack.mask[1]] == 0).all()
+    assert (stack.masked()[1, 1:, 2:] == 2).all()
+    second = stack.satmap(1, fill_value=-1)
+    assert second.meta['obs_date'] == '2023-01-02 10:00:00'
+    assert (second.data[0] == -1).all() and (second.data[1:, 2:] == 2).all()
+
+
+def test_stack_grids(satmaps):
+    stack = SatMapStack(satmaps, extent='intersection')
+    assert stack.meta['xcoords'] == (20, 40)
+    assert stack.meta['ycoords'] == (10, 20)
+    assert not stack.mask.any()
+    stack = SatMapStack(satmaps, xcoords=(30, 100), ycoords=(0, 10))
+    assert stack.shape == (3, 1, 7)
+    assert (stack.masked().count(axis=(1, 2)) == [1, 0, 1]).all()
+
+
+def test_stack_memmap(satmaps, tmp_path):
+    path = tmp_path/'stack.npy'
+    stack = SatMapStack(satmaps, path=path)
+    assert isinstance(stack.data, np.memmap)
+    stack.data.flush()
+    assert (np.load(path) == SatMapStack(satmaps).data).all()
+
+
+def test_diff_equals_subtraction():
+    fand1 = get_satmap('aigean_fan_20230104_150010.zip')
+    fand2 = get_satmap('aigean_fan_20230112_074702.zip')
+    diff = SatMapStack([fand1, fand2]).diff()
+    overlap = fand2 - fand1
+    assert diff.shape == (1, 10, 75)
+    assert diff.count() == overlap.data.size
+    assert (diff[0, :, 30:45] == overlap.data).all()
+
+
+def test_rolling_and_reduce(satmaps):
+    stack = SatMapStack(satmaps)
+    rolling = stack.rolling(2, 'sum')
+    assert rolling.shape == (2, 3, 6)
+    # pixel covered on the 1st and 3rd days, pixel covered every day
+    assert list(rolling[:, 0, 0]) == [1, 3]
+    assert list(rolling[:, 1, 2]) == [3, 5]
+    assert rolling.mask[:, 2, 5].tolist() == [False, False]
+    assert rolling.mask[:, 0, 5].all()
+    assert stack.reduce('mean').data[1, 2] == 2
+    assert stack.reduce('median', fill_value=-1).data[0, 5] == -1
+    assert stack.reduce('max').data[1, 2] == 3
+    assert stack.reduce('std').data[0, 0] == 1
+    with pytest.raises(ValueError):
+        stack.reduce('mode')
+
+
+def test_statistics_by_blocks_of_rows(satmaps, monkeypatch):
+    stack = SatMapStack(satmaps)
+    rolling = stack.rolling(2, 'mean')
+    reduced = stack.reduce('median', fill_value=-1)
+    # one row of the data at a time
+    monkeypatch.setattr(temporal, '_BLOCK_SIZE', 1)
+    blocks = stack.rolling(2, 'mean')
+    assert (blocks.mask == rolling.mask).all()
+    assert np.allclose(blocks.filled(0), rolling.filled(0))
+    assert (stack.reduce('median', fill_value=-1).data == reduced.data).all()
+
+
+def test_stack_raise_errors(satmaps, make_satmap):
+    with pytest.raises(ValueError):
+        SatMapStack([])
+    with pytest.raises(TypeError):
+        SatMapStack(satmaps + [np.zeros((2, 4))])
+    with pytest.raises(ValueError):
+        SatMapStack(satmaps + [make_satmap(1, (0, 40), (0, 20), '2023-01-04',
+                                           resolution=20)])
+    with pytest.raises(ValueError):
+        SatMapStack(satmaps, extent='all')
+    with pytest.raises(ValueError):
+        SatMapStack([satmaps[0],
+                     make_satmap(1, (40, 80), (0, 20), '2023-01-04')],
+                    extent='intersection')
+    stack = SatMapStack(satmaps)
+    for lag in (0, 3):
+        with pytest.raises(ValueError):
+            stack.diff(lag)
+    for window in (0, 4):
+        with pytest.raises(ValueError):
+            stack.rolling(window)
+
+
+def _random_satmaps(make_satmap, seed, number):
+    rng = np.random.default_rng(seed)
+    satmaps = []
+    for day in range(number):
+        x0, y0 = rng.integers(0, 6, 2) * 10
+        satmaps.append(make_satmap(rng.normal(day, 3, (3, 4)),
+                                   (x0, x0 + 40), (y0, y0 + 30),
+                                   f'2023-01-{day + 1:02d} 10:00:00'))
+    return satmaps
+
+
+def test_temporal_stats_equal_stack_reductions(make_satmap):
+    satmaps = _random_satmaps(make_satmap, 0, 12)
+    stats = TemporalStats.for_metas(satmap.meta for satmap in satmaps)
+    # satmaps streamed from a generator
+    stats.consume(satmap for satmap in satmaps)
+    stack = SatMapStack(satmaps, stats.meta['xcoords'],
+                        stats.meta['ycoords'])
+    assert stats.meta['obs_date'] == '2023-01-12 10:00:00'
+    assert (stats.count == stack.masked().count(axis=0)).all()
+    for statistic in ('mean', 'min', 'max', 'std'):
+        assert np.allclose(stats.result(statistic, fill_value=-1).data,
+                           stack.reduce(statistic, fill_value=-1).data)
+    variance = stack.masked().var(axis=0, ddof=1)
+    assert np.allclose(stats.variance(ddof=1), variance)
+    assert (stats.variance(ddof=1).mask == variance.mask).all()
+
+
+def test_merged_temporal_stats_equal_sequential(make_satmap):
+    satmaps = _random_satmaps(make_satmap, 1, 10)
+    grid = ((0, 90), (0, 80), 10)
+    sequential = TemporalStats(*grid).consume(satmaps)
+    parts = [TemporalStats(*grid).consume(satmaps[:4]),
+             TemporalStats(*grid),
+             TemporalStats(*grid).consume(satmaps[4:])]
+    # accumulators travel to and from worker processes pickled
+    parts = [pickle.loads(pickle.dumps(part)) for part in parts]
+    merged = parts[0].merge(parts[1]).merge(parts[2])
+    assert (merged.count == sequential.count).all()
+    for statistic in ('mean', 'variance', 'min', 'max'):
+        assert np.allclose(merged.result(statistic).data,
+                           sequential.result(statistic).data)
+    assert merged.meta == sequential.meta
+
+
+def test_temporal_stats_resample_and_clip():
+    fand = get_satmap('aigean_fan_20230104_150010.zip')
+    stats = TemporalStats((400, 500), (150, 200), 25)
+    stats.update(fand)
+    assert stats.count.shape == (2, 4)
+    assert (stats.count[:, :2] == 0).all() and (stats.count[:, 2:] == 1).all()
+    assert np.allclose(stats.result('mean').data[:, 2:],
+                       fand.data[:, :10].reshape(2, 5, 2, 5).mean((1, 3)))
+
+
+def test_temporal_stats_raise_errors(make_satmap):
+    stats = TemporalStats((0, 40), (0, 20), 10)
+    with pytest.raises(ValueError):
+        stats.result()
+    with pytest.raises(TypeError):
+        stats.update(np.zeros((2, 4)))
+    stats.update(make_satmap(1, (0, 40), (0, 20), '2023-01-01 10:00:00'))
+    with pytest.raises(ValueError):
+        stats.result('mode')
+    with pytest.raises(ValueError):
+        stats.merge(TemporalStats((0, 40), (0, 30), 10))
+    with pytest.raises(TypeError):
+        TemporalStats((0, 40), (0, 20), 10.)
+    with pytest.raises(ValueError):
+        TemporalStats((0, 40), (0, 20), 0)
+    with pytest.raises(ValueError):
+        TemporalStats.for_metas([])
@@ -0,0 +1,94 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import gc
+import numpy as np
+import pytest
+from aigeanpy.satmap import get_satmap
+from aigeanpy.tiled import TiledSatMap
+
+FAND_1 = 'aigean_fan_20230104_150010.zip'
+FAND_2 = 'aigean_fan_20230112_074702.zip'
+LIR = 'aigean_lir_20230104_145310.asdf'
+
+
+def test_from_satmap_round_trips_through_the_file(tmp_path):
+    fand = get_satmap(FAND_1)
+    path = tmp_path / 'fand.hdf5'
+    TiledSatMap.from_satmap(fand, path, tile_shape=(4, 8)).close()
+    with TiledSatMap(path) as tiled:
+        assert tiled.meta == fand.meta
+        assert tiled.data.chunks == (4, 8)
+        np.testing.assert_array_equal(tiled.to_satmap().data, fand.data)
+    # the file keeps the layout of the instrument files
+    assert get_satmap('fand.hdf5', root=tmp_path).meta == fand.meta
+    assert path.is_file()
+
+
+def test_temporary_files_are_removed_when_closed():
+    tiled = TiledSatMap.from_satmap(get_satmap(FAND_1))
+    assert tiled.temporary and tiled.path.is_file()
+    tiled.close()
+    assert not tiled.path.exists()
+
+
+def test_temporary_files_are_removed_when_collected():
+    tiled = TiledSatMap.from_satmap(get_satmap(FAND_1))
+    path = tiled.path
+    del tiled
+    gc.collect()
+    assert not path.exists()
+
+
+@pytest.mark.parametrize('tile_shape', [(3, 7), (512, 512)])
+@pytest.mark.parametrize('resolution', [None, 15, 60])
+@pytest.mark.parametrize('padding', [True, False])
+@pytest.mark.parametrize('method', ['auto', 'nearest'])
+def test_mosaic_equals_in_memory_mosaic(tile_shape, resolution, padding,
+                                        method):
+    fand = get_satmap(FAND_1)
+    lir = get_satmap(LIR)
+    expected = fand.mosaic(lir, resolution, padding, method)
+    with TiledSatMap.from_satmap(fand, tile_shape=tile_shape) as tiled:
+        with TiledSatMap.from_satmap(lir, tile_shape=tile_shape) as other:
+            with tiled.mosaic(other, resolution, padding, method) as mosaic:
+                assert mosaic.meta == expected.meta
+                assert mosaic.extra
+                np.testing.assert_almost_equal(mosaic.data[...],
+                                               expected.data)
+
+
+def test_add_and_sub_equal_in_memory_operators():
+    fand1 = get_satmap(FAND_1)
+    fand2 = get_satmap(FAND_2)
+    with TiledSatMap.from_satmap(fand1, tile_shape=(3, 4)) as tiled:
+        with tiled - fand2 as subtracted:
+            assert subtracted.meta == (fand1 - fand2).meta
+            np.testing.assert_array_equal(subtracted.data[...],
+                                          (fand1 - fand2).data)
+        fand2.meta['obs_date'] = fand1.meta['obs_date']
+        with tiled + fand2 as added:
+            assert added.meta == (fand1 + fand2).meta
+            np.testing.assert_array_equal(added.data[...],
+                                          (fand1 + fand2).data)
+
+
+def test_operators_raise_errors_as_SatMap():
+    with TiledSatMap.from_satmap(get_satmap(FAND_1)) as tiled:
+        with pytest.raises(TypeError):
+            _ = tiled + 1
+        with pytest.raises(ValueError, match='different resolution'):
+            _ = tiled + get_satmap(LIR)
+        with pytest.raises(ValueError, match='different days'):
+            _ = tiled - tiled
+        with pytest.raises(ValueError, match='Scale must be an integer'):
+            tiled.mosaic(get_satmap(LIR), resolution=20)
+
+
+def test_overview_bounds_the_size():
+    fand = get_satmap(FAND_1)
+    with TiledSatMap.from_satmap(fand, tile_shape=(4, 4)) as tiled:
+        overview = tiled.overview(max_size=15)
+    assert overview.shape == (3, 15)
+    assert overview.meta['resolution'] == 15
+    np.testing.assert_almost_equal(overview.data,
+                                   fand.resampled(15, method='linear'))
@@ -0,0 +1,140 @@
+# Disabling missing-module-docstring and missing-function-docstring error
+# pylint: disable = C0114, C0116
+import json
+import numpy as np
+import pytest
+from matplotlib.image import imread
+from aigeanpy.tiles import TilePyramid, export_tiles
+
+
+def _files(path):
+    return sorted(file_path.relative_to(path).as_posix()
+                  for file_path in path.rglob('*.png'))
+
+
+def test_tiles_cover_the_footprint_at_every_zoom(make_satmap):
+    pyramid = TilePyramid(make_satmap(np.ones((6, 10))), 'tiles', tile_size=4)
+    assert pyramid.max_zoom == 2
+    assert [pyramid.grid(zoom) for zoom in range(3)] == \
+        [(1, 1), (2, 1), (3, 2)]
+    assert [pyramid.resolution(zoom) for zoom in range(3)] == [40, 20, 10]
+    # tile (0, 0) is at the top left corner
+    assert pyramid.tile_bounds(2, 0, 0) == ((0, 40), (20, 60))
+    assert pyramid.tile_bounds(0, 0, 0) == ((0, 160), (-100, 60))
+    assert pyramid.tiles(2, (45, 55), (0, 10)) == [(1, 1)]
+    assert pyramid.tiles(2, (200, 300)) == []
+    with pytest.raises(ValueError):
+        pyramid.tiles(3)
+
+
+def test_export_tiles_keeps_the_data_top_up(tmp_path, make_satmap):
+    data = np.arange(60, dtype=float).reshape(6, 10) + 1
+    saved = export_tiles(make_satmap(data), tmp_path, tile_size=4, cmap='gray')
+    assert saved == [(0, 0, 0), (1, 0, 0), (1, 1, 0), (2, 0, 0), (2, 0, 1),
+                     (2, 1, 0), (2, 1, 1), (2, 2, 0), (2, 2, 1)]
+    assert _files(tmp_path) == [f'{zoom}/{x}/{y}.png'
+                                for zoom, x, y in saved]
+    image = imread(tmp_path/'2/0/0.png')
+    assert image.shape == (4, 4, 4)
+    # the top row of the tile is the last row of the data
+    brightness = image[..., 0]
+    assert (np.diff(brightness, axis=0) < 0).all()
+    assert (np.diff(brightness, axis=1) > 0).all()
+    # pixels past the footprint are transparent
+    assert (imread(tmp_path/'2/2/1.png')[:, 2:, 3] == 0).all()
+    assert (imread(tmp_path/'2/2/1.png')[2:, :, 3] == 0).all()
+    meta = json.loads((tmp_path/'tiles.json').read_text())
+    assert (meta['vmin'], meta['vmax'], meta['cmap']) == (1., 60., 'gray')
+
+
+def test_lower_zooms_leave_out_pixels_without_data(tmp_path, make_satmap):
+    data = np.zeros((8, 8))
+    data[:, :3] = 5.
+    data[:3, :] = 5.
+    satmap = make_satmap(data, (0, 80), (0, 80))
+    export_tiles(satmap, tmp_path, tile_size=4, cmap='gray', vmin=0,
+                 vmax=10)
+    level = TilePyramid(satmap, tmp_path, tile_size=4).level(0)
+    assert level.tolist() == [[5., 5., 0., 0.], [5., 5., 0., 0.],
+                              [5., 5., 5., 5.], [5., 5., 5., 5.]]
+    # the top right tile holds no data
+    assert '1/1/0.png' not in _files(tmp_path)
+    image = imread(tmp_path/'0/0/0.png')
+    assert ((image[..., 3] > 0) == (level > 0)).all()
+    assert np.ptp(image[level > 0, 0]) == 0
+
+
+def test_export_keeps_empty_tiles_when_asked(tmp_path, make_satmap):
+    data = np.zeros((8, 8))
+    data[4:, :4] = 1.
+    satmap = make_satmap(data, (0, 80), (0, 80))
+    assert len(export_tiles(satmap, tmp_path, tile_size=4)) == 2
+    saved = export_tiles(satmap, tmp_path, tile_size=4, skip_empty=False)
+    assert len(saved) == 5
+    assert (imread(tmp_path/'1/1/1.png')[..., 3] == 0).all()
+
+
+def test_export_updates_the_tiles_of_a_box(tmp_path, make_satmap):
+    data = np.ones((8, 16))
+    satmap = make_satmap(data, (0, 160), (0, 80))
+    export_tiles(satmap, tmp_path, tile_size=4, cmap='gray', vmin=0, vmax=4)
+    before = {name: (tmp_path/name).read_bytes()
+              for name in _files(tmp_path)}
+
+    changed = data.copy()
+    changed[0:2, 0:2] = 3.
+    changed[2:4, 0:2] = 0.
+    saved = export_tiles(make_satmap(changed, (0, 160), (0, 80)), tmp_path,
+                         tile_size=4, xcoords=(0, 20), ycoords=(0, 40))
+    assert saved == [(0, 0, 0), (1, 0, 0), (2, 0, 1)]
+    after = {name: (tmp_path/name).read_bytes() for name in _files(tmp_path)}
+    assert [name for name in before if before[name] != after[name]] == \
+        ['0/0/0.png', '1/0/0.png', '2/0/1.png']
+    # the colours of the other tiles are kept
+    meta = json.loads((tmp_path/'tiles.json').read_text())
+    assert (meta['vmin'], meta['vmax'], meta['cmap']) == (0., 4., 'gray')
+
+    with pytest.raises(ValueError, match='Tiles must share a grid'):
+        export_tiles(make_satmap(changed, (0, 160), (10, 90)), tmp_path,
+                     tile_size=4, xcoords=(0, 20))
+
+
+def test_export_removes_tiles_left_empty(tmp_path, make_satmap):
+    data = np.ones((8, 8))
+    export_tiles(make_satmap(data, (0, 80), (0, 80)), tmp_path, tile_size=4)
+    data[:4, :4] = 0.
+    saved = export_tiles(make_satmap(data, (0, 80), (0, 80)), tmp_path,
+                         tile_size=4, zooms=[1], xcoords=(0, 40),
+                         ycoords=(0, 40))
+    assert saved == []
+    assert '1/0/1.png' not in _files(tmp_path)
+
+
+@pytest.mark.parametrize('workers, processes', [(3, False), (2, True)])
+def test_export_in_parallel_saves_the_same_tiles(tmp_path, make_satmap,
+                                                 workers, processes):
+    rng = np.random.default_rng(0)
+    satmap = make_satmap(rng.random((20, 30)) + 1, (0, 300), (0, 200))
+    serial = export_tiles(satmap, tmp_path/'serial', tile_size=8)
+    parallel = export_tiles(satmap, tmp_path/'parallel', tile_size=8,
+                            workers=workers, processes=processes)
+    assert parallel == serial
+    for name in _files(tmp_path/'serial'):
+        assert (tmp_path/'serial'/name).read_bytes() == \
+            (tmp_path/'parallel'/name).read_bytes()
+
+
+def test_export_raises_errors(make_satmap):
+    with pytest.raises(TypeError, match='Satmap must in SatMap type'):
+        TilePyramid(np.ones((4, 4)), 'tiles')
+    with pytest.raises(TypeError, match='Tile_size must be int type'):
+        TilePyramid(make_satmap(np.ones((4, 4))), 'tiles', tile_size=4.)
+    with pytest.raises(ValueError, match='Tile_size must larger than 0'):
+        TilePyramid(make_satmap(np.ones((4, 4))), 'tiles', tile_size=0)
+    pyramid = TilePyramid(make_satmap(np.ones((4, 4))), 'tiles', tile_size=4)
+    with pytest.raises(TypeError, match='Workers must be int type'):
+        pyramid.export(workers=1.)
+    with pytest.raises(ValueError, match='Workers must larger than 0'):
+        pyramid.export(workers=0)
+    with pytest.raises(ValueError, match='Zoom must between 0 and max_zoom'):
+        pyramid.export(zooms=[1])
@@ -0,0 +1,670 @@
+# Disabling too-many-arguments, too-many-locals and
+# too-many-instance-attributes
+# pylint: disable = R0913, R0914, R0902
+import os
+import weakref
+import tempfile
+import numpy as np
+from pathlib import Path
+from aigeanpy.satmap import SatMap, _mosaic_crop
+from aigeanpy.coords import _earth_to_pixel_tuple, _pixel_window
+from aigeanpy.readers import _meta_generate
+from aigeanpy.resample import integer_factor, block_mean, linear_weights
+
+# Shape of the HDF5 chunks, each tile is read and written in one go
+TILE_SHAPE = (512, 512)
+
+
+class TiledSatMap:
+    """
+    TiledSatMap holds data too large for the memory in a chunked HDF5 file.
+    Adding, subtracting, mosaicking and visualising work tile by tile, so
+    only a few tiles are in memory at once.
+
+    The file has the layout of the Manannan HDF5 files, an 'observation'
+    group holding the meta-data as attributes and the 'data' dataset, so it
+    can also be read with aigeanpy.satmap.get_satmap.
+
+    Attributes
+    ----------
+    meta : dict
+        Including info of meta-data. keys including ('archive', 'instrument',
+        'observatory', 'resolution', 'xcoords', 'ycoords', 'obs_date')
+    data : h5py.Dataset
+        Data on disk, sliced like an array.
+    path : Path
+        Path of the HDF5 file.
+    temporary : bool
+        Whether the file was created in the temporary directory, and is
+        removed when closed or, failing that, garbage collected.
+
+    Methods
+    -------
+    create(meta, path=None, tile_shape=TILE_SHAPE, extra=False)
+        Create an empty TiledSatMap, filled with zeros.
+    from_satmap(satmap, path=None, tile_shape=TILE_SHAPE)
+        Create a TiledSatMap holding the data of a SatMap.
+    tiles()
+        Iterate over the pixel windows of the tiles.
+    read_window(xcoords=None, ycoords=None)
+        Read a window of the data as a SatMap.
+    to_satmap()
+        Read the whole data as a SatMap.
+    add(another_satmap, path=None)
+        Add the other SatMap or TiledSatMap to this one.
+    subtract(another_satmap, path=None)
+        Subtract the other SatMap or TiledSatMap from this one.
+    mosaic(another_satmap, resolution=None, padding=True, method='auto',
+           path=None)
+        Do the more complex adding, at any resolution.
+    overview(max_size=2048)
+        Down-sample the data to a SatMap of bounded size.
+    visualise(save=False, save_path='', max_size=2048)
+        Visualise the data through its overview.
+    close()
+        Close the HDF5 file.
+    """
+
+    def __init__(self, path, mode='r'):
+        """ Open the TiledSatMap held in a HDF5 file.
+
+        Parameters
+        ----------
+        path : str or Path
+            Path of the HDF5 file.
+        mode : str, optional
+            The h5py mode to open the file with, by default 'r'.
+        """
+        import h5py  # pylint: disable = C0415
+
+        self.path = Path(path)
+        self.temporary = False
+        self._file = h5py.File(self.path, mode)
+        # removes a temporary file even if close is never called
+        self._finalizer = None
+        group = self._file['observation']
+        self.meta = _meta_generate(group.attrs)
+        self.meta['resolution'] = int(self.meta['resolution'])
+        self.data = group['data']
+        self.shape = self.data.shape
+        self.fov = (self.meta['xcoords'][1] - self.meta['xcoords'][0],
+                    self.meta['ycoords'][1] - self.meta['ycoords'][0])
+        self.centre = (
+            int((self.meta['xcoords'][1] + self.meta['xcoords'][0]) / 2),
+            int((self.meta['ycoords'][1] + self.meta['ycoords'][0]) / 2))
+        self.extra = bool(group.attrs.get('extra', False))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @classmethod
+    def create(cls, meta, path=None, tile_shape=TILE_SHAPE, extra=False):
+        """ Create an empty TiledSatMap, filled with zeros.
+
+        Parameters
+        ----------
+        meta : dict
+            Including info of meta-data. keys including ('archive',
+            'instrument', 'observatory', 'resolution', 'xcoords', 'ycoords',
+            'obs_date')
+        path : str or Path, optional
+            Path of the HDF5 file, by default a new file in the temporary
+            directory, removed when closed.
+        tile_shape : tuple, optional
+            Shape of the tiles, by default TILE_SHAPE.
+        extra : bool, optional
+            Whether the data is derived from other data, by default False.
+
+        Returns
+        -------
+        TiledSatMap
+            The new TiledSatMap, open for writing.
+        """
+        import h5py  # pylint: disable = C0415
+
+        temporary = path is None
+        if temporary:
+            fd, path = tempfile.mkstemp(prefix='aigean_tiled_',
+                                        suffix='.hdf5')
+            os.close(fd)
+        resolution = meta['resolution']
+        data_px, data_py = _earth_to_pixel_tuple(
+            (0, meta['xcoords'][1] - meta['xcoords'][0]),
+            (0, meta['ycoords'][1] - meta['ycoords'][0]), resolution)
+        shape = (data_py[1] - data_py[0], data_px[1] - data_px[0])
+        chunks = (min(tile_shape[0], shape[0]), min(tile_shape[1], shape[1]))
+
+        with h5py.File(path, 'w') as f:
+            group = f.create_group('observation')
+            group.create_dataset('data', shape=shape, dtype=float,
+                                 chunks=chunks, fillvalue=0)
+            # store the meta-data as the instrument files do
+            for key in ('archive', 'instrument', 'observatory'):
+                group.attrs[key] = meta[key]
+            group.attrs['resolution'] = resolution
+            group.attrs['xcoords'] = meta['xcoords']
+            group.attrs['ycoords'] = meta['ycoords']
+            group.attrs['date'], group.attrs['time'] = \
+                meta['obs_date'].split(' ')
+            group.attrs['extra'] = extra
+
+        tiled = cls(path, 'r+')
+        if temporary:
+            tiled.temporary = True
+            tiled._finalizer = weakref.finalize(tiled, _remove_file,
+                                                tiled._file, tiled.path)
+        return tiled
+
+    @classmethod
+    def from_satmap(cls, satmap, path=None, tile_shape=TILE_SHAPE):
+        """ Create a TiledSatMap holding the data of a SatMap.
+
+        Parameters
+        ----------
+        satmap : SatMap
+            The SatMap to store.
+        path : str or Path, optional
+            Path of the HDF5 file, by default a new file in the temporary
+            directory, removed when closed.
+        tile_shape : tuple, optional
+            Shape of the tiles, by default TILE_SHAPE.
+
+        Returns
+        -------
+        TiledSatMap
+            The new TiledSatMap, open for writing.
+
+        Raises
+        ------
+        TypeError
+            Satmap must in SatMap type
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.tiled import TiledSatMap
+        >>> fand = get_satmap('aigean_fan_20230112_074702.zip')
+        >>> with TiledSatMap.from_satmap(fand, tile_shape=(4, 16)) as tiled:
+        ...     tiled.shape, len(list(tiled.tiles()))
+        ((10, 45), 9)
+        """
+        if not isinstance(satmap, SatMap):
+            raise TypeError('Satmap must in SatMap type')
+        tiled = cls.create(satmap.meta, path, tile_shape, satmap.extra)
+        tiled.data[...] = satmap.data
+        return tiled
+
+    def tiles(self):
+        """ Iterate over the pixel windows of the tiles.
+
+        Yields
+        ------
+        slice
+            Rows of the tile.
+        slice
+            Columns of the tile.
+        """
+        tile_rows, tile_cols = self.data.chunks or TILE_SHAPE
+        for row in range(0, self.shape[0], tile_rows):
+            for col in range(0, self.shape[1], tile_cols):
+                yield (slice(row, min(row + tile_rows, self.shape[0])),
+                       slice(col, min(col + tile_cols, self.shape[1])))
+
+    def read_window(self, xcoords=None, ycoords=None):
+        """ Read a window of the data as a SatMap.
+
+        Parameters
+        ----------
+        xcoords : tuple, optional
+            Earth coordinates of the window along x, by default the whole
+            data.
+        ycoords : tuple, optional
+            Earth coordinates of the window along y, by default the whole
+            data.
+
+        Returns
+        -------
+        SatMap
+            The window, in memory.
+
+        Raises
+        ------
+        ValueError
+            Window must overlap the data
+        """
+        rows, cols, meta = _pixel_window(self.meta, self.shape, xcoords,
+                                         ycoords)
+        satmap = SatMap(meta.copy(), self.data[rows, cols])
+        satmap.extra = self.extra
+        return satmap
+
+    def to_satmap(self):
+        """ Read the whole data as a SatMap.
+
+        Returns
+        -------
+        SatMap
+            The data, in memory.
+        """
+        return self.read_window()
+
+    def add(self, another_satmap, path=None):
+        """ Add the other SatMap or TiledSatMap to this one.
+
+        The data of the other one is written over this one where they
+        overlap, as SatMap.__add__ does.
+
+        Parameters
+        ----------
+        another_satmap : SatMap or TiledSatMap
+            The other data.
+        path : str or Path, optional
+            Path of the HDF5 file of the result, by default a new file in the
+            temporary directory.
+
+        Returns
+        -------
+        TiledSatMap
+            A new TiledSatMap that have been added.
+
+        Raises
+        ------
+        TypeError
+            Another_satmap must in SatMap or TiledSatMap type
+        ValueError
+            Different instruments with different resolution cannot be added
+        ValueError
+            2 data must in the same day
+        """
+        _check_type(another_satmap)
+        if self.meta['resolution'] != another_satmap.meta['resolution']:
+            raise ValueError('Different instruments with \
+different resolution cannot be added')
+        if self.meta['obs_date'][:10] != another_satmap.meta['obs_date'][:10]:
+            raise ValueError('2 data must in the same day')
+        return self.mosaic(another_satmap, path=path)
+
+    def subtract(self, another_satmap, path=None):
+        """ Subtract the other SatMap or TiledSatMap from this one.
+
+        Parameters
+        ----------
+        another_satmap : SatMap or TiledSatMap
+            The other data.
+        path : str or Path, optional
+            Path of the HDF5 file of the result, by default a new file in the
+            temporary directory.
+
+        Returns
+        -------
+        TiledSatMap
+            A new TiledSatMap of the overlap that have been subtracted.
+
+        Raises
+        ------
+        TypeError
+            Another_satmap must in SatMap or TiledSatMap type
+        ValueError
+            Different instruments with different resolution cannot be added
+        ValueError
+            2 data must in different days
+        ValueError
+            Two data must overlap
+        """
+        _check_type(another_satmap)
+        if self.meta['resolution'] != another_satmap.meta['resolution']:
+            raise ValueError('Different instruments \
+with different resolution cannot be added')
+        if self.meta['obs_date'][:10] == another_satmap.meta['obs_date'][:10]:
+            raise ValueError('2 data must in different days')
+        data_ex, data_ey = _intersection(self.meta, another_satmap.meta)
+
+        meta = self.meta.copy()
+        meta['xcoords'] = data_ex
+        meta['ycoords'] = data_ey
+        subtracted = TiledSatMap.create(meta, path, self.data.chunks,
+                                        extra=True)
+        resolution = meta['resolution']
+        # pixel offset of the overlap in each data
+        offsets = []
+        for satmap in (self, another_satmap):
+            satmap_px, satmap_py = _earth_to_pixel_tuple(
+                (satmap.meta['xcoords'][0] - data_ex[0],
+                 satmap.meta['xcoords'][1] - data_ex[0]),
+                (satmap.meta['ycoords'][0] - data_ey[0],
+                 satmap.meta['ycoords'][1] - data_ey[0]), resolution)
+            offsets.append((max(0, -satmap_py[0]), max(0, -satmap_px[0])))
+
+        for rows, cols in subtracted.tiles():
+            windows = [satmap.data[rows.start + row:rows.stop + row,
+                                   cols.start + col:cols.stop + col]
+                       for satmap, (row, col) in zip((self, another_satmap),
+                                                     offsets)]
+            subtracted.data[rows, cols] = windows[0] - windows[1]
+        return subtracted
+
+    def mosaic(self, another_satmap, resolution=None, padding=True,
+               method='auto', path=None):
+        """ Do the more complex adding, at any resolution.
+
+        Each tile of the result is resampled from the windows of the data
+        it covers, so the data is never resampled as a whole. Only integer
+        resolution ratios are supported.
+
+        Parameters
+        ----------
+        another_satmap : SatMap or TiledSatMap
+            The other data.
+        resolution : int, optional
+            The resolution of the desired data, by default the smaller one.
+        padding : bool, optional
+            A flag determines whether emtpy space is reserved, by default True.
+        method : str, optional
+            The resampling method, 'auto', 'linear' or 'nearest', by default
+            'auto'. See aigeanpy.resample.resample.
+        path : str or Path, optional
+            Path of the HDF5 file of the result, by default a new file in the
+            temporary directory.
+
+        Returns
+        -------
+        TiledSatMap
+            A new TiledSatMap that have been added.
+
+        Raises
+        ------
+        TypeError
+            Another_satmap must in SatMap or TiledSatMap type
+        TypeError
+            Padding must be True or False
+        ValueError
+            Two data must overlap
+        ValueError
+            2 data must in the same day
+        TypeError
+            Resolution must be int type
+        ValueError
+            Resolution must larger than 0
+        ValueError
+            Scale must be an integer or the inverse of an integer
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.tiled import TiledSatMap
+        >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> lir = get_satmap('aigean_lir_20230104_145310.asdf')
+        >>> with TiledSatMap.from_satmap(fand) as tiled:
+        ...     with tiled.mosaic(lir, resolution=15) as mosaic:
+        ...         mosaic.meta['xcoords'], mosaic.shape
+        ((100, 700), (20, 40))
+        """
+        _check_type(another_satmap)
+        if not isinstance(padding, bool):
+            raise TypeError('Padding must be True or False')
+        _intersection(self.meta, another_satmap.meta)
+        if self.meta['obs_date'][:10] != another_satmap.meta['obs_date'][:10]:
+            raise ValueError('2 data must in the same day')
+        if method not in ('auto', 'linear', 'nearest'):
+            raise ValueError('Method must be one of auto, linear or nearest')
+
+        # if the resolution is not specified, choose the smaller resolution
+        if resolution is None:
+            resolution = min(self.meta['resolution'],
+                             another_satmap.meta['resolution'])
+        else:
+            if not isinstance(resolution, int):
+                raise TypeError('Resolution must be int type')
+            if resolution <= 0:
+                raise ValueError('Resolution must larger than 0')
+        for satmap in (self, another_satmap):
+            if integer_factor(satmap.meta['resolution'] / resolution) is None:
+                raise ValueError('Scale must be an integer or the inverse of '
+                                 'an integer')
+
+        # earth coords of the padded mosaic
+        data_ex = (min(self.meta['xcoords'][0],
+                       another_satmap.meta['xcoords'][0]),
+                   max(self.meta['xcoords'][1],
+                       another_satmap.meta['xcoords'][1]))
+        data_ey = (min(self.meta['ycoords'][0],
+                       another_satmap.meta['ycoords'][0]),
+                   max(self.meta['ycoords'][1],
+                       another_satmap.meta['ycoords'][1]))
+        offset = (data_ex[0], data_ey[0])
+        # without padding, only the largest non-empty area is written
+        if padding:
+            xcoords, ycoords = data_ex, data_ey
+        else:
+            xcoords, ycoords = _mosaic_crop(self.meta, another_satmap.meta,
+                                            resolution)
+        origin_px, origin_py = _earth_to_pixel_tuple(
+            (xcoords[0] - offset[0], xcoords[1] - offset[0]),
+            (ycoords[0] - offset[1], ycoords[1] - offset[1]), resolution)
+
+        meta = self.meta.copy()
+        meta['resolution'] = resolution
+        meta['xcoords'] = xcoords
+        meta['ycoords'] = ycoords
+        mosaic = TiledSatMap.create(meta, path, self.data.chunks, extra=True)
+        for satmap in (self, another_satmap):
+            satmap_px, satmap_py = _earth_to_pixel_tuple(
+                (satmap.meta['xcoords'][0] - offset[0],
+                 satmap.meta['xcoords'][1] - offset[0]),
+                (satmap.meta['ycoords'][0] - offset[1],
+                 satmap.meta['ycoords'][1] - offset[1]), resolution)
+            # pixels of the data in the mosaic
+            box = (satmap_py[0] - origin_py[0], satmap_py[1] - origin_py[0],
+                   satmap_px[0] - origin_px[0], satmap_px[1] - origin_px[0])
+            _paint(mosaic, satmap, box, resolution, method)
+        return mosaic
+
+    def overview(self, max_size=2048):
+        """ Down-sample the data to a SatMap of bounded size.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            The largest number of pixels along each axis, by default 2048.
+
+        Returns
+        -------
+        SatMap
+            The down-sampled data, in memory.
+        """
+        factor = max(-(-max(self.shape) // max_size), 1)
+        meta = self.meta.copy()
+        meta['resolution'] = self.meta['resolution'] * factor
+        shape = (max(int(np.round(self.shape[0] / factor)), 1),
+                 max(int(np.round(self.shape[1] / factor)), 1))
+        data = np.zeros(shape)
+        tile_rows, tile_cols = self.data.chunks or TILE_SHAPE
+        # whole blocks of pixels per tile of the overview
+        step = (max(tile_rows // factor, 1), max(tile_cols // factor, 1))
+        for row in range(0, shape[0], step[0]):
+            for col in range(0, shape[1], step[1]):
+                rows = (row, min(row + step[0], shape[0]))
+                cols = (col, min(col + step[1], shape[1]))
+                data[rows[0]:rows[1], cols[0]:cols[1]] = _resample_window(
+                    self.data, 1 / factor, rows, cols, 'auto')
+        satmap = SatMap(meta, data)
+        satmap.extra = self.extra
+        return satmap
+
+    def visualise(self, save=False, save_path='', max_size=2048):
+        """ Visualise the data through its overview.
+
+        Parameters
+        ----------
+        save : bool, optional
+            Choose plot the figure or show the figure, by default False.
+        save_path : str, optional
+            The path figure saved, by default ''.
+        max_size : int, optional
+            The largest number of pixels along each axis of the figure, by
+            default 2048.
+
+        Returns
+        -------
+        filename: str
+            The name of the saved file.
+        """
+        return self.overview(max_size).visualise(save, save_path)
+
+    def close(self):
+        """ Close the HDF5 file, removing it if it is temporary.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+        elif self._file.id.valid:
+            self._file.close()
+
+    def __add__(self, another_satmap):
+        return self.add(another_satmap)
+
+    def __sub__(self, another_satmap):
+        return self.subtract(another_satmap)
+
+
+def _remove_file(file, path):
+    """ Close a HDF5 file and remove it.
+
+    Parameters
+    ----------
+    file : h5py.File
+        The open file.
+    path : Path
+        Path of the file.
+    """
+    if file.id.valid:
+        file.close()
+    path.unlink(missing_ok=True)
+
+
+def _check_type(another_satmap):
+    """ Check the other data of an operation is a SatMap or a TiledSatMap.
+
+    Raises
+    ------
+    TypeError
+        Another_satmap must in SatMap or TiledSatMap type
+    """
+    if not isinstance(another_satmap, (SatMap, TiledSatMap)):
+        raise TypeError('Another_satmap must in SatMap or TiledSatMap type')
+
+
+def _intersection(meta, another_meta):
+    """ Get the earth coordinates of the overlap of two data.
+
+    Returns
+    -------
+    tuple
+        Earth coordinate, xcoords.
+    tuple
+        Earth coordinate, ycoords.
+
+    Raises
+    ------
+    ValueError
+        Two data must overlap
+    """
+    data_ex = (max(meta['xcoords'][0], another_meta['xcoords'][0]),
+               min(meta['xcoords'][1], another_meta['xcoords'][1]))
+    data_ey = (max(meta['ycoords'][0], another_meta['ycoords'][0]),
+               min(meta['ycoords'][1], another_meta['ycoords'][1]))
+    if not (data_ex[1] > data_ex[0] and data_ey[1] > data_ey[0]):
+        raise ValueError('Two data must overlap')
+    return data_ex, data_ey
+
+
+def _paint(tiled, satmap, box, resolution, method):
+    """ Write the resampled data of a SatMap over the tiles it covers.
+
+    Parameters
+    ----------
+    tiled : TiledSatMap
+        The data written to.
+    satmap : SatMap or TiledSatMap
+        The data written.
+    box : tuple
+        Pixels of the data in the TiledSatMap, (first row, last row, first
+        column, last column), may exceed the TiledSatMap.
+    resolution : int
+        The resolution of the TiledSatMap.
+    method : str
+        The resampling method.
+    """
+    scale = satmap.meta['resolution'] / resolution
+    for rows, cols in tiled.tiles():
+        # pixels of the tile covered by the data
+        row_range = (max(rows.start, box[0]), min(rows.stop, box[1]))
+        col_range = (max(cols.start, box[2]), min(cols.stop, box[3]))
+        if row_range[0] >= row_range[1] or col_range[0] >= col_range[1]:
+            continue
+        tiled.data[row_range[0]:row_range[1], col_range[0]:col_range[1]] = \
+            _resample_window(satmap.data, scale,
+                             (row_range[0] - box[0], row_range[1] - box[0]),
+                             (col_range[0] - box[2], col_range[1] - box[2]),
+                             method)
+
+
+def _resample_window(data, scale, rows, cols, method):
+    """ Resample only a window of the data by an integer scale factor.
+
+    The result is the same window of aigeanpy.resample.resample(data, scale,
+    method), but only the input pixels it needs are read.
+
+    Parameters
+    ----------
+    data : array or h5py.Dataset
+        Data to resample.
+    scale : float
+        Scale factor, an integer or the inverse of an integer.
+    rows : tuple
+        First and last row of the window in the resampled data.
+    cols : tuple
+        First and last column of the window in the resampled data.
+    method : str
+        The resampling method, 'auto', 'linear' or 'nearest'.
+
+    Returns
+    -------
+    array
+        The window of the resampled data.
+    """
+    factor = integer_factor(scale)
+    if factor == 1:
+        return np.asarray(data[rows[0]:rows[1], cols[0]:cols[1]], dtype=float)
+    if scale < 1:
+        # the blocks of pixels averaged into the window
+        window = np.asarray(
+            data[rows[0] * factor:min(rows[1] * factor, data.shape[0]),
+                 cols[0] * factor:min(cols[1] * factor, data.shape[1])],
+            dtype=float)
+        return block_mean(window, factor,
+                          (rows[1] - rows[0], cols[1] - cols[0]))
+
+    # the input pixels interpolated into the window along each axis
+    weights = []
+    for axis, (start, stop) in enumerate((rows, cols)):
+        if method == 'nearest':
+            lower = np.arange(start, stop) // factor
+            weights.append((lower, lower, np.zeros(stop - start)))
+        else:
+            lower, upper, weight = linear_weights(data.shape[axis], factor)
+            weights.append((lower[start:stop], upper[start:stop],
+                            weight[start:stop]))
+    first = [lower.min() for lower, _, _ in weights]
+    window = np.asarray(data[first[0]:weights[0][1].max() + 1,
+                             first[1]:weights[1][1].max() + 1], dtype=float)
+    for axis, (lower, upper, weight) in enumerate(weights):
+        shape = [1, 1]
+        shape[axis] = -1
+        weight = weight.reshape(shape)
+        window = (np.take(window, lower - first[axis], axis=axis) *
+                  (1 - weight) +
+                  np.take(window, upper - first[axis], axis=axis) * weight)
+    return window
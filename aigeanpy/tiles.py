@@ -0,0 +1,569 @@
+import json
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from aigeanpy.resample import block_mean
+from aigeanpy.satmap import SatMap
+from aigeanpy.coords import earth_to_pixel_footprints, pixel_to_earth
+
+# Name of the file describing the grid and the colours of the tiles, saved
+# next to the zoom level directories
+TILES_META = 'tiles.json'
+
+# Keys of the tiles meta-data which must match to update tiles in place
+_GRID_KEYS = ('xcoords', 'ycoords', 'resolution', 'tile_size', 'max_zoom')
+
+
+class TilePyramid:
+    """
+    TilePyramid cuts a SatMap, e.g. a mosaic, into the XYZ tiles a web map
+    viewer loads: a pyramid of zoom levels of PNG tiles of a fixed size,
+    saved as ``path/{zoom}/{x}/{y}.png``.
+
+    The highest zoom level has one pixel of the tiles per pixel of the data,
+    and each lower level halves the number of pixels along each axis, down
+    to level 0 which fits in one tile. Tile (0, 0) of every level is at the
+    top left corner of the footprint, x counting the tiles eastwards and y
+    southwards, so the first row of the data is at the bottom of the last
+    row of tiles.
+
+    Pixels without data, equal to nodata or NaN, are transparent, and are
+    left out of the block means of the lower levels.
+
+    Attributes
+    ----------
+    satmap : SatMap
+        The SatMap.
+    path : Path
+        The directory the tiles are saved in.
+    tile_size : int
+        The number of pixels of the tiles along each axis.
+    nodata : float
+        The value of the pixels without data.
+    max_zoom : int
+        The highest zoom level.
+
+    Methods
+    -------
+    resolution(zoom)
+        Get the resolution of a zoom level.
+    grid(zoom)
+        Get the number of tiles of a zoom level along x and y.
+    tile_bounds(zoom, x, y)
+        Get the earth coordinates of a tile.
+    tiles(zoom, xcoords=None, ycoords=None)
+        Get the tiles of a zoom level overlapping a box.
+    level(zoom)
+        Get the data of a zoom level, the first row at the top.
+    export(zooms=None, xcoords=None, ycoords=None, *, skip_empty=True,
+           cmap=None, vmin=None, vmax=None, workers=1, processes=False)
+        Save the tiles.
+    """
+
+    def __init__(self, satmap, path, tile_size=256, nodata=0.):
+        """ Initiate the TilePyramid class.
+
+        Parameters
+        ----------
+        satmap : SatMap
+            The SatMap.
+        path : str or Path
+            The directory the tiles are saved in.
+        tile_size : int, optional
+            The number of pixels of the tiles along each axis, by default
+            256.
+        nodata : float, optional
+            The value of the pixels without data, by default 0. as in the
+            padding of mosaics.
+
+        Raises
+        ------
+        TypeError
+            Satmap must in SatMap type
+        TypeError
+            Tile_size must be int type
+        ValueError
+            Tile_size must larger than 0
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.tiles import TilePyramid
+        >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> fand.shape
+        (10, 45)
+        >>> pyramid = TilePyramid(fand, 'tiles', tile_size=8)
+        >>> pyramid.max_zoom, pyramid.grid(3), pyramid.grid(0)
+        (3, (6, 2), (1, 1))
+        """
+        if not isinstance(satmap, SatMap):
+            raise TypeError('Satmap must in SatMap type')
+        if not isinstance(tile_size, int):
+            raise TypeError('Tile_size must be int type')
+        if tile_size <= 0:
+            raise ValueError('Tile_size must larger than 0')
+        self.satmap = satmap
+        self.path = Path(path)
+        self.tile_size = tile_size
+        self.nodata = nodata
+        self.max_zoom = 0
+        while max(satmap.shape) > tile_size * 2 ** self.max_zoom:
+            self.max_zoom += 1
+        # data of each zoom level, the first row at the top
+        self._levels = {}
+
+    def resolution(self, zoom):
+        """ Get the resolution of a zoom level.
+
+        Parameters
+        ----------
+        zoom : int
+            The zoom level.
+
+        Returns
+        -------
+        int
+            The resolution of the pixels of the tiles.
+        """
+        return int(self.satmap.meta['resolution']) * \
+            2 ** (self.max_zoom - zoom)
+
+    def grid(self, zoom):
+        """ Get the number of tiles of a zoom level along x and y.
+
+        Parameters
+        ----------
+        zoom : int
+            The zoom level.
+
+        Returns
+        -------
+        tuple
+            The number of tiles along x and along y.
+        """
+        rows, cols = self._level_shape(zoom)
+        return -(-cols // self.tile_size), -(-rows // self.tile_size)
+
+    def tile_bounds(self, zoom, x, y):
+        """ Get the earth coordinates of a tile.
+
+        The tiles on the right and bottom edges may stick out of the
+        footprint.
+
+        Parameters
+        ----------
+        zoom : int
+            The zoom level.
+        x : int
+            The column of the tile, from the left.
+        y : int
+            The row of the tile, from the top.
+
+        Returns
+        -------
+        tuple
+            Earth coordinates of the tile along x.
+        tuple
+            Earth coordinates of the tile along y.
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.tiles import TilePyramid
+        >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> fand.meta['xcoords'], fand.meta['ycoords']
+        ((450, 675), (150, 200))
+        >>> TilePyramid(fand, 'tiles', tile_size=8).tile_bounds(3, 1, 0)
+        ((490, 530), (160, 200))
+        """
+        size = self.tile_size
+        x_earth, y_earth = pixel_to_earth(
+            np.array([x, x + 1]) * size, np.array([y, y + 1]) * size,
+            self.resolution(zoom))
+        left = self.satmap.meta['xcoords'][0]
+        top = self.satmap.meta['ycoords'][1]
+        return ((int(left + x_earth[0]), int(left + x_earth[1])),
+                (int(top - y_earth[1]), int(top - y_earth[0])))
+
+    def tiles(self, zoom, xcoords=None, ycoords=None):
+        """ Get the tiles of a zoom level overlapping a box.
+
+        The box is snapped to the pixels of the data, and a tile of a lower
+        level overlaps it when any pixel of the data it averages does.
+
+        Parameters
+        ----------
+        zoom : int
+            The zoom level.
+        xcoords : tuple, optional
+            Earth coordinates of the box along x, by default the whole
+            footprint.
+        ycoords : tuple, optional
+            Earth coordinates of the box along y, by default the whole
+            footprint.
+
+        Returns
+        -------
+        list of tuples
+            The (x, y) of the tiles, by column then row.
+
+        Raises
+        ------
+        ValueError
+            Zoom must between 0 and max_zoom
+
+        Examples
+        --------
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.tiles import TilePyramid
+        >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> pyramid = TilePyramid(fand, 'tiles', tile_size=8)
+        >>> pyramid.tiles(3, (500, 540), (150, 170))
+        [(1, 0), (1, 1), (2, 0), (2, 1)]
+        """
+        if not 0 <= zoom <= self.max_zoom:
+            raise ValueError('Zoom must between 0 and max_zoom')
+        meta = self.satmap.meta
+        if xcoords is None:
+            xcoords = meta['xcoords']
+        if ycoords is None:
+            ycoords = meta['ycoords']
+        # pixels of the data from the top left corner
+        left, top = meta['xcoords'][0], meta['ycoords'][1]
+        pixel_x, pixel_y = earth_to_pixel_footprints(
+            [(xcoords[0] - left, xcoords[1] - left)],
+            [(top - ycoords[1], top - ycoords[0])],
+            int(meta['resolution']))
+        # pixels of the data covered by a tile of the level
+        cover = self.tile_size * 2 ** (self.max_zoom - zoom)
+        ranges = []
+        for pixels, length in zip((pixel_x[0], pixel_y[0]),
+                                  self.satmap.shape[::-1]):
+            start, stop = max(int(pixels[0]), 0), min(int(pixels[1]), length)
+            ranges.append(range(start // cover, -(-stop // cover))
+                          if stop > start else range(0))
+        return [(x, y) for x in ranges[0] for y in ranges[1]]
+
+    def export(self, zooms=None, xcoords=None, ycoords=None, *,
+               skip_empty=True, cmap=None, vmin=None, vmax=None, workers=1,
+               processes=False):
+        """ Save the tiles.
+
+        Given a box, only the tiles overlapping it are saved again, to update
+        the tiles after a part of the mosaic changed. The colours and the
+        grid are then those of the tiles saved before, read from
+        'tiles.json' in the directory.
+
+        Parameters
+        ----------
+        zooms : list of ints, optional
+            The zoom levels saved, by default all of them.
+        xcoords : tuple, optional
+            Earth coordinates of the changed box along x, by default the
+            whole footprint.
+        ycoords : tuple, optional
+            Earth coordinates of the changed box along y, by default the
+            whole footprint.
+        skip_empty : bool, optional
+            Whether to leave out, and remove, the tiles without any data, by
+            default True.
+        cmap : str, optional
+            The colormap, by default the matplotlib default.
+        vmin : float, optional
+            The value of the first colour, by default the minimum of the
+            data.
+        vmax : float, optional
+            The value of the last colour, by default the maximum of the data.
+        workers : int, optional
+            Number of tiles saved at once, by default 1.
+        processes : bool, optional
+            Whether to use a process pool instead of a thread pool, by default
+            False.
+
+        Returns
+        -------
+        list of tuples
+            The (zoom, x, y) of the saved tiles.
+
+        Raises
+        ------
+        TypeError
+            Workers must be int type
+        ValueError
+            Workers must larger than 0
+        ValueError
+            Zoom must between 0 and max_zoom
+        ValueError
+            Tiles must share a grid
+
+        Examples
+        --------
+        >>> import tempfile
+        >>> from aigeanpy.satmap import get_satmap
+        >>> from aigeanpy.tiles import TilePyramid
+        >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+        >>> with tempfile.TemporaryDirectory() as path:
+        ...     pyramid = TilePyramid(fand, path, tile_size=8)
+        ...     saved = pyramid.export(zooms=[0, 1])
+        ...     updated = pyramid.export(zooms=[1], xcoords=(450, 480))
+        >>> saved
+        [(0, 0, 0), (1, 0, 0), (1, 1, 0)]
+        >>> updated
+        [(1, 0, 0)]
+        """
+        # pylint: disable = R0913
+        if not isinstance(workers, int):
+            raise TypeError('Workers must be int type')
+        if workers <= 0:
+            raise ValueError('Workers must larger than 0')
+        if zooms is None:
+            zooms = range(self.max_zoom + 1)
+        for zoom in zooms:
+            if not 0 <= zoom <= self.max_zoom:
+                raise ValueError('Zoom must between 0 and max_zoom')
+
+        colours = self._write_meta(
+            {'cmap': cmap, 'vmin': vmin, 'vmax': vmax},
+            xcoords is not None or ycoords is not None)
+        draw = partial(_map, partial(_write_tile, colours=colours,
+                                     nodata=self.nodata,
+                                     skip_empty=skip_empty),
+                       workers=workers, processes=processes)
+        saved = []
+        for zoom in sorted(zooms):
+            saved += self._save_level(zoom, self.tiles(zoom, xcoords, ycoords),
+                                      draw)
+        return saved
+
+    def _save_level(self, zoom, keys, draw):
+        """ Save tiles of a zoom level.
+
+        Parameters
+        ----------
+        zoom : int
+            The zoom level.
+        keys : list of tuples
+            The (x, y) of the tiles.
+        draw : callable
+            Function saving the tiles of an iterable of (path, data) tasks,
+            returning whether each of them was saved.
+
+        Returns
+        -------
+        list of tuples
+            The (zoom, x, y) of the saved tiles.
+        """
+        for x in {x for x, _ in keys}:
+            tile_dir = self.path/str(zoom)/str(x)
+            tile_dir.mkdir(parents=True, exist_ok=True)
+        tasks = ((self._tile_path(zoom, x, y), self._tile_data(zoom, x, y))
+                 for x, y in keys)
+        return [(zoom, x, y) for (x, y), is_written in zip(keys, draw(tasks))
+                if is_written]
+
+    def _write_meta(self, colours, update):
+        """ Save 'tiles.json' in the directory.
+
+        Parameters
+        ----------
+        colours : dict
+            The cmap, vmin and vmax asked for, None for the defaults.
+        update : bool
+            Whether only some tiles are saved again. The colours not asked
+            for are then those of the tiles saved before.
+
+        Returns
+        -------
+        dict
+            The saved meta-data.
+
+        Raises
+        ------
+        ValueError
+            Tiles must share a grid
+        """
+        from matplotlib import rcParams  # pylint: disable = C0415
+
+        tiles_meta = self._tiles_meta(**colours)
+        meta_path = self.path/TILES_META
+        if update and meta_path.is_file():
+            saved_meta = json.loads(meta_path.read_text())
+            if any(saved_meta[key] != tiles_meta[key] for key in _GRID_KEYS):
+                raise ValueError('Tiles must share a grid')
+            # keep the colours of the other tiles
+            for key, value in colours.items():
+                if value is None:
+                    tiles_meta[key] = saved_meta[key]
+        if tiles_meta['cmap'] is None:
+            tiles_meta['cmap'] = rcParams['image.cmap']
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        meta_path.write_text(json.dumps(tiles_meta, indent=2))
+        return tiles_meta
+
+    def _tiles_meta(self, cmap, vmin, vmax):
+        """ Get the meta-data saved in 'tiles.json'.
+        """
+        meta = self.satmap.meta
+        if vmin is None or vmax is None:
+            data = self.satmap.data
+            values = data[(data != self.nodata) & ~np.isnan(data)]
+            if vmin is None:
+                vmin = float(values.min()) if values.size else 0.
+            if vmax is None:
+                vmax = float(values.max()) if values.size else 1.
+        return {'xcoords': [int(coord) for coord in meta['xcoords']],
+                'ycoords': [int(coord) for coord in meta['ycoords']],
+                'resolution': int(meta['resolution']),
+                'tile_size': self.tile_size, 'max_zoom': self.max_zoom,
+                'cmap': cmap, 'vmin': float(vmin), 'vmax': float(vmax)}
+
+    def _tile_path(self, zoom, x, y):
+        return self.path/str(zoom)/str(x)/f'{y}.png'
+
+    def _level_shape(self, zoom):
+        """ Get the shape of a zoom level, without building it.
+        """
+        shape = self.satmap.shape
+        for _ in range(self.max_zoom - zoom):
+            shape = tuple(-(-length // 2) for length in shape)
+        return shape
+
+    def level(self, zoom):
+        """ Get the data of a zoom level, the first row at the top.
+
+        Each level is the block means of 2 x 2 pixels of the level above,
+        left out the pixels without data, and the partial blocks of the last
+        row and column are averaged over the pixels they hold. Levels are
+        built on first use and kept.
+
+        Parameters
+        ----------
+        zoom : int
+            The zoom level.
+
+        Returns
+        -------
+        array
+            The data of the level, nodata where there is none.
+        """
+        if zoom not in self._levels:
+            if zoom == self.max_zoom:
+                data = np.asarray(self.satmap.data, dtype=float)[::-1]
+            else:
+                above = self.level(zoom + 1)
+                valid = (above != self.nodata) & ~np.isnan(above)
+                shape = self._level_shape(zoom)
+                counts = block_mean(valid.astype(float), 2, shape)
+                sums = block_mean(np.where(valid, above, 0.), 2, shape)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    data = np.where(counts > 0, sums / counts, self.nodata)
+            self._levels[zoom] = data
+        return self._levels[zoom]
+
+    def _tile_data(self, zoom, x, y):
+        """ Get the data of a tile, padded with nodata past the footprint.
+        """
+        size = self.tile_size
+        window = self.level(zoom)[y * size:(y + 1) * size,
+                                  x * size:(x + 1) * size]
+        data = np.full((size, size), self.nodata, dtype=float)
+        data[:window.shape[0], :window.shape[1]] = window
+        return data
+
+
+def export_tiles(satmap, path, tile_size=256, nodata=0., **options):
+    """ Save the XYZ tiles of a SatMap, e.g. a mosaic.
+
+    See TilePyramid for the layout of the tiles.
+
+    Parameters
+    ----------
+    satmap : SatMap
+        The SatMap.
+    path : str or Path
+        The directory the tiles are saved in.
+    tile_size : int, optional
+        The number of pixels of the tiles along each axis, by default 256.
+    nodata : float, optional
+        The value of the pixels without data, by default 0.
+    **options
+        The options of TilePyramid.export, zooms, xcoords, ycoords,
+        skip_empty, cmap, vmin, vmax, workers and processes.
+
+    Returns
+    -------
+    list of tuples
+        The (zoom, x, y) of the saved tiles.
+
+    Examples
+    --------
+    >>> import os, tempfile
+    >>> from aigeanpy.satmap import get_satmap
+    >>> from aigeanpy.tiles import export_tiles
+    >>> fand = get_satmap('aigean_fan_20230104_150010.zip')
+    >>> with tempfile.TemporaryDirectory() as path:
+    ...     saved = export_tiles(fand, path, tile_size=16, workers=2)
+    ...     sorted(os.listdir(path))
+    ['0', '1', '2', 'tiles.json']
+    >>> len(saved)
+    6
+    """
+    return TilePyramid(satmap, path, tile_size, nodata).export(**options)
+
+
+def _map(function, tasks, workers, processes):
+    """ Apply a function to tasks, in a pool when there are many workers.
+
+    Returns
+    -------
+    list
+        The results, in the order of the tasks.
+    """
+    if workers == 1:
+        return list(map(function, tasks))
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor(max_workers=workers) as pool:
+        return list(pool.map(function, tasks))
+
+
+def _write_tile(task, colours, nodata, skip_empty):
+    """ Colour the data of a tile and save it as a PNG.
+
+    Parameters
+    ----------
+    task : tuple
+        The path of the PNG and the data of the tile.
+    colours : dict
+        The colormap 'cmap' and the values 'vmin' and 'vmax' of the first
+        and last colours.
+    nodata : float
+        The value of the pixels without data.
+    skip_empty : bool
+        Whether to leave out, and remove, the tile when it holds no data.
+
+    Returns
+    -------
+    bool
+        Whether the tile was saved.
+    """
+    # pylint: disable = C0415
+    from matplotlib import colormaps
+    from matplotlib.image import imsave
+
+    file_path, data = task
+    vmin, vmax = colours['vmin'], colours['vmax']
+    valid = (data != nodata) & ~np.isnan(data)
+    if skip_empty and not valid.any():
+        # a tile saved before the data was removed
+        file_path.unlink(missing_ok=True)
+        return False
+    if vmax > vmin:
+        scaled = np.clip((data - vmin) / (vmax - vmin), 0, 1)
+    else:
+        scaled = np.zeros_like(data)
+    rgba = colormaps[colours['cmap']](np.where(valid, scaled, 0), bytes=True)
+    rgba[~valid, 3] = 0
+    imsave(file_path, rgba)
+    return True
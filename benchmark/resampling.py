@@ -0,0 +1,35 @@
+import time
+import numpy as np
+from matplotlib import pyplot as plt
+from aigeanpy.resample import resample
+
+# Scale factors between the instrument resolutions: Lir (30) and Manannan (15)
+# to Fand (5), and back
+scales = {'up x6': 6, 'up x3': 3, 'down /3': 1 / 3, 'down /6': 1 / 6}
+# Number of pixels along each side of the square data
+sizes = np.arange(100, 1100, 100)
+
+
+def time_resample(data, scale, method, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.time()
+        resample(data, scale, method)
+        best = min(best, time.time() - start)
+    return best
+
+
+fig, axes = plt.subplots(1, len(scales), figsize=(16, 4), sharey=True)
+for ax, (label, scale) in zip(axes, scales.items()):
+    # up-sampling large data takes too long, so its size is scaled down
+    side = sizes if scale < 1 else sizes // 6
+    for method, style in [('skimage', 'r-'), ('auto', 'b-')]:
+        times = [time_resample(np.random.random((n, n)), scale, method)
+                 for n in side]
+        ax.plot(side, times, style, label=method)
+    ax.set_title(label)
+    ax.set_xlabel('N pixels per side')
+axes[0].set_ylabel('Time taken (s)')
+axes[0].legend()
+plt.savefig('resampling.png')
+plt.show()